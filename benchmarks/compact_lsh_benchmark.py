@@ -0,0 +1,73 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.compact_lsh import CompactLSH
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', default=20000, type=int, help='The number of documents in the index')
+    parser.add_argument('--copies', default=0.2, type=float,
+                        help='The fraction of documents that are near-copies of another document')
+    parser.add_argument('--seed', default=7, type=int, help='The seed of the synthetic signatures')
+    return parser.parse_args()
+
+
+def generate_signatures(num_docs: int, copies: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    signatures = rng.integers(0, np.iinfo(np.uint64).max, size=(num_docs, 128), dtype=np.uint64)
+    num_copies = int(num_docs * copies)
+    sources = rng.integers(0, num_docs - num_copies, size=num_copies)
+    copied = signatures[sources].copy()
+    mutated = rng.random(copied.shape) < 0.2
+    copied[mutated] = rng.integers(0, np.iinfo(np.uint64).max, size=int(mutated.sum()), dtype=np.uint64)
+    signatures[num_docs - num_copies:] = copied
+    return signatures
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = build()
+    build_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return index, memory, build_time
+
+
+def build_lsh(doc_names, signatures) -> 'LSH':
+    lsh = LSH(num_bands=16, num_rows=8)
+    for doc_name, signature in zip(doc_names, signatures):
+        minhash = MinHash(num_permutations=128)
+        minhash.signature = signature
+        lsh.insert(doc_name, minhash)
+    return lsh
+
+
+if __name__ == '__main__':
+    args = parse_arg()
+    signatures = generate_signatures(args.docs, args.copies, args.seed)
+    doc_names = [f"submissions/2024/course-{i % 50:02d}/student-{i:07d}/essay.txt" for i in range(args.docs)]
+
+    lsh, lsh_memory, lsh_build = measure(lambda: build_lsh(doc_names, signatures))
+    compact, compact_memory, compact_build = measure(
+        lambda: CompactLSH.from_signatures(doc_names, signatures.copy(), num_bands=16, num_rows=8)
+    )
+
+    start = time.perf_counter()
+    lsh_pairs = sum(len(lsh.find_similar(doc_name, threshold=0.5)) for doc_name in doc_names)
+    lsh_query = time.perf_counter() - start
+    start = time.perf_counter()
+    compact_pairs = sum(len(compact.find_similar_ids(doc_idx, threshold=0.5)[0]) for doc_idx in range(args.docs))
+    compact_query = time.perf_counter() - start
+
+    print(f"{args.docs} documents, 16x8 bands")
+    print(f"{'index':>8}  {'memory MiB':>10}  {'build s':>8}  {'find_similar s':>14}  {'pairs':>6}")
+    print(f"{'LSH':>8}  {lsh_memory / 2 ** 20:>10.1f}  {lsh_build:>8.2f}  {lsh_query:>14.2f}  {lsh_pairs:>6}")
+    print(f"{'compact':>8}  {compact_memory / 2 ** 20:>10.1f}  {compact_build:>8.2f}  "
+          f"{compact_query:>14.2f}  {compact_pairs:>6}")
@@ -0,0 +1,124 @@
+import argparse
+import sys
+import time
+from itertools import combinations
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+CONFIGURATIONS = [
+    (16, 8, 0),
+    (8, 8, 0),
+    (8, 8, 8),
+    (6, 8, 8),
+    (4, 8, 8),
+]
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clusters', default=100, type=int, help='The number of groups of near-duplicate documents')
+    parser.add_argument('--cluster-size', default=3, type=int, help='The number of documents in each group')
+    parser.add_argument('--shingles', default=200, type=int, help='The number of shingles in each document')
+    parser.add_argument('--threshold', '-t', default=0.7, type=float,
+                        help='The Jaccard similarity above which a pair must be found')
+    parser.add_argument('--seed', default=7, type=int, help='The seed of the synthetic corpus')
+    return parser.parse_args()
+
+
+def generate_corpus(num_clusters: int, cluster_size: int, num_shingles: int, seed: int) -> Dict[str, Set[str]]:
+    rng = np.random.default_rng(seed)
+    corpus = {}
+    next_shingle = 0
+    for cluster_idx in range(num_clusters):
+        base = [f"s{next_shingle + i}" for i in range(num_shingles)]
+        next_shingle += num_shingles
+        for member_idx in range(cluster_size):
+            num_replaced = int(rng.integers(0, num_shingles // 3))
+            replaced = [f"s{next_shingle + i}" for i in range(num_replaced)]
+            next_shingle += num_replaced
+            corpus[f"doc_{cluster_idx}_{member_idx}"] = set(base[num_replaced:] + replaced)
+    return corpus
+
+
+def true_similar_pairs(corpus: Dict[str, Set[str]], threshold: float) -> Set[Tuple[str, str]]:
+    pairs = set()
+    for doc1, doc2 in combinations(sorted(corpus), 2):
+        if doc1.rsplit("_", 1)[0] != doc2.rsplit("_", 1)[0]:
+            continue
+        intersection = len(corpus[doc1] & corpus[doc2])
+        if intersection / (len(corpus[doc1]) + len(corpus[doc2]) - intersection) >= threshold:
+            pairs.add((doc1, doc2))
+    return pairs
+
+
+def build_minhashes(corpus: Dict[str, Set[str]], num_permutations: int) -> Dict[str, 'MinHash']:
+    minhashes = {}
+    for doc, shingles in corpus.items():
+        minhash = MinHash(num_permutations=num_permutations, track_second_minimum=True)
+        for shingle in shingles:
+            minhash.update(shingle)
+        minhashes[doc] = minhash
+    return minhashes
+
+
+def table_memory(lsh: 'LSH') -> int:
+    size = sys.getsizeof(lsh.tables)
+    for table in lsh.tables:
+        size += sys.getsizeof(table)
+        for bucket_hash, bucket in table.items():
+            size += sys.getsizeof(bucket_hash) + sys.getsizeof(bucket)
+    return size
+
+
+def signature_memory(lsh: 'LSH') -> int:
+    size = sum(signature.nbytes for signature in lsh.signatures.values())
+    if lsh.num_probes:
+        size += sum(signature.nbytes for signature in lsh.second_signatures.values())
+    return size
+
+
+def run_configuration(corpus: Dict[str, Set[str]], expected: Set[Tuple[str, str]],
+                      num_bands: int, num_rows: int, num_probes: int) -> List:
+    minhashes = build_minhashes(corpus, num_bands * num_rows)
+    lsh = LSH(num_bands=num_bands, num_rows=num_rows, num_probes=num_probes)
+    for doc, minhash in minhashes.items():
+        if not num_probes:
+            minhash.second_signature = None
+        lsh.insert(doc, minhash)
+
+    start = time.perf_counter()
+    found = set()
+    num_candidates = 0
+    for doc, minhash in minhashes.items():
+        candidates = lsh.query(minhash)
+        num_candidates += len(candidates) - 1
+        for candidate in candidates:
+            if candidate != doc:
+                found.add(tuple(sorted((doc, candidate))))
+    query_time = time.perf_counter() - start
+
+    recall = len(found & expected) / len(expected) if expected else 1.0
+    return [
+        f"{num_bands}x{num_rows}", num_probes, f"{recall:.3f}", num_candidates,
+        table_memory(lsh) // 1024, signature_memory(lsh) // 1024, f"{query_time:.3f}",
+    ]
+
+
+if __name__ == '__main__':
+    args = parse_arg()
+    corpus = generate_corpus(args.clusters, args.cluster_size, args.shingles, args.seed)
+    expected = true_similar_pairs(corpus, args.threshold)
+
+    header = ["bands x rows", "probes", "recall", "candidates", "tables KiB", "signatures KiB", "query s"]
+    rows = [header]
+    for num_bands, num_rows, num_probes in CONFIGURATIONS:
+        rows.append(run_configuration(corpus, expected, num_bands, num_rows, num_probes))
+
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(header))]
+    print(f"{len(corpus)} documents, {len(expected)} pairs with Jaccard >= {args.threshold}")
+    for row in rows:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
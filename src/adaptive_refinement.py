@@ -0,0 +1,89 @@
+from statistics import NormalDist
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+from src.exact_verification import ShingleStore
+from src.similarity_evaluator import SimilarPair
+
+
+class AdaptiveRefiner:
+    def __init__(self, shingle_store: 'ShingleStore', threshold: float = 0.5, num_permutations: int = 128,
+                 max_permutations: int = 1024, step: int = 128, confidence: float = 0.95, seed: int = 1042):
+        if max_permutations < num_permutations:
+            raise ValueError(
+                f"Max permutations must be at least {num_permutations}, got {max_permutations}"
+            )
+        if not 0 < confidence < 1:
+            raise ValueError(f"Confidence must be between 0 and 1, got {confidence}")
+        self.shingle_store = shingle_store
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.max_permutations = max_permutations
+        self.step = step
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        num_extra = max_permutations - num_permutations
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, np.iinfo(np.uint64).max, size=num_extra, dtype=np.uint64)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=num_extra, dtype=np.uint64)
+        self._extra_signatures = {}
+
+        self.num_decided = 0
+        self.num_refined = 0
+
+    @property
+    def candidate_threshold(self) -> float:
+        for matches in range(self.num_permutations + 1):
+            if self.confidence_interval(matches, self.num_permutations)[1] >= self.threshold:
+                return matches / self.num_permutations
+        return self.threshold
+
+    def confidence_interval(self, matches: int, num_permutations: int) -> Tuple[float, float]:
+        estimate = matches / num_permutations
+        z_squared = self.z ** 2
+        center = (estimate + z_squared / (2 * num_permutations)) / (1 + z_squared / num_permutations)
+        margin = self.z * np.sqrt(
+            estimate * (1 - estimate) / num_permutations + z_squared / (4 * num_permutations ** 2)
+        ) / (1 + z_squared / num_permutations)
+        return max(float(center - margin), 0.0), min(float(center + margin), 1.0)
+
+    def refine(self, pairs: Iterable['SimilarPair']) -> Iterator['SimilarPair']:
+        for pair in pairs:
+            if pair.confidence_interval is not None:
+                yield pair
+                continue
+            matches = round(pair.similarity_score * self.num_permutations)
+            num_permutations = self.num_permutations
+            low, high = self.confidence_interval(matches, num_permutations)
+            if low <= self.threshold <= high:
+                self.num_refined += 1
+            else:
+                self.num_decided += 1
+
+            while low <= self.threshold <= high and num_permutations < self.max_permutations:
+                extra_end = min(num_permutations + self.step, self.max_permutations) - self.num_permutations
+                extra_start = num_permutations - self.num_permutations
+                signature1 = self.extra_signature(pair.doc1_name, extra_end)[extra_start:extra_end]
+                signature2 = self.extra_signature(pair.doc2_name, extra_end)[extra_start:extra_end]
+                matches += int(np.count_nonzero(signature1 == signature2))
+                num_permutations = self.num_permutations + extra_end
+                low, high = self.confidence_interval(matches, num_permutations)
+
+            similarity_score = matches / num_permutations
+            if similarity_score >= self.threshold:
+                yield SimilarPair(pair.doc1_name, pair.doc2_name, similarity_score, confidence_interval=(low, high))
+
+    def extra_signature(self, doc_id: str, length: int) -> np.ndarray:
+        signature = self._extra_signatures.get(doc_id, np.empty(0, dtype=np.uint64))
+        if len(signature) < length:
+            shingles = self.shingle_store.get(doc_id)
+            a, b = self._a[len(signature):length], self._b[len(signature):length]
+            if len(shingles):
+                extension = (a[:, None] * shingles[None, :] + b[:, None]).min(axis=1)
+            else:
+                extension = np.full(len(a), np.iinfo(np.uint64).max, dtype=np.uint64)
+            signature = np.concatenate([signature, extension])
+            self._extra_signatures[doc_id] = signature
+        return signature
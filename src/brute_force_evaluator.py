@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from src.similarity_evaluator import SimilarPair
+
+
+class BruteForceEvaluator:
+    def __init__(self, doc_names: List[str], signatures: np.ndarray, threshold: float = 0.5,
+                 tile_size: int = 256, num_workers: int = 1):
+        if tile_size < 1:
+            raise ValueError(f"Tile size must be at least 1, got {tile_size}")
+        self.doc_names = doc_names
+        self.signatures = signatures
+        self.threshold = threshold
+        self.tile_size = tile_size
+        self.num_workers = max(num_workers, 1)
+
+    def get_similar_pairs(self) -> List[SimilarPair]:
+        result = list(self.iter_similar_pairs())
+        result.sort(key=lambda x: x.similarity_score, reverse=True)
+        return result
+
+    def iter_similar_pairs(self) -> Iterator[SimilarPair]:
+        tile_starts = range(0, len(self.signatures), self.tile_size)
+        tiles = [(row_start, col_start) for row_start in tile_starts for col_start in tile_starts
+                 if col_start >= row_start]
+        if self.num_workers == 1:
+            tile_results = map(self._compare_tile, tiles)
+            yield from self._to_pairs(tile_results)
+        else:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+                yield from self._to_pairs(executor.map(self._compare_tile, tiles))
+
+    def _to_pairs(self, tile_results: Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Iterator[SimilarPair]:
+        for first, second, similarities in tile_results:
+            for doc1_idx, doc2_idx, similarity in zip(first.tolist(), second.tolist(), similarities.tolist()):
+                doc1, doc2 = sorted([self.doc_names[doc1_idx], self.doc_names[doc2_idx]])
+                yield SimilarPair(doc1, doc2, similarity)
+
+    def _compare_tile(self, tile: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        row_start, col_start = tile
+        rows = self.signatures[row_start:row_start + self.tile_size]
+        cols = self.signatures[col_start:col_start + self.tile_size]
+        matches = np.zeros((len(rows), len(cols)), dtype=np.int32)
+        for position in range(self.signatures.shape[1]):
+            matches += rows[:, position, None] == cols[None, :, position]
+
+        similarities = matches / self.signatures.shape[1]
+        keep = similarities >= self.threshold
+        if row_start == col_start:
+            keep = np.triu(keep, k=1)
+        first, second = np.nonzero(keep)
+        return first + row_start, second + col_start, similarities[first, second]
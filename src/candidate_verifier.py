@@ -0,0 +1,61 @@
+import logging
+from math import comb
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CandidateVerifier:
+    def __init__(self, threshold: float = 0.5, num_permutations: int = 128, prefix_length: Optional[int] = 16,
+                 max_false_rejection: float = 0.001, set_sizes: Optional[np.ndarray] = None):
+        if prefix_length is not None and not 0 < prefix_length <= num_permutations:
+            raise ValueError(f"Prefix length must be between 1 and {num_permutations}, got {prefix_length}")
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.prefix_length = prefix_length or 0
+        self.max_false_rejection = max_false_rejection
+        self.set_sizes = set_sizes
+        self.min_prefix_matches = self._min_prefix_matches()
+        self.stage_counts = {"candidates": 0, "size": 0, "prefix": 0, "full": 0}
+
+    def verify(self, signatures: np.ndarray, left_ids: np.ndarray,
+               right_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.stage_counts["candidates"] += len(left_ids)
+
+        if self.set_sizes is not None:
+            left_sizes, right_sizes = self.set_sizes[left_ids], self.set_sizes[right_ids]
+            keep = np.minimum(left_sizes, right_sizes) >= self.threshold * np.maximum(left_sizes, right_sizes)
+            self.stage_counts["size"] += int(np.count_nonzero(~keep))
+            left_ids, right_ids = left_ids[keep], right_ids[keep]
+
+        prefix = slice(0, self.prefix_length)
+        prefix_matches = np.sum(signatures[left_ids, prefix] == signatures[right_ids, prefix], axis=1)
+        keep = prefix_matches >= self.min_prefix_matches
+        self.stage_counts["prefix"] += int(np.count_nonzero(~keep))
+        left_ids, right_ids, prefix_matches = left_ids[keep], right_ids[keep], prefix_matches[keep]
+
+        suffix = slice(self.prefix_length, self.num_permutations)
+        suffix_matches = np.sum(signatures[left_ids, suffix] == signatures[right_ids, suffix], axis=1)
+        similarities = (prefix_matches + suffix_matches) / self.num_permutations
+        keep = similarities >= self.threshold
+        self.stage_counts["full"] += int(np.count_nonzero(~keep))
+        return left_ids[keep], right_ids[keep], similarities[keep]
+
+    def log_stage_counts(self):
+        logger.info(
+            "Verified %d candidates: %d rejected by set size ratio, %d by the %d-position prefix, "
+            "%d by the full signature",
+            self.stage_counts["candidates"], self.stage_counts["size"], self.stage_counts["prefix"],
+            self.prefix_length, self.stage_counts["full"]
+        )
+
+    def _min_prefix_matches(self) -> int:
+        cumulative = 0.0
+        for matches in range(self.prefix_length + 1):
+            cumulative += (comb(self.prefix_length, matches) * self.threshold ** matches
+                           * (1 - self.threshold) ** (self.prefix_length - matches))
+            if cumulative >= self.max_false_rejection:
+                return matches
+        return self.prefix_length
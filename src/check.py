@@ -0,0 +1,44 @@
+import argparse
+
+from src.input_manager import InputManager
+from src.ngrams_generator import NGramsGenerator
+from src.min_hash_generator import MinHashGenerator
+from src.index_storage import IndexStorage
+from src.corpus_checker import CorpusChecker
+from src.output_writer import OutputWriter
+
+
+def parse_arg():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--index', '-x', required=True, type=str,
+                        help='A path to the index built with `src.main --save-index`')
+    parser.add_argument('--input', '-i', required=True, type=str,
+                        help='A path to directory with new files that need to be checked against the index')
+    parser.add_argument('--output', '-o', default='report.csv', type=str, help='A path to output file')
+    parser.add_argument('--threshold', '-t', default=0.7, type=float,
+                        help='A threshold for determining plagiarism')
+    parser.add_argument('--encoding', '-e', default='utf-8', type=str, help='The encoding name')
+    parser.add_argument('--language', '-l', default='english', type=str,
+                        help='The language of the files in the input directory')
+    parser.add_argument('--within-batch', action='store_true',
+                        help='Also report similar pairs among the new files')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_arg()
+    lsh = IndexStorage.load(args.index)
+
+    input_manager = InputManager(encoding=args.encoding, language=args.language)
+    files_tokens = input_manager.read_files(args.input)
+
+    ngrams_generator = NGramsGenerator(3)
+    ngrams = ngrams_generator.generate_ngrams_for_docs(files_tokens)
+    min_hash_generator = MinHashGenerator(num_permutations=lsh.num_permutations)
+    min_hash = min_hash_generator.generate_minhashes(ngrams)
+
+    corpus_checker = CorpusChecker(lsh, threshold=args.threshold)
+    similar_pairs = corpus_checker.check(min_hash, within_batch=args.within_batch)
+
+    output_writer = OutputWriter()
+    output_writer.write_results(args.output, similar_pairs)
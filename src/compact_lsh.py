@@ -0,0 +1,232 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+from src.locality_sensitive_hashing import HOT_BUCKET_POLICIES, LSH
+from src.min_hash_generator import MinHash
+
+logger = logging.getLogger(__name__)
+
+
+class CompactLshGenerator:
+    def __init__(self, num_bands: int, num_rows: int,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
+
+    def generate_compact_lsh(self, docs: Dict[str, 'MinHash']) -> 'CompactLSH':
+        num_permutations = self.num_bands * self.num_rows
+        for minhash in docs.values():
+            if minhash.num_permutations != num_permutations:
+                raise ValueError(
+                    f"MinHash has {minhash.num_permutations} permutations, "
+                    f"expected {num_permutations}"
+                )
+        if docs:
+            signatures = np.stack([minhash.signature for minhash in docs.values()])
+        else:
+            signatures = np.empty((0, num_permutations), dtype=np.uint64)
+        return CompactLSH.from_signatures(
+            list(docs.keys()), signatures, self.num_bands, self.num_rows,
+            max_bucket_size=self.max_bucket_size, hot_bucket_policy=self.hot_bucket_policy
+        )
+
+
+class CompactLSH:
+
+    def __init__(self, num_bands: int, num_rows: int, doc_names: List[str], signatures: np.ndarray,
+                 bucket_keys: np.ndarray, bucket_bands: np.ndarray, bucket_offsets: np.ndarray,
+                 bucket_docs: np.ndarray, max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample",
+                 doc_index: Optional[Dict[str, int]] = None):
+        if hot_bucket_policy not in HOT_BUCKET_POLICIES:
+            raise ValueError(f"Hot bucket policy must be one of {HOT_BUCKET_POLICIES}, got {hot_bucket_policy}")
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
+
+        self.doc_names = doc_names
+        self._doc_index = doc_index
+        self.signatures = signatures
+        self.bucket_keys = bucket_keys
+        self.bucket_bands = bucket_bands
+        self.bucket_offsets = bucket_offsets
+        self.bucket_docs = bucket_docs
+        self._reported_hot_buckets = set()
+
+    @property
+    def doc_index(self) -> Dict[str, int]:
+        if self._doc_index is None:
+            self._doc_index = {doc_name: doc_idx for doc_idx, doc_name in enumerate(self.doc_names)}
+        return self._doc_index
+
+    @classmethod
+    def from_signatures(cls, doc_names: List[str], signatures: np.ndarray, num_bands: int, num_rows: int,
+                        **kwargs) -> 'CompactLSH':
+        return cls(num_bands, num_rows, doc_names, signatures,
+                   *cls.build_tables(signatures, num_bands, num_rows), **kwargs)
+
+    @staticmethod
+    def build_tables(signatures: np.ndarray, num_bands: int, num_rows: int,
+                     doc_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if doc_ids is None:
+            doc_ids = np.arange(len(signatures))
+        band_keys = LSH.hash_bands(
+            signatures[doc_ids].reshape(len(doc_ids), num_bands, num_rows), np.arange(num_bands)
+        )
+        flat_keys = band_keys.ravel()
+        order = np.argsort(flat_keys, kind="stable")
+        sorted_keys = flat_keys[order]
+
+        is_start = np.ones(len(sorted_keys), dtype=bool)
+        is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        starts = np.flatnonzero(is_start)
+
+        bucket_keys = sorted_keys[starts]
+        bucket_bands = (order[starts] % num_bands).astype(np.uint16)
+        bucket_offsets = np.append(starts, len(sorted_keys)).astype(np.int64)
+        bucket_docs = np.asarray(doc_ids)[order // num_bands].astype(np.int32)
+        return bucket_keys, bucket_bands, bucket_offsets, bucket_docs
+
+    @classmethod
+    def from_lsh(cls, lsh: 'LSH') -> 'CompactLSH':
+        doc_names = list(lsh.signatures.keys())
+        if doc_names:
+            signatures = np.stack([lsh.signatures[doc_name] for doc_name in doc_names])
+        else:
+            signatures = np.empty((0, lsh.num_permutations), dtype=np.uint64)
+        return cls.from_signatures(doc_names, signatures, lsh.num_bands, lsh.num_rows,
+                                   max_bucket_size=lsh.max_bucket_size, hot_bucket_policy=lsh.hot_bucket_policy)
+
+    def query(self, minhash: 'MinHash') -> Set[str]:
+        self._check_permutations(minhash)
+        return {self.doc_names[doc_idx] for doc_idx in self.query_ids(minhash.signature)}
+
+    def query_ids(self, signature: np.ndarray) -> np.ndarray:
+        band_keys = LSH.hash_bands(signature.reshape(self.num_bands, self.num_rows), np.arange(self.num_bands))
+        return np.unique(self._bucket_members(self._find_buckets(band_keys)))
+
+    def query_many(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if signatures.ndim != 2 or signatures.shape[1] != self.num_permutations:
+            raise ValueError(
+                f"Signatures must have shape (n, {self.num_permutations}), got {signatures.shape}"
+            )
+        num_queries = len(signatures)
+        band_keys = LSH.hash_bands(
+            signatures.reshape(num_queries, self.num_bands, self.num_rows), np.arange(self.num_bands)
+        ).ravel()
+        positions = np.searchsorted(self.bucket_keys, band_keys)
+        found = positions < len(self.bucket_keys)
+        found[found] = self.bucket_keys[positions[found]] == band_keys[found]
+        owners = np.repeat(np.arange(num_queries, dtype=np.int64), self.num_bands)[found]
+
+        owners, members = self._bucket_member_pairs(positions[found], owners)
+        num_docs = max(len(self.doc_names), 1)
+        owners, members = np.divmod(np.unique(owners * num_docs + members), num_docs)
+        offsets = np.zeros(num_queries + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=num_queries), out=offsets[1:])
+        return offsets, members.astype(np.int32)
+
+    def query_similar(self, minhash: 'MinHash', threshold: float = 0.5) -> List[Tuple[str, float]]:
+        self._check_permutations(minhash)
+        return self._resolve(*self.query_similar_ids(minhash.signature, threshold))
+
+    def query_similar_ids(self, signature: np.ndarray, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        return self._verify(signature, self.query_ids(signature), threshold)
+
+    def find_similar(self, doc_id: str, threshold: float = 0.5,
+                     verifier: Optional['CandidateVerifier'] = None) -> List[Tuple[str, float]]:
+        if doc_id not in self.doc_index:
+            raise ValueError(f"Document {doc_id} not found in index")
+        return self._resolve(*self.find_similar_ids(self.doc_index[doc_id], threshold, verifier=verifier))
+
+    def find_similar_ids(self, doc_idx: int, threshold: float = 0.5,
+                         verifier: Optional['CandidateVerifier'] = None) -> Tuple[np.ndarray, np.ndarray]:
+        signature = self.signatures[doc_idx]
+        candidate_ids = self.query_ids(signature)
+        candidate_ids = candidate_ids[candidate_ids != doc_idx]
+        if verifier is None:
+            return self._verify(signature, candidate_ids, threshold)
+
+        query_ids = np.full(len(candidate_ids), doc_idx, dtype=candidate_ids.dtype)
+        _, candidate_ids, similarities = verifier.verify(self.signatures, query_ids, candidate_ids)
+        order = np.argsort(-similarities, kind="stable")
+        return candidate_ids[order], similarities[order]
+
+    def occupancy_histograms(self) -> List[Dict[int, int]]:
+        sizes = np.diff(self.bucket_offsets)
+        histograms = []
+        for band_idx in range(self.num_bands):
+            band_sizes, counts = np.unique(sizes[self.bucket_bands == band_idx], return_counts=True)
+            histograms.append(dict(zip(band_sizes.tolist(), counts.tolist())))
+        return histograms
+
+    def log_occupancy(self):
+        LSH.log_histograms(self.occupancy_histograms(), self.max_bucket_size)
+
+    def _find_buckets(self, band_keys: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(self.bucket_keys, band_keys)
+        found = positions < len(self.bucket_keys)
+        found[found] = self.bucket_keys[positions[found]] == band_keys[found]
+        return positions[found]
+
+    def _bucket_members(self, buckets: np.ndarray) -> np.ndarray:
+        return self._bucket_member_pairs(buckets, np.zeros(len(buckets), dtype=np.int64))[1]
+
+    def _bucket_member_pairs(self, buckets: np.ndarray, owners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        starts = self.bucket_offsets[buckets]
+        lengths = self.bucket_offsets[buckets + 1] - starts
+
+        hot_owners, hot_members = [], []
+        if self.max_bucket_size is not None:
+            is_hot = lengths > self.max_bucket_size
+            for owner, bucket in zip(owners[is_hot], buckets[is_hot]):
+                members = self._hot_bucket_members(bucket)
+                hot_owners.append(np.full(len(members), owner, dtype=np.int64))
+                hot_members.append(members)
+            starts, lengths, owners = starts[~is_hot], lengths[~is_hot], owners[~is_hot]
+
+        first_positions = np.cumsum(lengths) - lengths
+        indices = np.repeat(starts - first_positions, lengths) + np.arange(lengths.sum())
+        return (np.concatenate([np.repeat(owners, lengths)] + hot_owners),
+                np.concatenate([self.bucket_docs[indices]] + hot_members))
+
+    def _hot_bucket_members(self, bucket: int) -> np.ndarray:
+        members = self.bucket_docs[self.bucket_offsets[bucket]:self.bucket_offsets[bucket + 1]]
+        if bucket not in self._reported_hot_buckets:
+            self._reported_hot_buckets.add(bucket)
+            logger.warning(
+                "Bucket %d of band %d holds %d documents, more than the cap of %d; applying policy '%s'",
+                self.bucket_keys[bucket], self.bucket_bands[bucket], len(members),
+                self.max_bucket_size, self.hot_bucket_policy
+            )
+        if self.hot_bucket_policy == "skip":
+            return np.empty(0, dtype=np.int32)
+        rng = np.random.default_rng(int(self.bucket_keys[bucket]))
+        return rng.choice(np.sort(members), size=self.max_bucket_size, replace=False)
+
+    def _verify(self, signature: np.ndarray, candidate_ids: np.ndarray,
+                threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        similarities = np.sum(self.signatures[candidate_ids] == signature, axis=1) / self.num_permutations
+        keep = similarities >= threshold
+        candidate_ids, similarities = candidate_ids[keep], similarities[keep]
+        order = np.argsort(-similarities, kind="stable")
+        return candidate_ids[order], similarities[order]
+
+    def _resolve(self, candidate_ids: np.ndarray, similarities: np.ndarray) -> List[Tuple[str, float]]:
+        return [
+            (self.doc_names[doc_idx], float(similarity))
+            for doc_idx, similarity in zip(candidate_ids.tolist(), similarities.tolist())
+        ]
+
+    def _check_permutations(self, minhash: 'MinHash'):
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
@@ -0,0 +1,268 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.compact_lsh import CompactLSH, CompactLshGenerator
+from src.min_hash_generator import MinHash
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSnapshot:
+
+    def __init__(self, num_bands: int, num_rows: int, segments: Tuple[CompactLSH, ...] = (),
+                 deleted: Tuple[np.ndarray, ...] = (), segment_ids: Tuple[int, ...] = ()):
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.segments = segments
+        self.deleted = deleted
+        self.segment_ids = segment_ids
+
+    def live_counts(self) -> List[int]:
+        return [int(np.count_nonzero(~deleted)) for deleted in self.deleted]
+
+    def __len__(self) -> int:
+        return sum(self.live_counts())
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.locate(doc_id) is not None
+
+    def locate(self, doc_id: str) -> Optional[Tuple[int, int]]:
+        for segment_idx in range(len(self.segments) - 1, -1, -1):
+            doc_idx = self.segments[segment_idx].doc_index.get(doc_id)
+            if doc_idx is not None and not self.deleted[segment_idx][doc_idx]:
+                return segment_idx, doc_idx
+        return None
+
+    def query(self, minhash: 'MinHash') -> Set[str]:
+        self._check_permutations(minhash)
+        candidates = set()
+        for segment, deleted in zip(self.segments, self.deleted):
+            candidate_ids = segment.query_ids(minhash.signature)
+            candidate_ids = candidate_ids[~deleted[candidate_ids]]
+            candidates.update(segment.doc_names[doc_idx] for doc_idx in candidate_ids.tolist())
+        return candidates
+
+    def query_similar(self, minhash: 'MinHash', threshold: float = 0.5) -> List[Tuple[str, float]]:
+        self._check_permutations(minhash)
+        return self._similar(minhash.signature, threshold)
+
+    def find_similar(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        location = self.locate(doc_id)
+        if location is None:
+            raise ValueError(f"Document {doc_id} not found in index")
+        segment_idx, doc_idx = location
+        signature = self.segments[segment_idx].signatures[doc_idx]
+        return [result for result in self._similar(signature, threshold) if result[0] != doc_id]
+
+    def _similar(self, signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        results = []
+        for segment, deleted in zip(self.segments, self.deleted):
+            candidate_ids, similarities = segment.query_similar_ids(signature, threshold)
+            live = ~deleted[candidate_ids]
+            results.extend(segment._resolve(candidate_ids[live], similarities[live]))
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+    def _check_permutations(self, minhash: 'MinHash'):
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
+
+
+class ConcurrentLSH:
+
+    def __init__(self, num_bands: int, num_rows: int, batch_size: int = 1000,
+                 merge_factor: int = 4, background_compaction: bool = False):
+        if merge_factor < 2:
+            raise ValueError(f"Merge factor must be at least 2, got {merge_factor}")
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.batch_size = batch_size
+        self.merge_factor = merge_factor
+        self.background_compaction = background_compaction
+
+        self._snapshot = IndexSnapshot(num_bands, num_rows)
+        self._segment_generator = CompactLshGenerator(num_bands=num_bands, num_rows=num_rows)
+        self._pending = {}
+        self._pending_removals = set()
+        self._next_segment_id = 0
+        self._write_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread = None
+
+    def snapshot(self) -> IndexSnapshot:
+        return self._snapshot
+
+    def insert(self, doc_id: str, minhash: 'MinHash'):
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
+        with self._write_lock:
+            self._pending[doc_id] = minhash
+            self._pending_removals.discard(doc_id)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def insert_batch(self, docs: Dict[str, 'MinHash']):
+        for doc_id, minhash in docs.items():
+            self.insert(doc_id, minhash)
+        self.flush()
+
+    def remove(self, doc_id: str):
+        with self._write_lock:
+            if self._pending.pop(doc_id, None) is None and doc_id not in self._snapshot:
+                raise ValueError(f"Document {doc_id} not found in index")
+            if doc_id in self._snapshot:
+                self._pending_removals.add(doc_id)
+
+    def flush(self):
+        with self._write_lock:
+            self._flush()
+
+    def maybe_compact(self) -> bool:
+        with self._compaction_lock:
+            positions = self._select_tier(self._snapshot)
+            if positions is None:
+                return False
+            self._merge(positions)
+            return True
+
+    def compact(self):
+        self.flush()
+        with self._compaction_lock:
+            positions = list(range(len(self._snapshot.segments)))
+            if len(positions) > 1 or any(self._snapshot.deleted[idx].any() for idx in positions):
+                self._merge(positions)
+
+    def wait_for_compaction(self):
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+
+    def restore(self, segments: List['CompactLSH'], deleted: List[np.ndarray],
+                segment_ids: Optional[List[int]] = None):
+        with self._write_lock:
+            if self._snapshot.segments or self._pending:
+                raise ValueError("Segments can only be restored into an empty index")
+            for segment, mask in zip(segments, deleted):
+                if len(mask) != len(segment.doc_names):
+                    raise ValueError(f"Deletion mask has {len(mask)} entries, expected {len(segment.doc_names)}")
+                if segment.num_bands != self.num_bands or segment.num_rows != self.num_rows:
+                    raise ValueError(
+                        f"Segment has {segment.num_bands}x{segment.num_rows} bands, "
+                        f"expected {self.num_bands}x{self.num_rows}"
+                    )
+            for mask in deleted:
+                mask.flags.writeable = False
+            if segment_ids is None:
+                segment_ids = list(range(len(segments)))
+            self._next_segment_id = max(segment_ids, default=-1) + 1
+            self._snapshot = IndexSnapshot(
+                self.num_bands, self.num_rows, tuple(segments), tuple(deleted), tuple(segment_ids)
+            )
+
+    def query(self, minhash: 'MinHash') -> Set[str]:
+        return self._snapshot.query(minhash)
+
+    def query_similar(self, minhash: 'MinHash', threshold: float = 0.5) -> List[Tuple[str, float]]:
+        return self._snapshot.query_similar(minhash, threshold)
+
+    def find_similar(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        return self._snapshot.find_similar(doc_id, threshold)
+
+    def _flush(self):
+        if not self._pending and not self._pending_removals:
+            return
+        snapshot = self._snapshot
+        deleted = list(snapshot.deleted)
+        for doc_id in list(self._pending) + list(self._pending_removals):
+            location = snapshot.locate(doc_id)
+            if location is None:
+                continue
+            segment_idx, doc_idx = location
+            if deleted[segment_idx] is snapshot.deleted[segment_idx]:
+                deleted[segment_idx] = deleted[segment_idx].copy()
+            deleted[segment_idx][doc_idx] = True
+
+        segments, segment_ids = snapshot.segments, snapshot.segment_ids
+        if self._pending:
+            segments += (self._segment_generator.generate_compact_lsh(self._pending),)
+            segment_ids += (self._next_segment_id,)
+            self._next_segment_id += 1
+            deleted.append(np.zeros(len(self._pending), dtype=bool))
+        for mask in deleted:
+            mask.flags.writeable = False
+
+        self._snapshot = IndexSnapshot(self.num_bands, self.num_rows, segments, tuple(deleted), segment_ids)
+        self._pending = {}
+        self._pending_removals = set()
+
+        if self.background_compaction and self._select_tier(self._snapshot) is not None:
+            if self._compaction_thread is None or not self._compaction_thread.is_alive():
+                self._compaction_thread = threading.Thread(target=self._compact_until_stable, daemon=True)
+                self._compaction_thread.start()
+
+    def _compact_until_stable(self):
+        while self.maybe_compact():
+            pass
+
+    def _select_tier(self, snapshot: 'IndexSnapshot') -> Optional[List[int]]:
+        tiers = {}
+        for position, live_count in enumerate(snapshot.live_counts()):
+            tier = 0
+            while live_count > self.batch_size * self.merge_factor ** tier:
+                tier += 1
+            tiers.setdefault(tier, []).append(position)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= self.merge_factor:
+                return tiers[tier]
+        return None
+
+    def _merge(self, positions: List[int]):
+        snapshot = self._snapshot
+        live_rows = [np.flatnonzero(~snapshot.deleted[position]) for position in positions]
+        doc_names = [
+            snapshot.segments[position].doc_names[doc_idx]
+            for position, rows in zip(positions, live_rows) for doc_idx in rows.tolist()
+        ]
+        signatures = [snapshot.segments[position].signatures[rows] for position, rows in zip(positions, live_rows)]
+        merged = CompactLSH.from_signatures(
+            doc_names, np.concatenate(signatures), self.num_bands, self.num_rows
+        ) if doc_names else None
+
+        with self._write_lock:
+            current = self._snapshot
+            merged_segments = {id(snapshot.segments[position]) for position in positions}
+            merged_deleted = np.concatenate([
+                current.deleted[current.segments.index(snapshot.segments[position])][rows]
+                for position, rows in zip(positions, live_rows)
+            ]) if doc_names else None
+
+            segments, deleted, segment_ids = [], [], []
+            for segment, mask, segment_id in zip(current.segments, current.deleted, current.segment_ids):
+                if id(segment) in merged_segments:
+                    if merged is not None:
+                        segments.append(merged)
+                        deleted.append(merged_deleted)
+                        segment_ids.append(self._next_segment_id)
+                        self._next_segment_id += 1
+                        merged = None
+                    continue
+                segments.append(segment)
+                deleted.append(mask)
+                segment_ids.append(segment_id)
+            for mask in deleted:
+                mask.flags.writeable = False
+            self._snapshot = IndexSnapshot(
+                self.num_bands, self.num_rows, tuple(segments), tuple(deleted), tuple(segment_ids)
+            )
+        logger.info("Merged %d segments into one with %d documents", len(positions), len(doc_names))
@@ -0,0 +1,32 @@
+from typing import Dict, List, Union
+
+from src.compact_lsh import CompactLSH
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+from src.similarity_evaluator import SimilarPair, SimilarityEvaluator
+
+
+class CorpusChecker:
+    def __init__(self, lsh: Union['LSH', 'CompactLSH'], threshold: float = 0.5):
+        self.lsh = lsh
+        self.threshold = threshold
+
+    def check(self, batch: Dict[str, 'MinHash'], within_batch: bool = False) -> List[SimilarPair]:
+        result = []
+        for doc, minhash in batch.items():
+            result.extend(self._check_against_corpus(doc, minhash))
+        if within_batch:
+            result.extend(self._check_within_batch(batch))
+        result.sort(key=lambda x: x.similarity_score, reverse=True)
+        return result
+
+    def _check_against_corpus(self, doc: str, minhash: 'MinHash') -> List[SimilarPair]:
+        similarities = self.lsh.query_similar(minhash, threshold=self.threshold)
+        return [SimilarPair(doc, candidate, similarity) for candidate, similarity in similarities]
+
+    def _check_within_batch(self, batch: Dict[str, 'MinHash']) -> List[SimilarPair]:
+        batch_lsh = LSH(num_bands=self.lsh.num_bands, num_rows=self.lsh.num_rows)
+        for doc, minhash in batch.items():
+            batch_lsh.insert(doc, minhash)
+        similarity_evaluator = SimilarityEvaluator(batch_lsh, threshold=self.threshold)
+        return similarity_evaluator.get_similar_pairs(list(batch.keys()))
@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from src.similarity_evaluator import SimilarPair
+
+
+@dataclass
+class DocumentCluster:
+    members: List[str]
+    max_similarity: float
+    min_similarity: float
+
+
+class DocumentClusterer:
+    def __init__(self):
+        self.parents = {}
+        self.sizes = {}
+        self.max_similarities = {}
+        self.min_similarities = {}
+
+    def add_pairs(self, pairs: Iterable['SimilarPair']):
+        for pair in pairs:
+            self.add_pair(pair)
+
+    def add_pair(self, pair: 'SimilarPair'):
+        root1, root2 = self.find(pair.doc1_name), self.find(pair.doc2_name)
+        if root1 != root2:
+            if self.sizes[root1] < self.sizes[root2]:
+                root1, root2 = root2, root1
+            self.parents[root2] = root1
+            self.sizes[root1] += self.sizes.pop(root2)
+            self.max_similarities[root1] = max(self.max_similarities[root1], self.max_similarities.pop(root2))
+            self.min_similarities[root1] = min(self.min_similarities[root1], self.min_similarities.pop(root2))
+        self.max_similarities[root1] = max(self.max_similarities[root1], pair.similarity_score)
+        self.min_similarities[root1] = min(self.min_similarities[root1], pair.similarity_score)
+
+    def find(self, doc: str) -> str:
+        if doc not in self.parents:
+            self.parents[doc] = doc
+            self.sizes[doc] = 1
+            self.max_similarities[doc] = float("-inf")
+            self.min_similarities[doc] = float("inf")
+            return doc
+
+        root = doc
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[doc] != root:
+            self.parents[doc], doc = root, self.parents[doc]
+        return root
+
+    def get_clusters(self) -> List[DocumentCluster]:
+        members = {}
+        for doc in self.parents:
+            members.setdefault(self.find(doc), []).append(doc)
+        clusters = [
+            DocumentCluster(sorted(docs), self.max_similarities[root], self.min_similarities[root])
+            for root, docs in members.items()
+        ]
+        clusters.sort(key=lambda x: (-len(x.members), -x.max_similarity, x.members))
+        return clusters
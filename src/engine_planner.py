@@ -0,0 +1,111 @@
+import logging
+from collections import Counter
+from math import ceil
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EnginePlanner:
+    ENGINES = ("lsh", "brute-force", "ppjoin")
+
+    def __init__(self, threshold: float = 0.5, num_bands: int = 16, num_rows: int = 8,
+                 brute_force_max_docs: int = 5000, sample_size: int = 1000, vector_op_seconds: float = 3.5e-9,
+                 python_op_seconds: float = 1e-6, lsh_doc_seconds: float = 2e-4, seed: int = 42):
+        self.threshold = threshold
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.brute_force_max_docs = brute_force_max_docs
+        self.sample_size = sample_size
+        self.vector_op_seconds = vector_op_seconds
+        self.python_op_seconds = python_op_seconds
+        self.lsh_doc_seconds = lsh_doc_seconds
+        self.seed = seed
+
+        self.num_docs = 0
+        self.set_sizes = np.empty(0, dtype=np.int64)
+        self.estimates = {}
+        self.engine = None
+
+    def plan(self, signatures: np.ndarray, set_sizes: np.ndarray,
+             ngrams: Optional[Dict[str, List[Tuple[str, ...]]]] = None, engines: Sequence[str] = ENGINES) -> str:
+        unknown = [engine for engine in engines if engine not in self.ENGINES]
+        if unknown:
+            raise ValueError(f"Unknown engines: {', '.join(unknown)}")
+        self.num_docs = len(signatures)
+        self.set_sizes = set_sizes
+        rng = np.random.default_rng(self.seed)
+
+        self.estimates = {}
+        if "lsh" in engines:
+            self.estimates["lsh"] = self._lsh_estimate(signatures, rng)
+        if "brute-force" in engines and self.num_docs <= self.brute_force_max_docs:
+            self.estimates["brute-force"] = (
+                self._num_pairs() * self.num_permutations * self.vector_op_seconds, 1.0
+            )
+        if "ppjoin" in engines and ngrams is not None:
+            self.estimates["ppjoin"] = self._ppjoin_estimate(ngrams, rng)
+        if not self.estimates:
+            raise ValueError(f"None of the engines {', '.join(engines)} can run on this corpus")
+
+        choices = [engine for engine in self.estimates if not (engine == "lsh" and "brute-force" in self.estimates)]
+        self.engine = min(choices, key=lambda engine: self.estimates[engine][0] / self.estimates[engine][1])
+        return self.engine
+
+    def log_plan(self):
+        if len(self.set_sizes):
+            logger.info("Planning for %d documents with median %d and max %d distinct n-grams at threshold %.2f",
+                        self.num_docs, np.median(self.set_sizes), np.max(self.set_sizes), self.threshold)
+        for engine, (cost, recall) in self.estimates.items():
+            logger.info("%s: estimated %.3g s, recall %.3f, %.3g s per unit of recall",
+                        engine, cost, recall, cost / recall)
+        if "brute-force" in self.estimates and "lsh" in self.estimates:
+            logger.info("brute-force is preferred over lsh for corpora of at most %d documents",
+                        self.brute_force_max_docs)
+        logger.info("Chose the %s engine", self.engine)
+
+    def lsh_recall(self) -> float:
+        similarities = np.linspace(self.threshold, 1.0, 101)
+        return float(self._collision_probability(similarities).mean())
+
+    def _lsh_estimate(self, signatures: np.ndarray, rng: np.random.Generator) -> Tuple[float, float]:
+        num_pairs = self._num_pairs()
+        if num_pairs:
+            num_samples = min(self.sample_size, num_pairs)
+            first = rng.integers(0, self.num_docs, size=num_samples)
+            second = (first + rng.integers(1, self.num_docs, size=num_samples)) % self.num_docs
+            similarities = np.mean(signatures[first] == signatures[second], axis=1)
+            num_candidates = num_pairs * float(self._collision_probability(similarities).mean())
+        else:
+            num_candidates = 0.0
+        cost = (self.num_docs * self.lsh_doc_seconds
+                + num_candidates * self.num_permutations * self.vector_op_seconds)
+        return cost, self.lsh_recall()
+
+    def _ppjoin_estimate(self, ngrams: Dict[str, List[Tuple[str, ...]]],
+                         rng: np.random.Generator) -> Tuple[float, float]:
+        doc_ngrams = list(ngrams.values())
+        num_docs = len(doc_ngrams)
+        sample = rng.choice(num_docs, size=min(self.sample_size, num_docs), replace=False)
+        sample_sets = [set(doc_ngrams[doc_idx]) for doc_idx in sample]
+        sample_frequencies = Counter(ngram for ngram_set in sample_sets for ngram in ngram_set)
+        scale = num_docs / max(len(sample), 1)
+
+        num_probes = 0.0
+        for ngram_set in sample_sets:
+            frequencies = np.sort(np.fromiter((sample_frequencies[ngram] for ngram in ngram_set), dtype=np.float64,
+                                              count=len(ngram_set)))
+            prefix_length = len(frequencies) - ceil(self.threshold * len(frequencies) - 1e-9) + 1
+            num_probes += float(np.sum(frequencies[:prefix_length] - 1)) * scale / 2
+        num_probes *= scale
+        mean_size = float(np.mean([len(ngram_set) for ngram_set in sample_sets])) if sample_sets else 0.0
+        return num_probes * (self.python_op_seconds + mean_size * self.vector_op_seconds), 1.0
+
+    def _collision_probability(self, similarities: np.ndarray) -> np.ndarray:
+        return 1 - (1 - similarities ** self.num_rows) ** self.num_bands
+
+    def _num_pairs(self) -> int:
+        return self.num_docs * (self.num_docs - 1) // 2
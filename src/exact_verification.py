@@ -0,0 +1,110 @@
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.min_hash_generator import MinHash
+from src.similarity_evaluator import SimilarPair
+
+
+class ShingleStore:
+
+    def __init__(self, doc_names: List[str], shingles: np.ndarray, offsets: np.ndarray, cache_size: int = 1024):
+        self.doc_names = doc_names
+        self.doc_index = {doc_name: doc_idx for doc_idx, doc_name in enumerate(doc_names)}
+        self.shingles = shingles
+        self.offsets = offsets
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+
+    @classmethod
+    def from_ngrams(cls, docs: Dict[str, List[Tuple[str, ...]]], path: Optional[str] = None,
+                    cache_size: int = 1024) -> 'ShingleStore':
+        doc_names = list(docs.keys())
+        shingle_sets = [
+            np.unique(np.array([MinHash.get_hash(ngram) for ngram in ngrams], dtype=np.uint64))
+            for ngrams in docs.values()
+        ]
+        offsets = np.zeros(len(doc_names) + 1, dtype=np.int64)
+        np.cumsum([len(shingle_set) for shingle_set in shingle_sets], out=offsets[1:])
+        shingles = np.concatenate(shingle_sets) if shingle_sets else np.empty(0, dtype=np.uint64)
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            np.save(os.path.join(path, "shingles.npy"), shingles)
+            shingles = np.load(os.path.join(path, "shingles.npy"), mmap_mode="r")
+        return cls(doc_names, shingles, offsets, cache_size=cache_size)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_index
+
+    def size(self, doc_id: str) -> int:
+        doc_idx = self._doc_idx(doc_id)
+        return int(self.offsets[doc_idx + 1] - self.offsets[doc_idx])
+
+    def get(self, doc_id: str) -> np.ndarray:
+        shingle_set = self._cache.get(doc_id)
+        if shingle_set is not None:
+            self._cache.move_to_end(doc_id)
+            self.cache_hits += 1
+            return shingle_set
+
+        self.cache_misses += 1
+        doc_idx = self._doc_idx(doc_id)
+        shingle_set = np.array(self.shingles[self.offsets[doc_idx]:self.offsets[doc_idx + 1]])
+        self._cache[doc_id] = shingle_set
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return shingle_set
+
+    def jaccard_similarity(self, doc1: str, doc2: str) -> float:
+        return self.sorted_jaccard(self.get(doc1), self.get(doc2))
+
+    @staticmethod
+    def sorted_jaccard(set1: np.ndarray, set2: np.ndarray) -> float:
+        smaller, larger = sorted([set1, set2], key=len)
+        if not len(smaller):
+            return 0.0
+        positions = np.minimum(np.searchsorted(larger, smaller), len(larger) - 1)
+        intersection = int(np.count_nonzero(larger[positions] == smaller))
+        return intersection / (len(smaller) + len(larger) - intersection)
+
+    def _doc_idx(self, doc_id: str) -> int:
+        doc_idx = self.doc_index.get(doc_id)
+        if doc_idx is None:
+            raise ValueError(f"Document {doc_id} not found in shingle store")
+        return doc_idx
+
+
+class ExactJaccardVerifier:
+    def __init__(self, shingle_store: 'ShingleStore', threshold: float = 0.5, band: float = 0.05):
+        if band < 0:
+            raise ValueError(f"Band must not be negative, got {band}")
+        self.shingle_store = shingle_store
+        self.threshold = threshold
+        self.band = band
+        self.num_verified = 0
+        self.num_rejected = 0
+
+    @property
+    def candidate_threshold(self) -> float:
+        return max(self.threshold - self.band, 0.0)
+
+    def verify(self, pairs: Iterable['SimilarPair']) -> Iterator['SimilarPair']:
+        for pair in pairs:
+            if pair.similarity_score > self.threshold + self.band:
+                yield pair
+                continue
+            if pair.similarity_score < self.candidate_threshold:
+                continue
+
+            self.num_verified += 1
+            similarity_score = self.shingle_store.jaccard_similarity(pair.doc1_name, pair.doc2_name)
+            if similarity_score >= self.threshold:
+                yield SimilarPair(pair.doc1_name, pair.doc2_name, similarity_score,
+                                  confidence_interval=(similarity_score, similarity_score))
+            else:
+                self.num_rejected += 1
@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from src.locality_sensitive_hashing import HOT_BUCKET_POLICIES, LSH
+from src.sharded_lsh import ShardedLshGenerator
+
+BAND_RECORD_DTYPE = np.dtype([("key", np.uint64), ("doc", np.int64)])
+
+
+class ExternalSorter:
+    def __init__(self, dtype: np.dtype, spill_dir: str, max_records_in_memory: int, chunk_size: int,
+                 key_field: Optional[str] = None, prefix: str = "run"):
+        self.dtype = np.dtype(dtype)
+        self.spill_dir = spill_dir
+        self.max_records_in_memory = max_records_in_memory
+        self.chunk_size = chunk_size
+        self.key_field = key_field
+        self.prefix = prefix
+
+        self.run_paths = []
+        self._buffer = []
+        self._buffered = 0
+
+    def add(self, records: np.ndarray):
+        for start in range(0, len(records), self.max_records_in_memory):
+            batch = records[start:start + self.max_records_in_memory]
+            if self._buffered + len(batch) > self.max_records_in_memory:
+                self._spill()
+            self._buffer.append(batch)
+            self._buffered += len(batch)
+            if self._buffered >= self.max_records_in_memory:
+                self._spill()
+
+    def iter_sorted_chunks(self) -> Iterator[np.ndarray]:
+        self._spill()
+        runs = [np.load(path, mmap_mode="r") for path in self.run_paths]
+        positions = [0] * len(runs)
+        buffers = [np.empty(0, dtype=self.dtype) for _ in runs]
+        read_size = min(self.chunk_size, max(self.max_records_in_memory // max(len(runs), 1), 1))
+
+        def refill(run_idx: int):
+            start = positions[run_idx]
+            chunk = np.array(runs[run_idx][start:start + read_size])
+            positions[run_idx] += len(chunk)
+            buffers[run_idx] = np.concatenate([buffers[run_idx], chunk])
+
+        for run_idx in range(len(runs)):
+            refill(run_idx)
+
+        while True:
+            active = [run_idx for run_idx in range(len(runs)) if positions[run_idx] < len(runs[run_idx])]
+            if not active:
+                remaining = self._sort(np.concatenate(buffers + [np.empty(0, dtype=self.dtype)]))
+                if len(remaining):
+                    yield remaining
+                return
+
+            bound = min(self._keys(buffers[run_idx])[-1] for run_idx in active)
+            ready = []
+            for run_idx, buffer in enumerate(buffers):
+                is_ready = self._keys(buffer) < bound
+                ready.append(buffer[is_ready])
+                buffers[run_idx] = buffer[~is_ready]
+            ready = np.concatenate(ready)
+            if len(ready):
+                yield self._sort(ready)
+
+            for run_idx in active:
+                if not len(buffers[run_idx]) or self._keys(buffers[run_idx])[-1] == bound:
+                    refill(run_idx)
+
+    def _spill(self):
+        if not self._buffered:
+            return
+        records = self._sort(np.concatenate(self._buffer))
+        path = os.path.join(self.spill_dir, f"{self.prefix}_{len(self.run_paths)}.npy")
+        np.save(path, records)
+        self.run_paths.append(path)
+        self._buffer = []
+        self._buffered = 0
+
+    def _sort(self, records: np.ndarray) -> np.ndarray:
+        return records[np.argsort(self._keys(records), kind="stable")]
+
+    def _keys(self, records: np.ndarray) -> np.ndarray:
+        return records[self.key_field] if self.key_field else records
+
+
+class ExternalBanding:
+
+    def __init__(self, num_bands: int, num_rows: int, spill_dir: Optional[str] = None,
+                 max_records_in_memory: int = 1_000_000, chunk_size: int = 65536,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
+        if hot_bucket_policy not in HOT_BUCKET_POLICIES:
+            raise ValueError(f"Hot bucket policy must be one of {HOT_BUCKET_POLICIES}, got {hot_bucket_policy}")
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.max_records_in_memory = max_records_in_memory
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
+        self.num_docs = 0
+
+        self._owns_spill_dir = spill_dir is None
+        self.spill_dir = tempfile.mkdtemp(prefix="banding_") if spill_dir is None else spill_dir
+        self._band_records = ExternalSorter(BAND_RECORD_DTYPE, self.spill_dir, max_records_in_memory, chunk_size,
+                                            key_field="key", prefix="bands")
+        self._pairs = ExternalSorter(np.int64, self.spill_dir, max_records_in_memory, chunk_size, prefix="pairs")
+
+    def __enter__(self) -> 'ExternalBanding':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_signatures(self, signatures: np.ndarray) -> np.ndarray:
+        if signatures.shape[1] != self.num_permutations:
+            raise ValueError(
+                f"Signatures have {signatures.shape[1]} permutations, "
+                f"expected {self.num_permutations}"
+            )
+        doc_ids = np.arange(self.num_docs, self.num_docs + len(signatures), dtype=np.int64)
+        self.num_docs += len(signatures)
+
+        batch_size = max(self.max_records_in_memory // self.num_bands, 1)
+        for start in range(0, len(signatures), batch_size):
+            batch = signatures[start:start + batch_size]
+            band_keys = LSH.hash_bands(
+                batch.reshape(len(batch), self.num_bands, self.num_rows), np.arange(self.num_bands)
+            )
+            records = np.empty(band_keys.size, dtype=BAND_RECORD_DTYPE)
+            records["key"] = band_keys.ravel()
+            records["doc"] = np.repeat(doc_ids[start:start + batch_size], self.num_bands)
+            self._band_records.add(records)
+        return doc_ids
+
+    def iter_candidate_pairs(self) -> Iterator[np.ndarray]:
+        num_docs = np.int64(self.num_docs)
+        num_hot_buckets = 0
+        for chunk in self._band_records.iter_sorted_chunks():
+            for records in self._pair_batches(chunk):
+                if self.max_bucket_size is None:
+                    first, second = ShardedLshGenerator.pairs_within_runs(records["key"])
+                else:
+                    first, second, num_hot = ShardedLshGenerator.capped_pairs_within_runs(
+                        records["key"], self.max_bucket_size, self.hot_bucket_policy
+                    )
+                    num_hot_buckets += num_hot
+                first, second = records["doc"][first], records["doc"][second]
+                self._pairs.add(np.minimum(first, second) * num_docs + np.maximum(first, second))
+        ShardedLshGenerator.log_hot_buckets(num_hot_buckets, self.max_bucket_size, self.hot_bucket_policy)
+
+        for packed_pairs in self._pairs.iter_sorted_chunks():
+            packed_pairs = np.unique(packed_pairs)
+            yield np.stack([packed_pairs // num_docs, packed_pairs % num_docs], axis=1)
+
+    def _pair_batches(self, records: np.ndarray) -> Iterator[np.ndarray]:
+        keys = records["key"]
+        is_start = np.ones(len(keys), dtype=bool)
+        is_start[1:] = keys[1:] != keys[:-1]
+        run_starts = np.flatnonzero(is_start)
+        run_lengths = np.diff(np.append(run_starts, len(keys)))
+        run_pairs = run_lengths * (run_lengths - 1) // 2
+        if self.max_bucket_size is not None:
+            is_hot = run_lengths > self.max_bucket_size
+            run_pairs[is_hot] = run_lengths[is_hot] * self.max_bucket_size if self.hot_bucket_policy == "sample" else 0
+        num_pairs = np.cumsum(run_pairs)
+
+        start_run, pairs_before = 0, 0
+        while start_run < len(run_starts):
+            end_run = max(int(np.searchsorted(num_pairs, pairs_before + self.max_records_in_memory, side="right")),
+                          start_run + 1)
+            end = run_starts[end_run] if end_run < len(run_starts) else len(keys)
+            yield records[run_starts[start_run]:end]
+            start_run, pairs_before = end_run, int(num_pairs[end_run - 1])
+
+    @property
+    def run_paths(self) -> List[str]:
+        return self._band_records.run_paths + self._pairs.run_paths
+
+    def close(self):
+        for path in self.run_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        if self._owns_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from src.compact_lsh import CompactLSH
+from src.concurrent_lsh import ConcurrentLSH
+from src.locality_sensitive_hashing import LSH
+from src.namespaced_index import NamespacedIndexStore, SignatureBlocks
+
+INDEX_FORMAT = "plagiarism-similarity-engine/lsh-index"
+STORE_FORMAT = "plagiarism-similarity-engine/namespaced-index"
+SEGMENTED_FORMAT = "plagiarism-similarity-engine/segmented-index"
+INDEX_VERSION = 1
+HEADER_FILE = "header.json"
+TABLE_FIELDS = ("bucket_keys", "bucket_bands", "bucket_offsets", "bucket_docs")
+
+
+class EncodedDocNames(Sequence):
+
+    def __init__(self, encoded_names: np.ndarray, num_docs: int):
+        self.encoded_names = encoded_names
+        separators = np.flatnonzero(encoded_names == 0) if num_docs else np.empty(0, dtype=np.int64)
+        self.starts = np.concatenate([[0], separators + 1])[:num_docs]
+        self.ends = np.concatenate([separators, [len(encoded_names)]])[:num_docs]
+        self.num_separators = len(separators)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, doc_idx):
+        if isinstance(doc_idx, slice):
+            return [self[i] for i in range(*doc_idx.indices(len(self)))]
+        start, end = self.starts[doc_idx], self.ends[doc_idx]
+        return self.encoded_names[start:end].tobytes().decode("utf-8")
+
+
+class IndexStorage:
+
+    @staticmethod
+    def save(index_path: str, lsh: Union['LSH', 'CompactLSH']):
+        if isinstance(lsh, LSH):
+            lsh = CompactLSH.from_lsh(lsh)
+        if not isinstance(lsh, CompactLSH):
+            raise ValueError(f"Cannot save {type(lsh).__name__} as an LSH index")
+
+        IndexStorage._prepare(index_path)
+        IndexStorage._save_docs(index_path, lsh.doc_names, lsh.signatures)
+        IndexStorage._save_tables(index_path, lsh)
+        IndexStorage._write_header(index_path, INDEX_FORMAT, {
+            "num_bands": lsh.num_bands,
+            "num_rows": lsh.num_rows,
+            "num_docs": len(lsh.doc_names),
+            "max_bucket_size": lsh.max_bucket_size,
+            "hot_bucket_policy": lsh.hot_bucket_policy,
+        })
+
+    @staticmethod
+    def load(index_path: str, mmap: bool = True) -> 'CompactLSH':
+        header = IndexStorage.read_header(index_path, INDEX_FORMAT)
+        doc_names, signatures = IndexStorage._load_docs(index_path, header, mmap)
+        return CompactLSH(
+            header["num_bands"], header["num_rows"], doc_names, signatures,
+            **IndexStorage._load_tables(index_path, mmap),
+            max_bucket_size=header["max_bucket_size"], hot_bucket_policy=header["hot_bucket_policy"]
+        )
+
+    @staticmethod
+    def save_store(store_path: str, store: 'NamespacedIndexStore'):
+        IndexStorage._prepare(store_path)
+        IndexStorage._save_doc_names(store_path, store.doc_names)
+        for block_idx, block in enumerate(store.signatures.blocks):
+            np.save(os.path.join(store_path, f"signatures_{block_idx}.npy"), np.ascontiguousarray(block))
+        namespaces = list(store.namespaces)
+        for namespace_idx, namespace in enumerate(namespaces):
+            table_path = os.path.join(store_path, "tables", str(namespace_idx))
+            os.makedirs(table_path, exist_ok=True)
+            IndexStorage._save_tables(table_path, store.namespaces[namespace])
+        IndexStorage._write_header(store_path, STORE_FORMAT, {
+            "num_bands": store.num_bands,
+            "num_rows": store.num_rows,
+            "num_docs": len(store.doc_names),
+            "max_bucket_size": store.max_bucket_size,
+            "hot_bucket_policy": store.hot_bucket_policy,
+            "namespaces": namespaces,
+            "signature_blocks": len(store.signatures.blocks),
+        })
+
+    @staticmethod
+    def load_store(store_path: str, mmap: bool = True) -> 'NamespacedIndexStore':
+        header = IndexStorage.read_header(store_path, STORE_FORMAT)
+        store = NamespacedIndexStore(
+            header["num_bands"], header["num_rows"],
+            max_bucket_size=header["max_bucket_size"], hot_bucket_policy=header["hot_bucket_policy"]
+        )
+        doc_names = IndexStorage._load_doc_names(store_path, header, mmap)
+        store.signatures = SignatureBlocks(store.num_permutations, [
+            np.load(os.path.join(store_path, f"signatures_{block_idx}.npy"), mmap_mode="r" if mmap else None)
+            for block_idx in range(header["signature_blocks"])
+        ])
+        if len(store.signatures) != header["num_docs"]:
+            raise ValueError(f"Index {store_path} is corrupted: expected {header['num_docs']} documents")
+        store.doc_names = list(doc_names)
+        store.doc_index = {doc_name: doc_idx for doc_idx, doc_name in enumerate(store.doc_names)}
+        for namespace_idx, namespace in enumerate(header["namespaces"]):
+            table_path = os.path.join(store_path, "tables", str(namespace_idx))
+            store.attach_namespace(namespace, **IndexStorage._load_tables(table_path, mmap))
+        return store
+
+    @staticmethod
+    def save_segmented(index_path: str, lsh: 'ConcurrentLSH'):
+        lsh.flush()
+        snapshot = lsh.snapshot()
+        os.makedirs(os.path.join(index_path, "segments"), exist_ok=True)
+        segment_names = [str(segment_id) for segment_id in snapshot.segment_ids]
+        for segment_name, segment, deleted in zip(segment_names, snapshot.segments, snapshot.deleted):
+            segment_path = os.path.join(index_path, "segments", segment_name)
+            if not os.path.exists(os.path.join(segment_path, HEADER_FILE)):
+                IndexStorage.save(segment_path, segment)
+            np.save(os.path.join(segment_path, "deleted.npy"), deleted)
+
+        IndexStorage._write_header(index_path, SEGMENTED_FORMAT, {
+            "num_bands": lsh.num_bands,
+            "num_rows": lsh.num_rows,
+            "segments": segment_names,
+        })
+        for segment_name in os.listdir(os.path.join(index_path, "segments")):
+            if segment_name not in segment_names:
+                shutil.rmtree(os.path.join(index_path, "segments", segment_name))
+
+    @staticmethod
+    def load_segmented(index_path: str, mmap: bool = True, **kwargs) -> 'ConcurrentLSH':
+        header = IndexStorage.read_header(index_path, SEGMENTED_FORMAT)
+        segments, deleted = [], []
+        for segment_name in header["segments"]:
+            segment_path = os.path.join(index_path, "segments", segment_name)
+            segments.append(IndexStorage.load(segment_path, mmap=mmap))
+            deleted.append(np.load(os.path.join(segment_path, "deleted.npy")))
+
+        lsh = ConcurrentLSH(header["num_bands"], header["num_rows"], **kwargs)
+        lsh.restore(segments, deleted, [int(segment_name) for segment_name in header["segments"]])
+        return lsh
+
+    @staticmethod
+    def read_header(index_path: str, index_format: str = INDEX_FORMAT) -> dict:
+        try:
+            with open(os.path.join(index_path, HEADER_FILE), encoding="utf-8") as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"{index_path} does not contain an LSH index")
+        if not isinstance(header, dict) or header.get("format") != index_format:
+            raise ValueError(f"{index_path} does not contain an LSH index of format {index_format}")
+        if header.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"Index {index_path} has format version {header.get('version')}, expected {INDEX_VERSION}"
+            )
+        return header
+
+    @staticmethod
+    def _prepare(index_path: str):
+        os.makedirs(index_path, exist_ok=True)
+        header_path = os.path.join(index_path, HEADER_FILE)
+        if os.path.exists(header_path):
+            os.remove(header_path)
+
+    @staticmethod
+    def _write_header(index_path: str, index_format: str, fields: dict):
+        header = {"format": index_format, "version": INDEX_VERSION, **fields}
+        header_path = os.path.join(index_path, HEADER_FILE)
+        with open(header_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(header, f)
+        os.replace(header_path + ".tmp", header_path)
+
+    @staticmethod
+    def _save_docs(index_path: str, doc_names: List[str], signatures: np.ndarray):
+        np.save(os.path.join(index_path, "signatures.npy"), np.ascontiguousarray(signatures))
+        IndexStorage._save_doc_names(index_path, doc_names)
+
+    @staticmethod
+    def _save_doc_names(index_path: str, doc_names: List[str]):
+        encoded_names = "\0".join(doc_names).encode("utf-8")
+        np.save(os.path.join(index_path, "doc_names.npy"), np.frombuffer(encoded_names, dtype=np.uint8))
+
+    @staticmethod
+    def _load_docs(index_path: str, header: dict, mmap: bool):
+        signatures = np.load(os.path.join(index_path, "signatures.npy"), mmap_mode="r" if mmap else None)
+        doc_names = IndexStorage._load_doc_names(index_path, header, mmap)
+        if len(signatures) != header["num_docs"]:
+            raise ValueError(f"Index {index_path} is corrupted: expected {header['num_docs']} documents")
+        return doc_names, signatures
+
+    @staticmethod
+    def _load_doc_names(index_path: str, header: dict, mmap: bool) -> 'EncodedDocNames':
+        encoded_names = np.load(os.path.join(index_path, "doc_names.npy"), mmap_mode="r" if mmap else None)
+        doc_names = EncodedDocNames(encoded_names, header["num_docs"])
+        if doc_names.num_separators != max(header["num_docs"] - 1, 0):
+            raise ValueError(f"Index {index_path} is corrupted: expected {header['num_docs']} documents")
+        return doc_names
+
+    @staticmethod
+    def _save_tables(table_path: str, lsh: 'CompactLSH'):
+        for field in TABLE_FIELDS:
+            np.save(os.path.join(table_path, f"{field}.npy"), np.ascontiguousarray(getattr(lsh, field)))
+
+    @staticmethod
+    def _load_tables(table_path: str, mmap: bool) -> Dict[str, np.ndarray]:
+        return {
+            field: np.load(os.path.join(table_path, f"{field}.npy"), mmap_mode="r" if mmap else None)
+            for field in TABLE_FIELDS
+        }
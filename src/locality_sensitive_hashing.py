@@ -1,18 +1,31 @@
-import hashlib
-from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+import heapq
+import logging
+import random
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 
 from src.min_hash_generator import MinHash
 
+logger = logging.getLogger(__name__)
+
+HOT_BUCKET_POLICIES = ("sample", "skip")
+BAND_HASH_SEED = np.uint64(0x9E3779B97F4A7C15)
+
+
 class LshGenerator:
-    def __init__(self, num_bands: int, num_rows: int):
+    def __init__(self, num_bands: int, num_rows: int, num_probes: int = 0,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
         self.num_bands = num_bands
         self.num_rows = num_rows
+        self.num_probes = num_probes
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
 
     def generate_lsh(self, docs: Dict[str, 'MinHash']) -> 'LSH':
-        lsh = LSH(num_bands=self.num_bands, num_rows=self.num_rows)
+        lsh = LSH(num_bands=self.num_bands, num_rows=self.num_rows, num_probes=self.num_probes,
+                  max_bucket_size=self.max_bucket_size, hot_bucket_policy=self.hot_bucket_policy)
         for doc, minhash in docs.items():
             lsh.insert(doc, minhash)
         return lsh
@@ -20,13 +33,24 @@ class LshGenerator:
 
 class LSH:
 
-    def __init__(self, num_bands: int, num_rows: int):
+    def __init__(self, num_bands: int, num_rows: int, compaction_interval: int = 1000, num_probes: int = 0,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
+        if hot_bucket_policy not in HOT_BUCKET_POLICIES:
+            raise ValueError(f"Hot bucket policy must be one of {HOT_BUCKET_POLICIES}, got {hot_bucket_policy}")
         self.num_bands = num_bands
         self.num_rows = num_rows
         self.num_permutations = num_bands * num_rows
+        self.num_probes = num_probes
+        self.compaction_interval = compaction_interval
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
 
         self.tables = [defaultdict(set) for _ in range(num_bands)]
         self.signatures = {}
+        self.second_signatures = {}
+        self.doc_keys = {}
+        self.hot_buckets = {}
+        self._removals_since_compaction = 0
 
     def insert(self, doc_id: str, minhash: 'MinHash'):
         if minhash.num_permutations != self.num_permutations:
@@ -34,20 +58,121 @@ class LSH:
                 f"MinHash has {minhash.num_permutations} permutations, "
                 f"expected {self.num_permutations}"
             )
+        if doc_id in self.signatures:
+            self._remove_from_tables(doc_id)
         self.signatures[doc_id] = minhash.signature
+        if minhash.second_signature is not None:
+            self.second_signatures[doc_id] = minhash.second_signature
+        else:
+            self.second_signatures.pop(doc_id, None)
 
-        for band_idx in range(self.num_bands):
-            start = band_idx * self.num_rows
-            end = start + self.num_rows
-            band = minhash.signature[start:end]
+        bucket_keys = self._bucket_hashes(minhash.signature)
+        for band_idx, bucket_hash in enumerate(bucket_keys):
+            self.tables[band_idx][bucket_hash].add(doc_id)
+            self.hot_buckets.pop((band_idx, bucket_hash), None)
+        self.doc_keys[doc_id] = bucket_keys
 
-            bucket_hash = self.get_hash(band.tobytes())
+    def remove(self, doc_id: str):
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+        self._remove_from_tables(doc_id)
+        del self.signatures[doc_id]
+        self.second_signatures.pop(doc_id, None)
 
-            self.tables[band_idx][bucket_hash].add(doc_id)
+        self._removals_since_compaction += 1
+        if self.compaction_interval and self._removals_since_compaction >= self.compaction_interval:
+            self.compact()
+
+    def update(self, doc_id: str, minhash: 'MinHash'):
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+        self.insert(doc_id, minhash)
+
+    def compact(self):
+        self.tables = [
+            defaultdict(set, {bucket_hash: set(bucket) for bucket_hash, bucket in table.items()})
+            for table in self.tables
+        ]
+        self.signatures = dict(self.signatures)
+        self.second_signatures = dict(self.second_signatures)
+        self.doc_keys = dict(self.doc_keys)
+        self._removals_since_compaction = 0
+
+    def _remove_from_tables(self, doc_id: str):
+        for band_idx, bucket_hash in enumerate(self.doc_keys.pop(doc_id)):
+            self.hot_buckets.pop((band_idx, bucket_hash), None)
+            bucket = self.tables[band_idx][bucket_hash]
+            bucket.discard(doc_id)
+            if not bucket:
+                del self.tables[band_idx][bucket_hash]
+
+    def occupancy_histograms(self) -> List[Dict[int, int]]:
+        return [dict(sorted(Counter(len(bucket) for bucket in table.values()).items())) for table in self.tables]
+
+    def log_occupancy(self):
+        self.log_histograms(self.occupancy_histograms(), self.max_bucket_size)
+
+    @staticmethod
+    def log_histograms(histograms: List[Dict[int, int]], max_bucket_size: Optional[int]):
+        for band_idx, histogram in enumerate(histograms):
+            num_hot = sum(
+                count for size, count in histogram.items()
+                if max_bucket_size is not None and size > max_bucket_size
+            )
+            logger.info(
+                "Band %d: %d buckets, largest holds %d documents, %d over the cap; sizes %s",
+                band_idx, sum(histogram.values()), max(histogram, default=0), num_hot, histogram
+            )
+
+    def _bucket_members(self, band_idx: int, bucket_hash: int) -> Iterable[str]:
+        bucket = self.tables[band_idx].get(bucket_hash, ())
+        if self.max_bucket_size is None or len(bucket) <= self.max_bucket_size:
+            return bucket
+
+        members = self.hot_buckets.get((band_idx, bucket_hash))
+        if members is None:
+            logger.warning(
+                "Bucket %d of band %d holds %d documents, more than the cap of %d; applying policy '%s'",
+                bucket_hash, band_idx, len(bucket), self.max_bucket_size, self.hot_bucket_policy
+            )
+            if self.hot_bucket_policy == "skip":
+                members = ()
+            else:
+                members = tuple(random.Random(int(bucket_hash)).sample(sorted(bucket), self.max_bucket_size))
+            self.hot_buckets[(band_idx, bucket_hash)] = members
+        return members
+
+    def _bucket_hashes(self, signature: np.ndarray) -> List[int]:
+        bands = signature.reshape(self.num_bands, self.num_rows)
+        return self.hash_bands(bands, np.arange(self.num_bands)).tolist()
+
+    def _probe_hashes(self, minhash: 'MinHash', max_probes: int) -> List[Tuple[int, int]]:
+        bands = minhash.signature.reshape(self.num_bands, self.num_rows)
+        second_bands = minhash.second_signature.reshape(self.num_bands, self.num_rows)
+
+        rows = np.argsort(second_bands - bands, axis=1, kind="stable")[:, :max_probes]
+        band_indices = np.repeat(np.arange(self.num_bands), rows.shape[1])
+        rows = rows.ravel()
+        has_second = second_bands[band_indices, rows] != np.iinfo(np.uint64).max
+        band_indices, rows = band_indices[has_second], rows[has_second]
+
+        probes = bands[band_indices]
+        probes[np.arange(len(rows)), rows] = second_bands[band_indices, rows]
+        return list(zip(band_indices.tolist(), self.hash_bands(probes, band_indices).tolist()))
 
     @staticmethod
-    def get_hash(x: bytes):
-        return np.uint64(int(hashlib.blake2b(str(x).encode(), digest_size=8).hexdigest(), 16))
+    def hash_bands(bands: np.ndarray, band_indices: np.ndarray) -> np.ndarray:
+        seeds = LSH._mix(BAND_HASH_SEED + np.asarray(band_indices, dtype=np.uint64))
+        keys = np.broadcast_to(seeds, bands.shape[:-1]).copy()
+        for row in range(bands.shape[-1]):
+            keys = LSH._mix(keys ^ bands[..., row])
+        return keys
+
+    @staticmethod
+    def _mix(x: np.ndarray) -> np.ndarray:
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
 
     def query(self, minhash: 'MinHash') -> Set[str]:
         if minhash.num_permutations != self.num_permutations:
@@ -58,18 +183,34 @@ class LSH:
 
         candidates = set()
 
-        for band_idx in range(self.num_bands):
-            start = band_idx * self.num_rows
-            end = start + self.num_rows
-            band = minhash.signature[start:end]
+        for band_idx, bucket_hash in enumerate(self._bucket_hashes(minhash.signature)):
+            candidates.update(self._bucket_members(band_idx, bucket_hash))
 
-            bucket_hash = self.get_hash(band.tobytes())
-
-            if bucket_hash in self.tables[band_idx]:
-                candidates.update(self.tables[band_idx][bucket_hash])
+        if self.num_probes and minhash.second_signature is not None:
+            for band_idx, bucket_hash in self._probe_hashes(minhash, self.num_probes):
+                candidates.update(self._bucket_members(band_idx, bucket_hash))
 
         return candidates
 
+    def query_many(self, signatures: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        if signatures.ndim != 2 or signatures.shape[1] != self.num_permutations:
+            raise ValueError(
+                f"Signatures must have shape (n, {self.num_permutations}), got {signatures.shape}"
+            )
+        band_keys = self.hash_bands(
+            signatures.reshape(len(signatures), self.num_bands, self.num_rows), np.arange(self.num_bands)
+        ).tolist()
+
+        offsets = np.zeros(len(signatures) + 1, dtype=np.int64)
+        candidate_ids = []
+        for query_idx, query_keys in enumerate(band_keys):
+            candidates = set()
+            for band_idx, bucket_hash in enumerate(query_keys):
+                candidates.update(self._bucket_members(band_idx, bucket_hash))
+            candidate_ids.extend(sorted(candidates))
+            offsets[query_idx + 1] = len(candidate_ids)
+        return offsets, candidate_ids
+
     def find_similar(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
         if doc_id not in self.signatures:
             raise ValueError(f"Document {doc_id} not found in index")
@@ -77,19 +218,77 @@ class LSH:
         query_signature = self.signatures[doc_id]
         query_minhash = MinHash(num_permutations=self.num_permutations)
         query_minhash.signature = query_signature
+        query_minhash.second_signature = self.second_signatures.get(doc_id)
 
         candidates = self.query(query_minhash)
         candidates.discard(doc_id)
+        return self._verify(query_signature, candidates, threshold)
 
-        results = []
-        for candidate_id in candidates:
-            candidate_minhash = MinHash(num_permutations=self.num_permutations)
-            candidate_minhash.signature = self.signatures[candidate_id]
+    def query_similar(self, minhash: 'MinHash', threshold: float = 0.5) -> List[Tuple[str, float]]:
+        candidates = self.query(minhash)
+        return self._verify(minhash.signature, candidates, threshold)
 
-            similarity = query_minhash.jaccard_similarity(candidate_minhash)
-
-            if similarity >= threshold:
-                results.append((candidate_id, similarity))
+    def _verify(self, signature: np.ndarray, candidates: Set[str], threshold: float) -> List[Tuple[str, float]]:
+        if not candidates:
+            return []
+        candidate_ids = list(candidates)
+        candidate_signatures = np.stack([self.signatures[candidate_id] for candidate_id in candidate_ids])
+        similarities = np.sum(candidate_signatures == signature, axis=1) / self.num_permutations
 
+        results = [
+            (candidate_id, float(similarity))
+            for candidate_id, similarity in zip(candidate_ids, similarities)
+            if similarity >= threshold
+        ]
         results.sort(key=lambda x: x[1], reverse=True)
-        return results
\ No newline at end of file
+        return results
+
+    def query_top_k(self, minhash: 'MinHash', k: int, max_probes: Optional[int] = None) -> List[Tuple[str, float]]:
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
+        return self._top_k(minhash, k, max_probes)
+
+    def find_top_k(self, doc_id: str, k: int, max_probes: Optional[int] = None) -> List[Tuple[str, float]]:
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+
+        query_minhash = MinHash(num_permutations=self.num_permutations)
+        query_minhash.signature = self.signatures[doc_id]
+        query_minhash.second_signature = self.second_signatures.get(doc_id)
+        return self._top_k(query_minhash, k, max_probes, exclude=doc_id)
+
+    def _top_k(self, minhash: 'MinHash', k: int, max_probes: Optional[int],
+               exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        if k <= 0:
+            return []
+
+        collisions = Counter()
+        for band_idx, bucket_hash in enumerate(self._bucket_hashes(minhash.signature)):
+            collisions.update(self._bucket_members(band_idx, bucket_hash))
+        collisions.pop(exclude, None)
+
+        if len(collisions) < k and minhash.second_signature is not None:
+            if max_probes is None:
+                max_probes = self.num_rows
+            for band_idx, bucket_hash in self._probe_hashes(minhash, max_probes):
+                for candidate_id in self._bucket_members(band_idx, bucket_hash):
+                    collisions[candidate_id] += 0
+            collisions.pop(exclude, None)
+
+        heap = []
+        for candidate_id, num_collisions in collisions.most_common():
+            if len(heap) == k and heap[0][0] >= self._similarity_upper_bound(num_collisions):
+                break
+            similarity = float(np.sum(self.signatures[candidate_id] == minhash.signature) / self.num_permutations)
+            if len(heap) < k:
+                heapq.heappush(heap, (similarity, candidate_id))
+            elif similarity > heap[0][0]:
+                heapq.heapreplace(heap, (similarity, candidate_id))
+
+        return [(candidate_id, similarity) for similarity, candidate_id in sorted(heap, reverse=True)]
+
+    def _similarity_upper_bound(self, num_collisions: int) -> float:
+        return 1 - (self.num_bands - num_collisions) / self.num_permutations
@@ -0,0 +1,145 @@
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from src.lsh_forest import LSHForest
+from src.min_hash_generator import MinHash
+
+
+class LshEnsembleGenerator:
+    def __init__(self, num_partitions: int, num_trees: int, max_depth: int):
+        self.num_partitions = num_partitions
+        self.num_trees = num_trees
+        self.max_depth = max_depth
+
+    def generate_lsh_ensemble(self, docs: Dict[str, 'MinHash'], sizes: Dict[str, int]) -> 'LSHEnsemble':
+        ensemble = LSHEnsemble(num_partitions=self.num_partitions, num_trees=self.num_trees, max_depth=self.max_depth)
+        for doc, minhash in docs.items():
+            ensemble.insert(doc, minhash, sizes[doc])
+        ensemble.index()
+        return ensemble
+
+
+class LSHEnsemble:
+
+    def __init__(self, num_partitions: int = 8, num_trees: int = 16, max_depth: int = 8,
+                 false_positive_weight: float = 0.5, false_negative_weight: float = 0.5):
+        if num_partitions < 1:
+            raise ValueError(f"Number of partitions must be at least 1, got {num_partitions}")
+        self.num_partitions = num_partitions
+        self.num_trees = num_trees
+        self.max_depth = max_depth
+        self.num_permutations = num_trees * max_depth
+        self.false_positive_weight = false_positive_weight
+        self.false_negative_weight = false_negative_weight
+
+        self.signatures = {}
+        self.sizes = {}
+        self.partitions = []
+        self.upper_bounds = []
+        self._params_cache = {}
+        self._indexed = False
+
+    def insert(self, doc_id: str, minhash: 'MinHash', size: int):
+        self._check_permutations(minhash)
+        if size <= 0:
+            raise ValueError(f"Size of document {doc_id} must be positive, got {size}")
+        self.signatures[doc_id] = minhash.signature
+        self.sizes[doc_id] = size
+        self._indexed = False
+
+    def index(self):
+        doc_ids = sorted(self.sizes, key=self.sizes.get)
+        self.partitions = []
+        self.upper_bounds = []
+        num_partitions = min(self.num_partitions, len(doc_ids))
+        for partition_ids in np.array_split(np.array(doc_ids, dtype=object), num_partitions) if doc_ids else []:
+            forest = LSHForest(num_trees=self.num_trees, max_depth=self.max_depth)
+            forest.signatures = {doc_id: self.signatures[doc_id] for doc_id in partition_ids}
+            forest.index()
+            self.partitions.append(forest)
+            self.upper_bounds.append(self.sizes[partition_ids[-1]])
+        self._indexed = True
+
+    def query(self, minhash: 'MinHash', size: int, threshold: float) -> Set[str]:
+        self._check_permutations(minhash)
+        return self._candidates(minhash.signature, size, threshold)
+
+    def query_containment(self, minhash: 'MinHash', size: int, threshold: float) -> List[Tuple[str, float]]:
+        self._check_permutations(minhash)
+        return self._verify(minhash.signature, size, self._candidates(minhash.signature, size, threshold), threshold)
+
+    def find_containing(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+        signature, size = self.signatures[doc_id], self.sizes[doc_id]
+        candidates = self._candidates(signature, size, threshold)
+        candidates.discard(doc_id)
+        return self._verify(signature, size, candidates, threshold)
+
+    def optimal_params(self, jaccard_threshold: float) -> Tuple[int, int]:
+        key = round(jaccard_threshold, 2)
+        if key not in self._params_cache:
+            similarities = np.linspace(0.0, 1.0, 201)
+            num_trees = np.arange(1, self.num_trees + 1)[:, None, None]
+            depths = np.arange(1, self.max_depth + 1)[None, :, None]
+            collision = 1 - (1 - similarities ** depths) ** num_trees
+
+            below = similarities <= key
+            false_positives = np.where(below, collision, 0.0).mean(axis=-1)
+            false_negatives = np.where(below, 0.0, 1 - collision).mean(axis=-1)
+            error = self.false_positive_weight * false_positives + self.false_negative_weight * false_negatives
+            tree_idx, depth_idx = np.unravel_index(np.argmin(error), error.shape)
+            self._params_cache[key] = (int(tree_idx) + 1, int(depth_idx) + 1)
+        return self._params_cache[key]
+
+    @staticmethod
+    def jaccard_threshold(containment: float, query_size: int, doc_size: int) -> float:
+        overlap = containment * query_size
+        return overlap / (query_size + doc_size - overlap)
+
+    @staticmethod
+    def containment(jaccard: np.ndarray, query_size: int, doc_sizes: np.ndarray) -> np.ndarray:
+        overlap = jaccard * (query_size + doc_sizes) / (1 + jaccard)
+        return np.minimum(overlap / query_size, 1.0)
+
+    def _candidates(self, signature: np.ndarray, size: int, threshold: float) -> Set[str]:
+        if size <= 0:
+            raise ValueError(f"Query size must be positive, got {size}")
+        self._ensure_indexed()
+        candidates = set()
+        for forest, upper_bound in zip(self.partitions, self.upper_bounds):
+            if upper_bound < threshold * size:
+                continue
+            num_trees, depth = self.optimal_params(self.jaccard_threshold(threshold, size, upper_bound))
+            positions = forest._candidate_positions(signature, depth, num_trees)
+            candidates.update(forest._doc_ids[position] for position in positions)
+        return candidates
+
+    def _verify(self, signature: np.ndarray, size: int, candidates: Set[str],
+                threshold: float) -> List[Tuple[str, float]]:
+        if not candidates:
+            return []
+        candidate_ids = list(candidates)
+        matrix = np.stack([self.signatures[doc_id] for doc_id in candidate_ids])
+        jaccard = np.sum(matrix == signature, axis=1) / self.num_permutations
+        doc_sizes = np.array([self.sizes[doc_id] for doc_id in candidate_ids])
+        containments = self.containment(jaccard, size, doc_sizes)
+        results = [
+            (doc_id, float(containment))
+            for doc_id, containment in zip(candidate_ids, containments)
+            if containment >= threshold
+        ]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+    def _ensure_indexed(self):
+        if not self._indexed:
+            self.index()
+
+    def _check_permutations(self, minhash: 'MinHash'):
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
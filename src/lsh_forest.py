@@ -0,0 +1,155 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.min_hash_generator import MinHash
+
+
+class LshForestGenerator:
+    def __init__(self, num_trees: int, max_depth: int):
+        self.num_trees = num_trees
+        self.max_depth = max_depth
+
+    def generate_lsh_forest(self, docs: Dict[str, 'MinHash']) -> 'LSHForest':
+        forest = LSHForest(num_trees=self.num_trees, max_depth=self.max_depth)
+        for doc, minhash in docs.items():
+            forest.insert(doc, minhash)
+        forest.index()
+        return forest
+
+
+class LSHForest:
+
+    def __init__(self, num_trees: int = 16, max_depth: int = 8, min_recall: float = 0.9):
+        self.num_trees = num_trees
+        self.max_depth = max_depth
+        self.num_permutations = num_trees * max_depth
+        self.min_recall = min_recall
+
+        self.signatures = {}
+        self._doc_ids = []
+        self._positions = {}
+        self._matrix = np.empty((0, self.num_permutations), dtype=np.uint64)
+        self._sorted_keys = []
+        self._sorted_positions = []
+        self._indexed = False
+
+    def insert(self, doc_id: str, minhash: 'MinHash'):
+        self._check_permutations(minhash)
+        self.signatures[doc_id] = minhash.signature
+        self._indexed = False
+
+    def index(self):
+        self._doc_ids = list(self.signatures.keys())
+        self._positions = {doc_id: position for position, doc_id in enumerate(self._doc_ids)}
+        if self._doc_ids:
+            self._matrix = np.stack([self.signatures[doc_id] for doc_id in self._doc_ids])
+        else:
+            self._matrix = np.empty((0, self.num_permutations), dtype=np.uint64)
+
+        self._sorted_keys = []
+        self._sorted_positions = []
+        for tree_idx in range(self.num_trees):
+            start = tree_idx * self.max_depth
+            end = start + self.max_depth
+            keys = self._matrix[:, start:end]
+            order = np.lexsort(keys.T[::-1])
+            self._sorted_keys.append(np.ascontiguousarray(keys[order].T))
+            self._sorted_positions.append(order)
+        self._indexed = True
+
+    def query(self, minhash: 'MinHash', depth: int, num_trees: Optional[int] = None) -> Set[str]:
+        self._check_permutations(minhash)
+        positions = self._candidate_positions(minhash.signature, depth, num_trees)
+        return {self._doc_ids[position] for position in positions}
+
+    def query_threshold(self, minhash: 'MinHash', threshold: float) -> List[Tuple[str, float]]:
+        self._check_permutations(minhash)
+        positions = self._candidate_positions(minhash.signature, self.depth_for_threshold(threshold))
+        return self._verify(minhash.signature, positions, threshold)
+
+    def query_top_k(self, minhash: 'MinHash', k: int) -> List[Tuple[str, float]]:
+        self._check_permutations(minhash)
+        return self._top_k(minhash.signature, k)
+
+    def find_similar(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+        signature = self.signatures[doc_id]
+        positions = self._candidate_positions(signature, self.depth_for_threshold(threshold))
+        return [result for result in self._verify(signature, positions, threshold) if result[0] != doc_id]
+
+    def find_top_k(self, doc_id: str, k: int) -> List[Tuple[str, float]]:
+        if doc_id not in self.signatures:
+            raise ValueError(f"Document {doc_id} not found in index")
+        return self._top_k(self.signatures[doc_id], k, exclude=doc_id)
+
+    def depth_for_threshold(self, threshold: float) -> int:
+        for depth in range(self.max_depth, 0, -1):
+            collision_probability = 1 - (1 - threshold ** depth) ** self.num_trees
+            if collision_probability >= self.min_recall:
+                return depth
+        return 1
+
+    def _top_k(self, signature: np.ndarray, k: int, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        if k <= 0:
+            return []
+        self._ensure_indexed()
+
+        positions = np.empty(0, dtype=np.int64)
+        for depth in range(self.max_depth, 0, -1):
+            positions = self._candidate_positions(signature, depth)
+            if exclude is not None:
+                positions = positions[positions != self._positions[exclude]]
+            if len(positions) >= k:
+                break
+
+        return self._verify(signature, positions, threshold=0.0)[:k]
+
+    def _candidate_positions(self, signature: np.ndarray, depth: int,
+                             num_trees: Optional[int] = None) -> np.ndarray:
+        if not 1 <= depth <= self.max_depth:
+            raise ValueError(f"Depth must be between 1 and {self.max_depth}, got {depth}")
+        self._ensure_indexed()
+        if num_trees is None:
+            num_trees = self.num_trees
+
+        matches = []
+        for tree_idx in range(num_trees):
+            prefix = signature[tree_idx * self.max_depth:tree_idx * self.max_depth + depth]
+            lo, hi = self._prefix_range(self._sorted_keys[tree_idx], prefix)
+            matches.append(self._sorted_positions[tree_idx][lo:hi])
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(matches))
+
+    @staticmethod
+    def _prefix_range(sorted_keys: np.ndarray, prefix: np.ndarray) -> Tuple[int, int]:
+        lo, hi = 0, sorted_keys.shape[1]
+        for column, value in zip(sorted_keys, prefix):
+            if lo == hi:
+                break
+            keys = column[lo:hi]
+            lo, hi = lo + np.searchsorted(keys, value, side="left"), lo + np.searchsorted(keys, value, side="right")
+        return int(lo), int(hi)
+
+    def _verify(self, signature: np.ndarray, positions: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        similarities = np.sum(self._matrix[positions] == signature, axis=1) / self.num_permutations
+        results = [
+            (self._doc_ids[position], float(similarity))
+            for position, similarity in zip(positions, similarities)
+            if similarity >= threshold
+        ]
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+    def _ensure_indexed(self):
+        if not self._indexed:
+            self.index()
+
+    def _check_permutations(self, minhash: 'MinHash'):
+        if minhash.num_permutations != self.num_permutations:
+            raise ValueError(
+                f"MinHash has {minhash.num_permutations} permutations, "
+                f"expected {self.num_permutations}"
+            )
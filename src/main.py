@@ -1,11 +1,27 @@
 import argparse
+import logging
+from contextlib import ExitStack
+from typing import List
+
+import numpy as np
 
 from src.input_manager import InputManager
 from src.ngrams_generator import NGramsGenerator
 from src.min_hash_generator import MinHashGenerator
-from src.locality_sensitive_hashing import LshGenerator
-from src.similarity_evaluator import SimilarityEvaluator
+from src.compact_lsh import CompactLSH, CompactLshGenerator
+from src.sharded_lsh import ShardedLshGenerator
+from src.external_banding import ExternalBanding
+from src.similarity_evaluator import SignaturePairEvaluator, SimilarityEvaluator
+from src.brute_force_evaluator import BruteForceEvaluator
+from src.pair_sorter import SimilarPairSorter
+from src.exact_verification import ExactJaccardVerifier, ShingleStore
+from src.adaptive_refinement import AdaptiveRefiner
+from src.candidate_verifier import CandidateVerifier
+from src.set_similarity_join import SetSimilarityJoin
+from src.engine_planner import EnginePlanner
+from src.document_clusterer import DocumentClusterer
 from src.output_writer import OutputWriter
+from src.index_storage import IndexStorage
 
 
 def parse_arg():
@@ -18,11 +34,74 @@ def parse_arg():
     parser.add_argument('--encoding', '-e', default='utf-8', type=str, help='The encoding name')
     parser.add_argument('--language', '-l', default='english', type=str,
                         help='The language of the files in the input directory')
-    return parser.parse_args()
+    parser.add_argument('--save-index', default=None, type=str,
+                        help='A path to directory to save the built index to, for later use with `src.check`')
+    parser.add_argument('--max-bucket-size', default=None, type=int,
+                        help='The number of documents above which an LSH bucket is considered hot and sampled')
+    parser.add_argument('--workers', '-w', default=1, type=int,
+                        help='The number of workers that build LSH shards and generate candidate pairs, '
+                             'or compare signature tiles in brute-force mode')
+    parser.add_argument('--max-records-in-memory', default=None, type=int,
+                        help='Band the corpus on disk, keeping at most this many band records in memory')
+    parser.add_argument('--spill-dir', default=None, type=str,
+                        help='A path to directory for the sorted spill files of disk-based banding and pair sorting')
+    parser.add_argument('--unsorted', action='store_true',
+                        help='Write similar pairs as they are found instead of sorting them by similarity')
+    parser.add_argument('--max-pairs-in-memory', default=1_000_000, type=int,
+                        help='Sort similar pairs on disk once more than this many are found, keeping at most this many '
+                             'pairs in memory')
+    parser.add_argument('--exact-band', default=None, type=float,
+                        help='Recompute exact Jaccard similarity for pairs within this distance of the threshold')
+    parser.add_argument('--refine-max-permutations', default=None, type=int,
+                        help='Add permutations to pairs whose confidence interval contains the threshold, '
+                             'up to this many, and report the intervals')
+    parser.add_argument('--prefix-length', default=None, type=int,
+                        help='Discard candidates whose first signature positions show they cannot reach '
+                             'the threshold before comparing full signatures')
+    parser.add_argument('--size-filter', action='store_true',
+                        help='Skip candidate pairs whose n-gram set sizes are too different to reach the threshold')
+    parser.add_argument('--engine', default='auto', choices=['auto', 'lsh', 'brute-force', 'ppjoin'],
+                        help='The similarity engine: chosen from corpus statistics, approximate MinHash LSH, '
+                             'all-pairs signature comparison or an exact prefix-filtered set join')
+    parser.add_argument('--brute-force-max-docs', default=5000, type=int,
+                        help='The largest corpus for which the automatic engine choice considers comparing '
+                             'all signatures directly')
+    parser.add_argument('--cluster', action='store_true',
+                        help='Write one row per group of connected similar documents instead of one row per pair')
+    args = parser.parse_args()
+    if args.max_records_in_memory and args.save_index:
+        parser.error('--save-index builds the whole index in memory and cannot be combined with '
+                     '--max-records-in-memory')
+    if args.engine == 'ppjoin' and args.refine_max_permutations is not None:
+        parser.error('--refine-max-permutations requires the lsh engine, ppjoin reports exact similarities')
+    if args.engine in ('brute-force', 'ppjoin') and lsh_only_flags(args):
+        parser.error(f'{", ".join(lsh_only_flags(args))} only apply to the lsh engine, not {args.engine}')
+    return args
+
+
+def lsh_only_flags(args: argparse.Namespace) -> List[str]:
+    flags = {
+        '--prefix-length': args.prefix_length is not None,
+        '--size-filter': args.size_filter,
+        '--max-bucket-size': args.max_bucket_size is not None,
+    }
+    return [flag for flag, is_set in flags.items() if is_set]
+
+
+def candidate_engines(args: argparse.Namespace) -> List[str]:
+    if args.engine != 'auto':
+        return [args.engine]
+    if args.max_records_in_memory or lsh_only_flags(args):
+        return ['lsh']
+    return [
+        engine for engine in EnginePlanner.ENGINES
+        if not (engine == 'ppjoin' and args.refine_max_permutations is not None)
+    ]
 
 
 if __name__ == '__main__':
     args = parse_arg()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
     input_manager = InputManager(encoding=args.encoding, language=args.language)
     files_tokens = input_manager.read_files(args.input)
     filenames = list(files_tokens.keys())
@@ -32,10 +111,111 @@ if __name__ == '__main__':
     min_hash_generator = MinHashGenerator()
     min_hash = min_hash_generator.generate_minhashes(ngrams)
 
-    lsh_generator = LshGenerator(num_bands=16, num_rows=8)
-    lsh = lsh_generator.generate_lsh(min_hash)
-    similarity_evaluator = SimilarityEvaluator(lsh, threshold=args.threshold)
-    similar_pairs = similarity_evaluator.get_similar_pairs(filenames)
+    engines = candidate_engines(args)
+    set_sizes = np.array([ngrams_generator.set_sizes[filename] for filename in filenames], dtype=np.int64)
+
+    threshold = args.threshold
+    shingle_store = None
+    if args.engine == 'ppjoin' or args.exact_band is not None or args.refine_max_permutations is not None:
+        shingle_store = ShingleStore.from_ngrams(ngrams)
+    exact_verifier = None
+    if args.exact_band is not None:
+        exact_verifier = ExactJaccardVerifier(shingle_store, threshold=args.threshold, band=args.exact_band)
+        threshold = min(threshold, exact_verifier.candidate_threshold)
+    refiner = None
+    if args.refine_max_permutations is not None:
+        refiner = AdaptiveRefiner(shingle_store, threshold=args.threshold,
+                                  num_permutations=min_hash_generator.num_permutations,
+                                  max_permutations=args.refine_max_permutations)
+        threshold = min(threshold, refiner.candidate_threshold)
+
+    engine = args.engine
+    if engine == 'auto':
+        engine_planner = EnginePlanner(threshold=threshold, num_bands=16, num_rows=8,
+                                       brute_force_max_docs=args.brute_force_max_docs)
+        engine = engine_planner.plan(min_hash_generator.stack_signatures(min_hash), set_sizes,
+                                     ngrams=ngrams, engines=engines)
+        engine_planner.log_plan()
+        if engine == 'ppjoin' and shingle_store is None:
+            shingle_store = ShingleStore.from_ngrams(ngrams)
+    candidate_verifier = None
+    if engine == 'lsh' and (args.prefix_length is not None or args.size_filter):
+        candidate_verifier = CandidateVerifier(threshold=threshold,
+                                               num_permutations=min_hash_generator.num_permutations,
+                                               prefix_length=args.prefix_length,
+                                               set_sizes=set_sizes if args.size_filter else None)
+
+    set_similarity_join = None
+    with ExitStack() as stack:
+        if engine == 'ppjoin':
+            if args.save_index:
+                IndexStorage.save(args.save_index, CompactLSH.from_signatures(
+                    filenames, min_hash_generator.stack_signatures(min_hash), 16, 8
+                ))
+            set_similarity_join = SetSimilarityJoin.from_shingle_store(shingle_store, threshold=args.threshold)
+            similar_pairs = set_similarity_join.iter_similar_pairs()
+        elif engine == 'brute-force':
+            signatures = min_hash_generator.stack_signatures(min_hash)
+            if args.save_index:
+                IndexStorage.save(args.save_index, CompactLSH.from_signatures(filenames, signatures, 16, 8,
+                                                                            max_bucket_size=args.max_bucket_size))
+            similarity_evaluator = BruteForceEvaluator(filenames, signatures, threshold=threshold,
+                                                       num_workers=args.workers)
+            similar_pairs = similarity_evaluator.iter_similar_pairs()
+        elif args.max_records_in_memory:
+            signatures = min_hash_generator.stack_signatures(min_hash)
+            banding = stack.enter_context(ExternalBanding(num_bands=16, num_rows=8, spill_dir=args.spill_dir,
+                                                          max_records_in_memory=args.max_records_in_memory,
+                                                          max_bucket_size=args.max_bucket_size))
+            banding.add_signatures(signatures)
+            similarity_evaluator = SignaturePairEvaluator(filenames, signatures, threshold=threshold,
+                                                          verifier=candidate_verifier)
+            similar_pairs = similarity_evaluator.iter_similar_pairs(banding.iter_candidate_pairs())
+        elif args.workers > 1:
+            signatures = min_hash_generator.stack_signatures(min_hash)
+            if args.save_index:
+                IndexStorage.save(args.save_index, CompactLSH.from_signatures(filenames, signatures, 16, 8,
+                                                                            max_bucket_size=args.max_bucket_size))
+            sharded_lsh_generator = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=args.workers,
+                                                        max_bucket_size=args.max_bucket_size)
+            candidate_pairs = sharded_lsh_generator.generate_candidate_pairs(signatures)
+            similarity_evaluator = SignaturePairEvaluator(filenames, signatures, threshold=threshold,
+                                                          verifier=candidate_verifier)
+            similar_pairs = similarity_evaluator.iter_similar_pairs(candidate_pairs)
+        else:
+            lsh_generator = CompactLshGenerator(num_bands=16, num_rows=8, max_bucket_size=args.max_bucket_size)
+            lsh = lsh_generator.generate_compact_lsh(min_hash)
+            if args.max_bucket_size:
+                lsh.log_occupancy()
+            if args.save_index:
+                IndexStorage.save(args.save_index, lsh)
+            similarity_evaluator = SimilarityEvaluator(lsh, threshold=threshold, verifier=candidate_verifier)
+            similar_pairs = similarity_evaluator.iter_similar_pairs(filenames)
+
+        if exact_verifier is not None:
+            similar_pairs = exact_verifier.verify(similar_pairs)
+        if refiner is not None:
+            similar_pairs = refiner.refine(similar_pairs)
+        output_writer = OutputWriter(confidence_intervals=refiner is not None)
+        if args.cluster:
+            document_clusterer = DocumentClusterer()
+            document_clusterer.add_pairs(similar_pairs)
+            output_writer.write_clusters(args.output, document_clusterer.get_clusters())
+        else:
+            if not args.unsorted:
+                pair_sorter = SimilarPairSorter(max_pairs_in_memory=args.max_pairs_in_memory,
+                                                spill_dir=args.spill_dir)
+                similar_pairs = pair_sorter.sort(similar_pairs)
+            output_writer.write_results(args.output, similar_pairs)
 
-    output_writer = OutputWriter()
-    output_writer.write_results(args.output, similar_pairs)
+    if candidate_verifier is not None:
+        candidate_verifier.log_stage_counts()
+    if set_similarity_join is not None:
+        logging.info("Set similarity join verified %d candidate pairs and found %d similar",
+                     set_similarity_join.num_candidates, set_similarity_join.num_similar)
+    if refiner is not None:
+        logging.info("Adaptive refinement decided %d pairs from the base signatures and refined %d",
+                     refiner.num_decided, refiner.num_refined)
+    if exact_verifier is not None:
+        logging.info("Exact verification checked %d pairs near the threshold and rejected %d",
+                     exact_verifier.num_verified, exact_verifier.num_rejected)
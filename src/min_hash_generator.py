@@ -5,23 +5,29 @@ import numpy as np
 
 
 class MinHashGenerator:
-    def __init__(self, num_permutations: int = 128, seed: int = 42):
+    def __init__(self, num_permutations: int = 128, seed: int = 42, track_second_minimum: bool = False):
         self.num_permutations = num_permutations
         self.seed = seed
+        self.track_second_minimum = track_second_minimum
 
     def generate_minhashes(self, docs: Dict[str, List[Tuple[str, ...]]]) -> Dict[str, 'MinHash']:
         min_hashes_dict = {}
         for doc, ngrams in docs.items():
-            min_hash = MinHash(self.num_permutations, seed=self.seed)
+            min_hash = MinHash(self.num_permutations, seed=self.seed, track_second_minimum=self.track_second_minimum)
             for ngram in ngrams:
                 min_hash.update(ngram)
             min_hashes_dict[doc] = min_hash
         return min_hashes_dict
 
+    def stack_signatures(self, minhashes: Dict[str, 'MinHash']) -> np.ndarray:
+        if not minhashes:
+            return np.empty((0, self.num_permutations), dtype=np.uint64)
+        return np.stack([minhash.signature for minhash in minhashes.values()])
+
 
 class MinHash:
 
-    def __init__(self, num_permutations: int = 128, seed: int = 42):
+    def __init__(self, num_permutations: int = 128, seed: int = 42, track_second_minimum: bool = False):
         self.num_permutations = num_permutations
         self.seed = seed
         self._rng = np.random.default_rng(self.seed)
@@ -30,10 +36,19 @@ class MinHash:
         self._b = self._rng.integers(0, np.iinfo(np.uint64).max, size=num_permutations, dtype=np.uint64)
 
         self.signature = np.full(num_permutations, np.iinfo(np.uint64).max, dtype=np.uint64)
+        self.second_signature = None
+        if track_second_minimum:
+            self.second_signature = np.full(num_permutations, np.iinfo(np.uint64).max, dtype=np.uint64)
 
     def update(self, element: Tuple[str, ...]) -> None:
         element_hash = self.get_hash(element)
         h_vals = (self._a * element_hash + self._b)
+        if self.second_signature is not None:
+            self.second_signature = np.where(
+                h_vals == self.signature,
+                self.second_signature,
+                np.minimum(self.second_signature, np.maximum(self.signature, h_vals))
+            )
         self.signature = np.minimum(self.signature, h_vals)
 
     @staticmethod
@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.compact_lsh import CompactLSH
+from src.min_hash_generator import MinHash
+
+
+class SignatureBlocks:
+
+    def __init__(self, num_permutations: int, blocks: Sequence[np.ndarray] = ()):
+        self.num_permutations = num_permutations
+        self.blocks = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        for block in blocks:
+            self.append(block)
+
+    def append(self, block: np.ndarray):
+        if block.ndim != 2 or block.shape[1] != self.num_permutations:
+            raise ValueError(f"Signatures must have shape (n, {self.num_permutations}), got {block.shape}")
+        self.blocks.append(block)
+        self.offsets = np.append(self.offsets, self.offsets[-1] + len(block))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self), self.num_permutations
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.uint64)
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        signatures = np.concatenate(self.blocks) if self.blocks else np.empty(self.shape, dtype=self.dtype)
+        return signatures if dtype is None else signatures.astype(dtype)
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            rows = self[index[0]]
+            return rows[index[1:]] if np.ndim(rows) == 1 else rows[(slice(None),) + index[1:]]
+        doc_ids = np.arange(len(self))[index] if isinstance(index, slice) else np.asarray(index)
+        block_ids = np.searchsorted(self.offsets, doc_ids, side="right") - 1
+        if doc_ids.ndim == 0:
+            return self.blocks[block_ids][doc_ids - self.offsets[block_ids]]
+
+        signatures = np.empty(doc_ids.shape + (self.num_permutations,), dtype=self.dtype)
+        for block_idx in np.unique(block_ids).tolist():
+            in_block = block_ids == block_idx
+            signatures[in_block] = self.blocks[block_idx][doc_ids[in_block] - self.offsets[block_idx]]
+        return signatures
+
+
+class NamespacedIndexStore:
+
+    def __init__(self, num_bands: int, num_rows: int,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
+
+        self.doc_names = []
+        self.doc_index = {}
+        self.signatures = SignatureBlocks(self.num_permutations)
+        self.namespaces = {}
+
+    @staticmethod
+    def qualify(namespace: str, doc_id: str) -> str:
+        return f"{namespace}/{doc_id}"
+
+    def add_namespace(self, namespace: str, docs: Dict[str, 'MinHash']):
+        if namespace in self.namespaces:
+            raise ValueError(f"Namespace {namespace} already exists")
+        if "/" in namespace:
+            raise ValueError(f"Namespace {namespace} must not contain '/'")
+        for minhash in docs.values():
+            if minhash.num_permutations != self.num_permutations:
+                raise ValueError(
+                    f"MinHash has {minhash.num_permutations} permutations, "
+                    f"expected {self.num_permutations}"
+                )
+
+        first_id = len(self.doc_names)
+        if docs:
+            self.signatures.append(np.stack([minhash.signature for minhash in docs.values()]))
+        for doc_id in docs:
+            self.doc_index[self.qualify(namespace, doc_id)] = len(self.doc_names)
+            self.doc_names.append(self.qualify(namespace, doc_id))
+
+        doc_ids = np.arange(first_id, len(self.doc_names))
+        tables = CompactLSH.build_tables(self.signatures, self.num_bands, self.num_rows, doc_ids)
+        self.attach_namespace(namespace, *tables)
+
+    def attach_namespace(self, namespace: str, bucket_keys: np.ndarray, bucket_bands: np.ndarray,
+                         bucket_offsets: np.ndarray, bucket_docs: np.ndarray):
+        self.namespaces[namespace] = CompactLSH(
+            self.num_bands, self.num_rows, self.doc_names, self.signatures,
+            bucket_keys, bucket_bands, bucket_offsets, bucket_docs,
+            max_bucket_size=self.max_bucket_size, hot_bucket_policy=self.hot_bucket_policy,
+            doc_index=self.doc_index
+        )
+
+    def scope(self, *namespaces: str) -> 'ScopedIndex':
+        missing = [namespace for namespace in namespaces if namespace not in self.namespaces]
+        if missing:
+            raise ValueError(f"Unknown namespaces: {', '.join(missing)}")
+        if not namespaces:
+            raise ValueError("Scope must contain at least one namespace")
+        return ScopedIndex([self.namespaces[namespace] for namespace in namespaces])
+
+
+class ScopedIndex:
+
+    def __init__(self, views: List['CompactLSH']):
+        self.views = views
+        self.num_bands = views[0].num_bands
+        self.num_rows = views[0].num_rows
+        self.num_permutations = views[0].num_permutations
+
+    def query(self, minhash: 'MinHash') -> Set[str]:
+        self.views[0]._check_permutations(minhash)
+        return {self.views[0].doc_names[doc_idx] for doc_idx in self.query_ids(minhash.signature)}
+
+    def query_ids(self, signature: np.ndarray) -> np.ndarray:
+        return np.unique(np.concatenate([view.query_ids(signature) for view in self.views]))
+
+    def query_similar(self, minhash: 'MinHash', threshold: float = 0.5) -> List[Tuple[str, float]]:
+        self.views[0]._check_permutations(minhash)
+        candidate_ids = self.query_ids(minhash.signature)
+        return self.views[0]._resolve(*self.views[0]._verify(minhash.signature, candidate_ids, threshold))
+
+    def find_similar(self, doc_id: str, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        doc_idx = self.views[0].doc_index.get(doc_id)
+        if doc_idx is None:
+            raise ValueError(f"Document {doc_id} not found in index")
+        signature = self.views[0].signatures[doc_idx]
+        candidate_ids = self.query_ids(signature)
+        candidate_ids = candidate_ids[candidate_ids != doc_idx]
+        return self.views[0]._resolve(*self.views[0]._verify(signature, candidate_ids, threshold))
@@ -5,12 +5,14 @@ from typing import Dict, Tuple, List
 class NGramsGenerator:
     def __init__(self, n):
         self.n = n
+        self.set_sizes = {}
 
     def generate_ngrams_for_docs(self, documents: Dict[str, List[str]]) -> Dict[str, List[Tuple[str, ...]]]:
         ngrams_dict = {}
         for doc, tokens in documents.items():
             ngrams = self._generate_ngrams(tokens)
             ngrams_dict[doc] = ngrams
+            self.set_sizes[doc] = len(set(ngrams))
         return ngrams_dict
 
     def _generate_ngrams(self, tokens: List[str]) -> List[Tuple[str, ...]]:
@@ -1,20 +1,33 @@
 import csv
-from typing import List
+from typing import Iterable
 
+from src.document_clusterer import DocumentCluster
 from src.similarity_evaluator import SimilarPair
 
 class OutputWriter:
-    def __init__(self, header=None):
+    def __init__(self, header=None, confidence_intervals: bool = False):
+        self.confidence_intervals = confidence_intervals
         if header:
             self.header = header
         else:
             self.header = ["document1", "document2", "similarity_score"]
+            if confidence_intervals:
+                self.header += ["ci_low", "ci_high"]
 
-    def write_results(self, output_file: str, results: List['SimilarPair']):
-        data = []
-        for item in results:
-            data.append([item.doc1_name, item.doc2_name, item.similarity_score])
+    def write_results(self, output_file: str, results: Iterable['SimilarPair']):
         with open(output_file, "w", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(self.header)
-            writer.writerows(data)
+            for item in results:
+                row = [item.doc1_name, item.doc2_name, item.similarity_score]
+                if self.confidence_intervals:
+                    row.extend(item.confidence_interval or ("", ""))
+                writer.writerow(row)
+
+    def write_clusters(self, output_file: str, clusters: Iterable['DocumentCluster']):
+        with open(output_file, "w", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["cluster_id", "size", "members", "max_similarity", "min_similarity"])
+            for cluster_id, cluster in enumerate(clusters):
+                writer.writerow([cluster_id, len(cluster.members), ";".join(cluster.members),
+                                 cluster.max_similarity, cluster.min_similarity])
@@ -0,0 +1,72 @@
+import csv
+import heapq
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+from src.similarity_evaluator import SimilarPair
+
+
+class SimilarPairSorter:
+    def __init__(self, max_pairs_in_memory: Optional[int] = None, spill_dir: Optional[str] = None):
+        if max_pairs_in_memory is not None and max_pairs_in_memory < 1:
+            raise ValueError(f"Max pairs in memory must be positive, got {max_pairs_in_memory}")
+        self.max_pairs_in_memory = max_pairs_in_memory
+        self.spill_dir = spill_dir
+
+    def sort(self, pairs: Iterable['SimilarPair']) -> Iterator['SimilarPair']:
+        if self.max_pairs_in_memory is None:
+            yield from sorted(pairs, key=self._key)
+            return
+
+        buffer = []
+        pairs = iter(pairs)
+        for pair in pairs:
+            buffer.append(pair)
+            if len(buffer) >= self.max_pairs_in_memory:
+                break
+        else:
+            yield from sorted(buffer, key=self._key)
+            return
+
+        run_dir = tempfile.mkdtemp(prefix="pairs_", dir=self.spill_dir)
+        try:
+            run_paths = [self._spill(run_dir, 0, buffer)]
+            buffer = []
+            for pair in pairs:
+                buffer.append(pair)
+                if len(buffer) >= self.max_pairs_in_memory:
+                    run_paths.append(self._spill(run_dir, len(run_paths), buffer))
+                    buffer = []
+            if buffer:
+                run_paths.append(self._spill(run_dir, len(run_paths), buffer))
+
+            files = [open(path, newline="", encoding="utf-8") for path in run_paths]
+            try:
+                yield from heapq.merge(*(self._read_run(f) for f in files), key=self._key)
+            finally:
+                for f in files:
+                    f.close()
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    @staticmethod
+    def _key(pair: 'SimilarPair') -> float:
+        return -pair.similarity_score
+
+    def _spill(self, run_dir: str, run_idx: int, buffer: List['SimilarPair']) -> str:
+        buffer.sort(key=self._key)
+        path = os.path.join(run_dir, f"run_{run_idx}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for pair in buffer:
+                confidence_interval = [repr(bound) for bound in pair.confidence_interval or ()]
+                writer.writerow([pair.doc1_name, pair.doc2_name, repr(pair.similarity_score)] + confidence_interval)
+        return path
+
+    @staticmethod
+    def _read_run(f) -> Iterator['SimilarPair']:
+        for doc1, doc2, similarity_score, *confidence_interval in csv.reader(f):
+            confidence_interval = tuple(float(bound) for bound in confidence_interval) or None
+            yield SimilarPair(doc1, doc2, float(similarity_score), confidence_interval=confidence_interval)
@@ -0,0 +1,88 @@
+from math import ceil
+from typing import Iterator, List
+
+import numpy as np
+
+from src.exact_verification import ShingleStore
+from src.similarity_evaluator import SimilarPair
+
+
+class SetSimilarityJoin:
+    def __init__(self, doc_names: List[str], token_sets: List[np.ndarray], threshold: float = 0.5):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Threshold must be between 0 and 1, got {threshold}")
+        self.doc_names = doc_names
+        self.token_sets = token_sets
+        self.threshold = threshold
+        self.num_candidates = 0
+        self.num_similar = 0
+
+    @classmethod
+    def from_shingle_store(cls, shingle_store: 'ShingleStore', threshold: float = 0.5) -> 'SetSimilarityJoin':
+        shingles, inverse, counts = np.unique(shingle_store.shingles, return_inverse=True, return_counts=True)
+        ranks = np.empty(len(shingles), dtype=np.int64)
+        ranks[np.lexsort((shingles, counts))] = np.arange(len(shingles))
+        token_ids = ranks[inverse]
+        token_sets = [
+            np.sort(token_ids[shingle_store.offsets[doc_idx]:shingle_store.offsets[doc_idx + 1]])
+            for doc_idx in range(len(shingle_store.doc_names))
+        ]
+        return cls(shingle_store.doc_names, token_sets, threshold=threshold)
+
+    def get_similar_pairs(self) -> List[SimilarPair]:
+        result = list(self.iter_similar_pairs())
+        result.sort(key=lambda x: x.similarity_score, reverse=True)
+        return result
+
+    def iter_similar_pairs(self) -> Iterator[SimilarPair]:
+        sizes = np.array([len(token_set) for token_set in self.token_sets], dtype=np.int64)
+        order = np.argsort(sizes, kind="stable")
+        token_sets = [self.token_sets[doc_idx] for doc_idx in order]
+        tokens = [token_set.tolist() for token_set in token_sets]
+        sizes = sizes[order].tolist()
+
+        index = {}
+        starts = {}
+        for x, x_tokens in enumerate(tokens):
+            x_size = sizes[x]
+            if not x_size:
+                continue
+            overlaps = {}
+            min_size = self.threshold * x_size
+            for i, token in enumerate(x_tokens[:self._probe_prefix_length(x_size)]):
+                postings = index.get(token, [])
+                start = starts.get(token, 0)
+                while start < len(postings) and sizes[postings[start][0]] < min_size:
+                    start += 1
+                starts[token] = start
+                for y, j in postings[start:]:
+                    overlap = overlaps.get(y, 0)
+                    if overlap < 0:
+                        continue
+                    upper_bound = 1 + min(x_size - i - 1, sizes[y] - j - 1)
+                    if overlap + upper_bound >= self._required_overlap(x_size, sizes[y]):
+                        overlaps[y] = overlap + 1
+                    else:
+                        overlaps[y] = -1
+
+            for y, overlap in overlaps.items():
+                if overlap <= 0:
+                    continue
+                self.num_candidates += 1
+                similarity_score = ShingleStore.sorted_jaccard(token_sets[x], token_sets[y])
+                if similarity_score >= self.threshold:
+                    self.num_similar += 1
+                    doc1, doc2 = sorted([self.doc_names[order[x]], self.doc_names[order[y]]])
+                    yield SimilarPair(doc1, doc2, similarity_score)
+
+            for i, token in enumerate(x_tokens[:self._index_prefix_length(x_size)]):
+                index.setdefault(token, []).append((x, i))
+
+    def _probe_prefix_length(self, size: int) -> int:
+        return size - ceil(self.threshold * size - 1e-9) + 1
+
+    def _index_prefix_length(self, size: int) -> int:
+        return size - ceil(2 * self.threshold / (1 + self.threshold) * size - 1e-9) + 1
+
+    def _required_overlap(self, x_size: int, y_size: int) -> int:
+        return ceil(self.threshold / (1 + self.threshold) * (x_size + y_size) - 1e-9)
@@ -0,0 +1,113 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.locality_sensitive_hashing import HOT_BUCKET_POLICIES, LSH
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedLshGenerator:
+    def __init__(self, num_bands: int, num_rows: int, num_workers: Optional[int] = None,
+                 max_bucket_size: Optional[int] = None, hot_bucket_policy: str = "sample"):
+        if hot_bucket_policy not in HOT_BUCKET_POLICIES:
+            raise ValueError(f"Hot bucket policy must be one of {HOT_BUCKET_POLICIES}, got {hot_bucket_policy}")
+        self.num_bands = num_bands
+        self.num_rows = num_rows
+        self.num_permutations = num_bands * num_rows
+        self.num_workers = min(num_workers or os.cpu_count() or 1, num_bands)
+        self.max_bucket_size = max_bucket_size
+        self.hot_bucket_policy = hot_bucket_policy
+
+    def generate_candidate_pairs(self, signatures: np.ndarray) -> np.ndarray:
+        if signatures.shape[1] != self.num_permutations:
+            raise ValueError(
+                f"Signatures have {signatures.shape[1]} permutations, "
+                f"expected {self.num_permutations}"
+            )
+        shards = [
+            (signatures[:, band_indices[0] * self.num_rows:(band_indices[-1] + 1) * self.num_rows],
+             band_indices, self.num_rows, self.max_bucket_size, self.hot_bucket_policy)
+            for band_indices in np.array_split(np.arange(self.num_bands), self.num_workers)
+        ]
+        if self.num_workers == 1:
+            shard_results = [self._shard_candidate_pairs(*shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+                shard_results = list(executor.map(self._shard_candidate_pairs, *zip(*shards)))
+        shard_pairs, num_hot_buckets = zip(*shard_results)
+        self.log_hot_buckets(sum(num_hot_buckets), self.max_bucket_size, self.hot_bucket_policy)
+
+        packed_pairs = np.unique(np.concatenate(shard_pairs))
+        num_docs = np.int64(len(signatures))
+        return np.stack([packed_pairs // num_docs, packed_pairs % num_docs], axis=1)
+
+    @staticmethod
+    def _shard_candidate_pairs(signatures: np.ndarray, band_indices: np.ndarray, num_rows: int,
+                               max_bucket_size: Optional[int] = None,
+                               hot_bucket_policy: str = "sample") -> Tuple[np.ndarray, int]:
+        num_docs = len(signatures)
+        band_keys = LSH.hash_bands(signatures.reshape(num_docs, len(band_indices), num_rows), band_indices)
+
+        shard_pairs = [np.empty(0, dtype=np.int64)]
+        num_hot_buckets = 0
+        for keys in band_keys.T:
+            order = np.argsort(keys, kind="stable").astype(np.int64)
+            if max_bucket_size is None:
+                first, second = ShardedLshGenerator.pairs_within_runs(keys[order])
+            else:
+                first, second, num_hot = ShardedLshGenerator.capped_pairs_within_runs(
+                    keys[order], max_bucket_size, hot_bucket_policy
+                )
+                num_hot_buckets += num_hot
+            first, second = order[first], order[second]
+            shard_pairs.append(np.minimum(first, second) * num_docs + np.maximum(first, second))
+        return np.unique(np.concatenate(shard_pairs)), num_hot_buckets
+
+    @staticmethod
+    def capped_pairs_within_runs(sorted_keys: np.ndarray, max_run_size: int,
+                                 hot_bucket_policy: str = "sample") -> Tuple[np.ndarray, np.ndarray, int]:
+        num_keys = len(sorted_keys)
+        is_start = np.ones(num_keys, dtype=bool)
+        is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        run_starts = np.flatnonzero(is_start)
+        run_lengths = np.diff(np.append(run_starts, num_keys))
+        hot_runs = np.flatnonzero(run_lengths > max_run_size)
+
+        is_cold = np.repeat(run_lengths <= max_run_size, run_lengths)
+        cold = np.flatnonzero(is_cold)
+        first, second = ShardedLshGenerator.pairs_within_runs(sorted_keys[cold])
+        firsts, seconds = [cold[first]], [cold[second]]
+        if hot_bucket_policy == "sample":
+            for start, length in zip(run_starts[hot_runs].tolist(), run_lengths[hot_runs].tolist()):
+                rng = np.random.default_rng(int(sorted_keys[start]))
+                sampled = start + rng.choice(length, size=max_run_size, replace=False)
+                members = np.arange(start, start + length)
+                first, second = np.repeat(members, max_run_size), np.tile(sampled, length)
+                firsts.append(first[first != second])
+                seconds.append(second[first != second])
+        return np.concatenate(firsts), np.concatenate(seconds), len(hot_runs)
+
+    @staticmethod
+    def log_hot_buckets(num_hot_buckets: int, max_bucket_size: Optional[int], hot_bucket_policy: str):
+        if num_hot_buckets:
+            logger.warning("%d buckets held more than the cap of %d documents; applied policy '%s'",
+                           num_hot_buckets, max_bucket_size, hot_bucket_policy)
+
+    @staticmethod
+    def pairs_within_runs(sorted_keys: np.ndarray):
+        num_keys = len(sorted_keys)
+        is_start = np.ones(num_keys, dtype=bool)
+        is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        run_starts = np.flatnonzero(is_start)
+        run_ends = np.append(run_starts[1:], num_keys)
+
+        positions = np.arange(num_keys)
+        num_after = run_ends[np.cumsum(is_start) - 1] - positions - 1
+        first = np.repeat(positions, num_after)
+        group_starts = np.repeat(np.cumsum(num_after) - num_after, num_after)
+        second = first + np.arange(len(first)) - group_starts + 1
+        return first, second
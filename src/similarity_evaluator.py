@@ -1,6 +1,10 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+from src.compact_lsh import CompactLSH
 from src.locality_sensitive_hashing import LSH
 
 @dataclass
@@ -8,6 +12,7 @@ class SimilarPair:
     doc1_name: str
     doc2_name: str
     similarity_score: float
+    confidence_interval: Optional[Tuple[float, float]] = None
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, SimilarPair):
@@ -19,25 +24,68 @@ class SimilarPair:
         )
 
 class SimilarityEvaluator:
-    def __init__(self, lsh: 'LSH', threshold: float = 0.5):
+    def __init__(self, lsh: Union['LSH', 'CompactLSH'], threshold: float = 0.5,
+                 verifier: Optional['CandidateVerifier'] = None):
+        if verifier is not None and isinstance(lsh, LSH):
+            raise ValueError("Candidate verifiers need row-indexed signatures, use a CompactLSH index")
         self.lsh = lsh
         self.threshold = threshold
+        self.verifier = verifier
 
     def get_similar_pairs(self, docs: List[str]) -> List[SimilarPair]:
-        result = []
-        for doc in docs:
-            similarities = self.lsh.find_similar(doc, threshold=self.threshold)
+        result = list(self.iter_similar_pairs(docs))
+        result.sort(key=lambda x: x.similarity_score, reverse=True)
+        return result
+
+    def iter_similar_pairs(self, docs: List[str]) -> Iterator[SimilarPair]:
+        positions = {doc: position for position, doc in enumerate(docs)}
+        pending = set()
+        for position, doc in enumerate(docs):
+            if self.verifier is None:
+                similarities = self.lsh.find_similar(doc, threshold=self.threshold)
+            else:
+                similarities = self.lsh.find_similar(doc, threshold=self.threshold, verifier=self.verifier)
             for similar_doc, similarity_score in similarities:
                 doc1, doc2 = sorted([doc, similar_doc])
-                result.append(SimilarPair(doc1, doc2, similarity_score))
-        cleaned_result = self._clean_result(result)
-        return cleaned_result
-
-    @staticmethod
-    def _clean_result(result: List[SimilarPair]) -> List[SimilarPair]:
-        seen = []
-        for pair in result:
-            if pair not in seen:
-                seen.append(pair)
-        seen.sort(key=lambda x: x.similarity_score, reverse=True)
-        return seen
+                key = (doc1, doc2, similarity_score)
+                partner_position = positions.get(similar_doc)
+                if partner_position is not None and partner_position < position and key in pending:
+                    pending.discard(key)
+                    continue
+                if partner_position is not None and partner_position > position:
+                    pending.add(key)
+                yield SimilarPair(doc1, doc2, similarity_score)
+
+
+class SignaturePairEvaluator:
+    def __init__(self, doc_names: List[str], signatures: np.ndarray, threshold: float = 0.5,
+                 chunk_size: int = 8192, verifier: Optional['CandidateVerifier'] = None):
+        self.doc_names = doc_names
+        self.signatures = signatures
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.verifier = verifier
+
+    def get_similar_pairs(self, pairs: Union[np.ndarray, Iterable[np.ndarray]]) -> List[SimilarPair]:
+        result = list(self.iter_similar_pairs(pairs))
+        result.sort(key=lambda x: x.similarity_score, reverse=True)
+        return result
+
+    def iter_similar_pairs(self, pairs: Union[np.ndarray, Iterable[np.ndarray]]) -> Iterator[SimilarPair]:
+        if isinstance(pairs, np.ndarray):
+            pairs = [pairs]
+        num_permutations = self.signatures.shape[1]
+        for pairs_chunk in pairs:
+            for start in range(0, len(pairs_chunk), self.chunk_size):
+                chunk = pairs_chunk[start:start + self.chunk_size]
+                if self.verifier is None:
+                    matches = np.sum(self.signatures[chunk[:, 0]] == self.signatures[chunk[:, 1]], axis=1)
+                    similarities = matches / num_permutations
+                    keep = similarities >= self.threshold
+                    chunk, similarities = chunk[keep], similarities[keep]
+                else:
+                    first, second, similarities = self.verifier.verify(self.signatures, chunk[:, 0], chunk[:, 1])
+                    chunk = np.stack([first, second], axis=1)
+                for (doc1_idx, doc2_idx), similarity in zip(chunk.tolist(), similarities.tolist()):
+                    doc1, doc2 = sorted([self.doc_names[doc1_idx], self.doc_names[doc2_idx]])
+                    yield SimilarPair(doc1, doc2, similarity)
@@ -0,0 +1,89 @@
+import unittest
+
+from src.adaptive_refinement import AdaptiveRefiner
+from src.exact_verification import ShingleStore
+from src.min_hash_generator import MinHash
+from src.similarity_evaluator import SimilarPair
+
+
+class TestAdaptiveRefiner(unittest.TestCase):
+
+    def setUp(self):
+        shared = [(f"shared{i}",) for i in range(70)]
+        self.docs = {
+            "doc1": shared + [(f"left{i}",) for i in range(15)],
+            "doc2": shared + [(f"right{i}",) for i in range(15)],
+            "doc3": [(f"other{i}",) for i in range(85)],
+        }
+        self.store = ShingleStore.from_ngrams(self.docs)
+        self.refiner = AdaptiveRefiner(self.store, threshold=0.7, max_permutations=1024)
+
+    def estimate(self, doc1, doc2):
+        minhashes = []
+        for doc in (doc1, doc2):
+            minhash = MinHash(num_permutations=128)
+            for ngram in self.docs[doc]:
+                minhash.update(ngram)
+            minhashes.append(minhash)
+        return float(minhashes[0].jaccard_similarity(minhashes[1]))
+
+    def test_confidence_interval_narrows_with_permutations(self):
+        low_128, high_128 = self.refiner.confidence_interval(90, 128)
+        low_1024, high_1024 = self.refiner.confidence_interval(720, 1024)
+
+        self.assertLess(low_128, 90 / 128)
+        self.assertGreater(high_128, 90 / 128)
+        self.assertLess(high_1024 - low_1024, high_128 - low_128)
+
+    def test_candidate_threshold_is_below_threshold(self):
+        candidate_threshold = self.refiner.candidate_threshold
+
+        self.assertLess(candidate_threshold, 0.7)
+        self.assertGreaterEqual(self.refiner.confidence_interval(round(candidate_threshold * 128), 128)[1], 0.7)
+
+    def test_confident_pairs_are_decided_immediately(self):
+        result = list(self.refiner.refine([SimilarPair("doc1", "doc3", 1.0)]))
+
+        self.assertEqual(result, [SimilarPair("doc1", "doc3", 1.0)])
+        self.assertEqual(self.refiner.num_decided, 1)
+        self.assertEqual(self.refiner._extra_signatures, {})
+
+    def test_borderline_pair_is_refined_towards_true_similarity(self):
+        true_similarity = 70 / 100
+        estimate = self.estimate("doc1", "doc2")
+        refiner = AdaptiveRefiner(self.store, threshold=0.68, max_permutations=4096, step=512)
+
+        result = list(refiner.refine([SimilarPair("doc1", "doc2", estimate)]))
+
+        self.assertEqual(refiner.num_refined, 1)
+        self.assertEqual(set(refiner._extra_signatures), {"doc1", "doc2"})
+        self.assertEqual(len(result), 1)
+        low, high = result[0].confidence_interval
+        base_low, base_high = refiner.confidence_interval(round(estimate * 128), 128)
+        self.assertLess(high - low, (base_high - base_low) / 2)
+        self.assertAlmostEqual(result[0].similarity_score, true_similarity, delta=0.03)
+
+    def test_pairs_with_an_interval_pass_through(self):
+        exact = SimilarPair("doc1", "doc3", 0.5, confidence_interval=(0.5, 0.5))
+
+        self.assertEqual(list(self.refiner.refine([exact])), [exact])
+        self.assertEqual(self.refiner.num_refined + self.refiner.num_decided, 0)
+
+    def test_extra_signatures_are_cached_and_extended(self):
+        first = self.refiner.extra_signature("doc1", 128)
+        extended = self.refiner.extra_signature("doc1", 256)
+
+        self.assertEqual(len(extended), 256)
+        self.assertTrue((extended[:128] == first).all())
+
+    def test_invalid_max_permutations(self):
+        with self.assertRaises(ValueError):
+            AdaptiveRefiner(self.store, max_permutations=64)
+
+    def test_invalid_confidence(self):
+        with self.assertRaises(ValueError):
+            AdaptiveRefiner(self.store, confidence=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch
 import sys
 
-from src.main import parse_arg
+from src.main import candidate_engines, parse_arg
 
 
 class TestParseArg(unittest.TestCase):
@@ -170,6 +170,205 @@ class TestParseArg(unittest.TestCase):
             args = parse_arg()
             self.assertEqual(args.threshold, -0.5)
 
+    def test_save_index_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.save_index)
+
+    def test_save_index_custom_value(self):
+        test_args = ['main.py', '--input', 'file.txt', '--save-index', 'corpus.idx']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.save_index, 'corpus.idx')
+
+    def test_max_bucket_size_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.max_bucket_size)
+
+    def test_max_bucket_size_custom_value(self):
+        test_args = ['main.py', '--input', 'file.txt', '--max-bucket-size', '50']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.max_bucket_size, 50)
+
+    def test_workers_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.workers, 1)
+
+    def test_workers_custom_value_short_form(self):
+        test_args = ['main.py', '-i', 'file.txt', '-w', '4']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.workers, 4)
+
+    def test_external_banding_default_values(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.max_records_in_memory)
+            self.assertIsNone(args.spill_dir)
+
+    def test_external_banding_custom_values(self):
+        test_args = ['main.py', '-i', 'file.txt', '--max-records-in-memory', '1000', '--spill-dir', '/tmp/spill']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.max_records_in_memory, 1000)
+            self.assertEqual(args.spill_dir, '/tmp/spill')
+
+    def test_streaming_default_values(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertFalse(args.unsorted)
+            self.assertEqual(args.max_pairs_in_memory, 1_000_000)
+
+    def test_streaming_custom_values(self):
+        test_args = ['main.py', '-i', 'file.txt', '--unsorted', '--max-pairs-in-memory', '500']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertTrue(args.unsorted)
+            self.assertEqual(args.max_pairs_in_memory, 500)
+
+    def test_exact_band_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.exact_band)
+
+    def test_exact_band_custom_value(self):
+        test_args = ['main.py', '-i', 'file.txt', '--exact-band', '0.05']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.exact_band, 0.05)
+
+    def test_refine_max_permutations_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.refine_max_permutations)
+
+    def test_refine_max_permutations_custom_value(self):
+        test_args = ['main.py', '-i', 'file.txt', '--refine-max-permutations', '512']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.refine_max_permutations, 512)
+
+    def test_prefix_length_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertIsNone(args.prefix_length)
+
+    def test_prefix_length_custom_value(self):
+        test_args = ['main.py', '-i', 'file.txt', '--prefix-length', '16']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.prefix_length, 16)
+
+    def test_size_filter_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertFalse(args.size_filter)
+
+    def test_size_filter_enabled(self):
+        test_args = ['main.py', '-i', 'file.txt', '--size-filter']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertTrue(args.size_filter)
+
+
+    def test_engine_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.engine, 'auto')
+
+    def test_engine_brute_force(self):
+        test_args = ['main.py', '-i', 'file.txt', '--engine', 'brute-force']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.engine, 'brute-force')
+
+    def test_engine_ppjoin(self):
+        test_args = ['main.py', '-i', 'file.txt', '--engine', 'ppjoin']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.engine, 'ppjoin')
+
+    def test_engine_ppjoin_rejects_refinement(self):
+        test_args = ['main.py', '-i', 'file.txt', '--engine', 'ppjoin', '--refine-max-permutations', '512']
+        with patch.object(sys, 'argv', test_args):
+            with self.assertRaises(SystemExit):
+                parse_arg()
+
+    def test_brute_force_max_docs_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.brute_force_max_docs, 5000)
+
+    def test_brute_force_max_docs_custom_value(self):
+        test_args = ['main.py', '-i', 'file.txt', '--brute-force-max-docs', '0']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(args.brute_force_max_docs, 0)
+
+    def test_cluster_default_value(self):
+        test_args = ['main.py', '--input', 'file.txt']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertFalse(args.cluster)
+
+    def test_cluster_enabled(self):
+        test_args = ['main.py', '-i', 'file.txt', '--cluster']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertTrue(args.cluster)
+
+    def test_max_records_in_memory_rejects_save_index(self):
+        test_args = ['main.py', '-i', 'file.txt', '--max-records-in-memory', '500', '--save-index', 'corpus.idx']
+        with patch.object(sys, 'argv', test_args):
+            with self.assertRaises(SystemExit):
+                parse_arg()
+
+    def test_auto_engines_with_disk_banding_and_refinement(self):
+        test_args = ['main.py', '-i', 'file.txt', '--max-records-in-memory', '500',
+                     '--refine-max-permutations', '512']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(candidate_engines(args), ['lsh'])
+
+    def test_auto_engines_with_refinement(self):
+        test_args = ['main.py', '-i', 'file.txt', '--refine-max-permutations', '512']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(candidate_engines(args), ['lsh', 'brute-force'])
+
+    def test_forced_engine_is_the_only_candidate(self):
+        test_args = ['main.py', '-i', 'file.txt', '--engine', 'ppjoin']
+        with patch.object(sys, 'argv', test_args):
+            args = parse_arg()
+            self.assertEqual(candidate_engines(args), ['ppjoin'])
+
+    def test_auto_engines_with_lsh_only_flags(self):
+        for flags in (['--prefix-length', '16'], ['--size-filter'], ['--max-bucket-size', '50']):
+            with patch.object(sys, 'argv', ['main.py', '-i', 'file.txt'] + flags):
+                args = parse_arg()
+                self.assertEqual(candidate_engines(args), ['lsh'])
+
+    def test_forced_engine_rejects_lsh_only_flags(self):
+        for engine in ('brute-force', 'ppjoin'):
+            test_args = ['main.py', '-i', 'file.txt', '--engine', engine, '--size-filter']
+            with patch.object(sys, 'argv', test_args):
+                with self.assertRaises(SystemExit):
+                    parse_arg()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from src.brute_force_evaluator import BruteForceEvaluator
+from src.similarity_evaluator import SignaturePairEvaluator, SimilarPair
+
+
+class TestBruteForceEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.signatures = np.array([
+            [1, 2, 3, 4],
+            [1, 2, 3, 5],
+            [9, 9, 9, 9],
+            [1, 2, 8, 8],
+        ], dtype=np.uint64)
+        self.doc_names = ["doc_b", "doc_a", "doc_c", "doc_d"]
+
+    def test_invalid_tile_size(self):
+        with self.assertRaises(ValueError):
+            BruteForceEvaluator(self.doc_names, self.signatures, tile_size=0)
+
+    def test_get_similar_pairs_compares_all_pairs(self):
+        evaluator = BruteForceEvaluator(self.doc_names, self.signatures, threshold=0.5, tile_size=3)
+
+        self.assertEqual(evaluator.get_similar_pairs(), [
+            SimilarPair("doc_a", "doc_b", 0.75),
+            SimilarPair("doc_b", "doc_d", 0.5),
+            SimilarPair("doc_a", "doc_d", 0.5),
+        ])
+
+    def test_empty_corpus(self):
+        evaluator = BruteForceEvaluator([], np.empty((0, 4), dtype=np.uint64))
+
+        self.assertEqual(evaluator.get_similar_pairs(), [])
+
+    def test_matches_signature_pair_evaluator_across_tiles_and_workers(self):
+        rng = np.random.default_rng(3)
+        signatures = rng.integers(0, 3, size=(50, 16)).astype(np.uint64)
+        doc_names = [f"doc{doc_idx}" for doc_idx in range(len(signatures))]
+        all_pairs = np.array(np.triu_indices(len(signatures), k=1)).T
+        expected = SignaturePairEvaluator(doc_names, signatures, threshold=0.4).get_similar_pairs(all_pairs)
+
+        for tile_size, num_workers in [(1, 1), (7, 1), (16, 4), (64, 2)]:
+            evaluator = BruteForceEvaluator(doc_names, signatures, threshold=0.4, tile_size=tile_size,
+                                            num_workers=num_workers)
+            result = evaluator.get_similar_pairs()
+
+            self.assertEqual(len(result), len(expected))
+            self.assertEqual(
+                {(pair.doc1_name, pair.doc2_name, pair.similarity_score) for pair in result},
+                {(pair.doc1_name, pair.doc2_name, pair.similarity_score) for pair in expected}
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
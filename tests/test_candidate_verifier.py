@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+
+
+class TestCandidateVerifier(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 2 ** 32, size=128, dtype=np.uint64)
+        near = base.copy()
+        near[::10] += np.uint64(1)
+        far_prefix = base.copy()
+        far_prefix[:16] += np.uint64(1)
+        self.signatures = np.stack([base, near, far_prefix, rng.integers(0, 2 ** 32, size=128, dtype=np.uint64)])
+        self.verifier = CandidateVerifier(threshold=0.7, num_permutations=128, prefix_length=16)
+
+    def test_min_prefix_matches(self):
+        self.assertGreater(self.verifier.min_prefix_matches, 0)
+        self.assertLess(self.verifier.min_prefix_matches, 0.7 * 16)
+
+    def test_verify_counts_each_stage(self):
+        left = np.zeros(3, dtype=np.int64)
+        right = np.array([1, 2, 3], dtype=np.int64)
+
+        first, second, similarities = self.verifier.verify(self.signatures, left, right)
+
+        self.assertEqual(second.tolist(), [1])
+        self.assertEqual(first.tolist(), [0])
+        self.assertAlmostEqual(similarities[0], 115 / 128)
+        self.assertEqual(self.verifier.stage_counts, {"candidates": 3, "size": 0, "prefix": 2, "full": 0})
+
+    def test_full_stage_rejects_pairs_below_threshold(self):
+        verifier = CandidateVerifier(threshold=0.95, num_permutations=128, prefix_length=16)
+
+        _, second, _ = verifier.verify(self.signatures, np.array([0]), np.array([1]))
+
+        self.assertEqual(len(second), 0)
+        self.assertEqual(verifier.stage_counts["full"], 1)
+
+    def test_matches_full_comparison(self):
+        rng = np.random.default_rng(1)
+        signatures = rng.integers(0, 3, size=(200, 128), dtype=np.uint64)
+        left, right = np.triu_indices(200, k=1)
+        verifier = CandidateVerifier(threshold=0.36, num_permutations=128, prefix_length=16)
+
+        first, second, similarities = verifier.verify(signatures, left, right)
+        expected = np.sum(signatures[left] == signatures[right], axis=1) / 128
+
+        np.testing.assert_allclose(similarities, expected[np.isin(left * 200 + right, first * 200 + second)])
+        self.assertGreater(verifier.stage_counts["prefix"], 0)
+
+    def test_size_stage_runs_before_signature_comparison(self):
+        set_sizes = np.array([100, 95, 60, 100])
+        verifier = CandidateVerifier(threshold=0.7, num_permutations=128, prefix_length=None, set_sizes=set_sizes)
+        left = np.zeros(3, dtype=np.int64)
+        right = np.array([1, 2, 3], dtype=np.int64)
+
+        _, second, _ = verifier.verify(self.signatures, left, right)
+
+        self.assertEqual(second.tolist(), [1])
+        self.assertEqual(verifier.stage_counts, {"candidates": 3, "size": 1, "prefix": 0, "full": 1})
+
+    def test_without_prefix_matches_full_comparison(self):
+        verifier = CandidateVerifier(threshold=0.5, num_permutations=128, prefix_length=None)
+
+        _, second, similarities = verifier.verify(self.signatures, np.zeros(3, dtype=np.int64), np.array([1, 2, 3]))
+
+        self.assertEqual(second.tolist(), [1, 2])
+        self.assertAlmostEqual(similarities[1], 112 / 128)
+
+    def test_log_stage_counts(self):
+        with self.assertLogs("src.candidate_verifier", level="INFO"):
+            self.verifier.log_stage_counts()
+
+    def test_invalid_prefix_length(self):
+        with self.assertRaises(ValueError):
+            CandidateVerifier(prefix_length=0)
+        with self.assertRaises(ValueError):
+            CandidateVerifier(num_permutations=128, prefix_length=129)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+from src.compact_lsh import CompactLSH, CompactLshGenerator
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+
+class TestCompactLSH(unittest.TestCase):
+
+    def setUp(self):
+        self.docs = {
+            "doc1": self.create_minhash(["machine", "learning", "algorithms", "models"]),
+            "doc2": self.create_minhash(["machine", "learning", "algorithms", "data"]),
+            "doc3": self.create_minhash(["deep", "neural", "networks", "layers"]),
+            "doc4": self.create_minhash(["machine", "learning", "algorithms", "models"]),
+        }
+        self.lsh = CompactLshGenerator(num_bands=16, num_rows=8).generate_compact_lsh(self.docs)
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def test_initialization(self):
+        self.assertEqual(self.lsh.num_bands, 16)
+        self.assertEqual(self.lsh.num_rows, 8)
+        self.assertEqual(self.lsh.num_permutations, 128)
+        self.assertEqual(self.lsh.doc_names, ["doc1", "doc2", "doc3", "doc4"])
+        self.assertEqual(self.lsh.signatures.shape, (4, 128))
+
+    def test_buckets_use_compact_arrays(self):
+        keys, offsets = self.lsh.bucket_keys, self.lsh.bucket_offsets
+
+        self.assertEqual(self.lsh.bucket_docs.dtype, np.int32)
+        self.assertEqual(len(self.lsh.bucket_docs), 4 * 16)
+        self.assertEqual(len(offsets), len(keys) + 1)
+        self.assertEqual(len(self.lsh.bucket_bands), len(keys))
+        self.assertEqual(offsets[-1], 4 * 16)
+        self.assertTrue(np.all(keys[:-1] < keys[1:]))
+
+    def test_each_band_holds_every_document_once(self):
+        sizes = np.diff(self.lsh.bucket_offsets)
+        for band_idx in range(16):
+            self.assertEqual(sizes[self.lsh.bucket_bands == band_idx].sum(), 4)
+
+    def test_generate_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            CompactLshGenerator(num_bands=16, num_rows=8).generate_compact_lsh({
+                "doc1": self.create_minhash(["test"], num_perms=64)
+            })
+
+    def test_empty_index(self):
+        lsh = CompactLshGenerator(num_bands=16, num_rows=8).generate_compact_lsh({})
+        self.assertEqual(lsh.query(self.create_minhash(["test"])), set())
+
+    def test_query_matches_lsh(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        for doc, minhash in self.docs.items():
+            lsh.insert(doc, minhash)
+
+        for minhash in self.docs.values():
+            self.assertEqual(self.lsh.query(minhash), lsh.query(minhash))
+
+    def test_query_ids(self):
+        candidate_ids = self.lsh.query_ids(self.docs["doc1"].signature)
+        self.assertIn(0, candidate_ids)
+        self.assertIn(3, candidate_ids)
+        self.assertNotIn(2, candidate_ids)
+
+    def test_query_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            self.lsh.query(self.create_minhash(["test"], num_perms=64))
+
+    def test_find_similar(self):
+        results = self.lsh.find_similar("doc1", threshold=0.5)
+
+        self.assertEqual(results[0], ("doc4", 1.0))
+        self.assertNotIn("doc1", [doc_id for doc_id, _ in results])
+        self.assertNotIn("doc3", [doc_id for doc_id, _ in results])
+
+    def test_find_similar_matches_lsh(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        for doc, minhash in self.docs.items():
+            lsh.insert(doc, minhash)
+
+        for doc in self.docs:
+            self.assertEqual(
+                sorted(self.lsh.find_similar(doc, threshold=0.3)),
+                sorted(lsh.find_similar(doc, threshold=0.3))
+            )
+
+    def test_find_similar_with_verifier(self):
+        verifier = CandidateVerifier(threshold=0.3, num_permutations=128, prefix_length=16)
+
+        results = self.lsh.find_similar("doc1", threshold=0.3, verifier=verifier)
+
+        self.assertEqual(results, self.lsh.find_similar("doc1", threshold=0.3))
+        self.assertGreater(verifier.stage_counts["candidates"], 0)
+
+    def test_find_similar_document_not_found(self):
+        with self.assertRaises(ValueError) as context:
+            self.lsh.find_similar("nonexistent_doc")
+
+        self.assertIn("not found in index", str(context.exception))
+
+    def test_query_similar(self):
+        results = self.lsh.query_similar(self.docs["doc3"], threshold=0.5)
+        self.assertEqual(results, [("doc3", 1.0)])
+
+    def test_from_lsh(self):
+        lsh = LSH(num_bands=16, num_rows=8, max_bucket_size=5)
+        for doc, minhash in self.docs.items():
+            lsh.insert(doc, minhash)
+        compact = CompactLSH.from_lsh(lsh)
+
+        self.assertEqual(compact.max_bucket_size, 5)
+        self.assertEqual(
+            sorted(compact.find_similar("doc2", threshold=0.0)),
+            sorted(lsh.find_similar("doc2", threshold=0.0))
+        )
+
+    def test_hot_bucket_sampling(self):
+        docs = {f"doc{i}": self.create_minhash(["template", "text"]) for i in range(10)}
+        lsh = CompactLshGenerator(num_bands=1, num_rows=128, max_bucket_size=3).generate_compact_lsh(docs)
+
+        with self.assertLogs("src.compact_lsh", level="WARNING"):
+            self.assertEqual(len(lsh.query(docs["doc0"])), 3)
+
+    def test_query_many_matches_query_ids(self):
+        signatures = np.stack([minhash.signature for minhash in self.docs.values()])
+
+        offsets, candidate_ids = self.lsh.query_many(signatures)
+
+        self.assertEqual(offsets.tolist()[0], 0)
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual(candidate_ids.dtype, np.int32)
+        for query_idx, signature in enumerate(signatures):
+            np.testing.assert_array_equal(
+                candidate_ids[offsets[query_idx]:offsets[query_idx + 1]], self.lsh.query_ids(signature)
+            )
+
+    def test_query_many_hot_buckets(self):
+        docs = {f"doc{i}": self.create_minhash(["template", "text"]) for i in range(10)}
+        lsh = CompactLshGenerator(num_bands=1, num_rows=128, max_bucket_size=3).generate_compact_lsh(docs)
+
+        with self.assertLogs("src.compact_lsh", level="WARNING"):
+            offsets, _ = lsh.query_many(np.stack([docs["doc0"].signature, docs["doc1"].signature]))
+
+        self.assertEqual(offsets.tolist(), [0, 3, 6])
+
+    def test_query_many_empty(self):
+        offsets, candidate_ids = self.lsh.query_many(np.empty((0, 128), dtype=np.uint64))
+
+        self.assertEqual(offsets.tolist(), [0])
+        self.assertEqual(len(candidate_ids), 0)
+
+    def test_query_many_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.lsh.query_many(np.zeros((2, 64), dtype=np.uint64))
+
+    def test_occupancy_histograms(self):
+        histograms = self.lsh.occupancy_histograms()
+
+        self.assertEqual(len(histograms), 16)
+        for histogram in histograms:
+            self.assertEqual(sum(size * count for size, count in histogram.items()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
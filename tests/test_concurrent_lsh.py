@@ -0,0 +1,219 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.concurrent_lsh import ConcurrentLSH
+from src.index_storage import IndexStorage
+from src.min_hash_generator import MinHash
+
+
+class TestConcurrentLSH(unittest.TestCase):
+
+    def setUp(self):
+        self.lsh = ConcurrentLSH(num_bands=16, num_rows=8, batch_size=2)
+        self.mh1 = self.create_minhash(["machine", "learning", "algorithms", "models"])
+        self.mh2 = self.create_minhash(["machine", "learning", "algorithms", "data"])
+        self.mh3 = self.create_minhash(["deep", "neural", "networks", "layers"])
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def test_pending_inserts_are_invisible_until_flush(self):
+        self.lsh.insert("doc1", self.mh1)
+
+        self.assertEqual(self.lsh.query(self.mh1), set())
+        self.lsh.flush()
+        self.assertEqual(self.lsh.query(self.mh1), {"doc1"})
+
+    def test_insert_flushes_at_batch_size(self):
+        self.lsh.insert("doc1", self.mh1)
+        self.lsh.insert("doc2", self.mh2)
+
+        self.assertEqual(len(self.lsh.snapshot()), 2)
+        self.assertEqual(len(self.lsh.snapshot().segments), 1)
+
+    def test_snapshot_is_immutable(self):
+        self.lsh.insert_batch({"doc1": self.mh1, "doc2": self.mh2})
+        snapshot = self.lsh.snapshot()
+
+        self.lsh.remove("doc1")
+        self.lsh.insert_batch({"doc3": self.mh3})
+
+        self.assertEqual(snapshot.query(self.mh1), {"doc1", "doc2"})
+        self.assertFalse(snapshot.deleted[0].flags.writeable)
+        self.assertEqual(self.lsh.query(self.mh1), {"doc2"})
+
+    def test_update_hides_old_version(self):
+        self.lsh.insert_batch({"doc1": self.mh1, "doc2": self.mh2})
+        self.lsh.insert_batch({"doc1": self.mh3})
+
+        self.assertEqual(len(self.lsh.snapshot()), 2)
+        self.assertEqual(self.lsh.query(self.mh3), {"doc1"})
+        self.assertEqual(self.lsh.query(self.mh1), {"doc2"})
+
+    def test_find_similar_excludes_self(self):
+        self.lsh.insert_batch({"doc1": self.mh1, "doc2": self.mh2, "doc3": self.mh3})
+
+        results = self.lsh.find_similar("doc1", threshold=0.3)
+
+        self.assertEqual([doc_id for doc_id, _ in results], ["doc2"])
+
+    def test_query_similar_sorted_across_segments(self):
+        self.lsh.insert_batch({"doc2": self.mh2})
+        self.lsh.insert_batch({"doc1": self.mh1})
+
+        results = self.lsh.query_similar(self.mh1, threshold=0.3)
+
+        self.assertEqual(results[0], ("doc1", 1.0))
+        self.assertEqual(results[1][0], "doc2")
+
+    def test_remove_pending_document(self):
+        self.lsh.insert("doc1", self.mh1)
+        self.lsh.remove("doc1")
+        self.lsh.flush()
+
+        self.assertEqual(len(self.lsh.snapshot()), 0)
+
+    def test_remove_unknown_document(self):
+        with self.assertRaises(ValueError):
+            self.lsh.remove("missing")
+
+    def test_find_similar_unknown_document(self):
+        with self.assertRaises(ValueError):
+            self.lsh.find_similar("missing")
+
+    def test_insert_wrong_permutations(self):
+        with self.assertRaises(ValueError):
+            self.lsh.insert("doc1", self.create_minhash(["a"], num_perms=64))
+
+    def test_concurrent_queries_and_inserts(self):
+        self.lsh.insert_batch({"base": self.mh1})
+        errors = []
+
+        def writer(offset):
+            for i in range(50):
+                self.lsh.insert(f"doc{offset}_{i}", self.mh2)
+
+        def reader():
+            try:
+                for _ in range(100):
+                    self.assertIn("base", self.lsh.query(self.mh1))
+            except AssertionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(3)]
+        threads += [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.lsh.flush()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.lsh.snapshot()), 151)
+
+
+
+class TestConcurrentLSHCompaction(unittest.TestCase):
+
+    def setUp(self):
+        self.lsh = ConcurrentLSH(num_bands=16, num_rows=8, batch_size=1, merge_factor=2)
+        self.minhashes = [self.create_minhash([f"word{i}", f"word{i + 1}", "shared"]) for i in range(8)]
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def insert_all(self):
+        for i, minhash in enumerate(self.minhashes):
+            self.lsh.insert(f"doc{i}", minhash)
+
+    def test_invalid_merge_factor(self):
+        with self.assertRaises(ValueError):
+            ConcurrentLSH(num_bands=16, num_rows=8, merge_factor=1)
+
+    def test_maybe_compact_merges_one_tier(self):
+        self.insert_all()
+        self.assertEqual(len(self.lsh.snapshot().segments), 8)
+
+        while self.lsh.maybe_compact():
+            pass
+
+        self.assertEqual(len(self.lsh.snapshot().segments), 1)
+        self.assertEqual(len(self.lsh.snapshot()), 8)
+        self.assertIn("doc3", self.lsh.query(self.minhashes[3]))
+
+    def test_maybe_compact_without_full_tier(self):
+        self.lsh.insert("doc0", self.minhashes[0])
+
+        self.assertFalse(self.lsh.maybe_compact())
+
+    def test_compact_drops_deleted_documents(self):
+        self.insert_all()
+        self.lsh.remove("doc1")
+        self.lsh.insert("doc2", self.minhashes[5])
+
+        self.lsh.compact()
+        snapshot = self.lsh.snapshot()
+
+        self.assertEqual(len(snapshot.segments), 1)
+        self.assertEqual(len(snapshot.segments[0].doc_names), 7)
+        self.assertFalse(snapshot.deleted[0].any())
+        self.assertNotIn("doc1", self.lsh.query(self.minhashes[1]))
+        self.assertEqual(self.lsh.find_similar("doc5", threshold=1.0), [("doc2", 1.0)])
+
+    def test_background_compaction(self):
+        lsh = ConcurrentLSH(num_bands=16, num_rows=8, batch_size=1, merge_factor=2, background_compaction=True)
+        for i, minhash in enumerate(self.minhashes):
+            lsh.insert(f"doc{i}", minhash)
+            lsh.wait_for_compaction()
+
+        self.assertEqual(len(lsh.snapshot().segments), 1)
+        self.assertEqual(len(lsh.snapshot()), 8)
+
+
+class TestSegmentedIndexStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.test_dir, "index")
+        self.lsh = ConcurrentLSH(num_bands=16, num_rows=8, batch_size=2, merge_factor=2)
+        for i in range(4):
+            self.lsh.insert(f"doc{i}", TestConcurrentLSHCompaction.create_minhash([f"word{i}", "shared"]))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_roundtrip(self):
+        self.lsh.remove("doc0")
+        IndexStorage.save_segmented(self.index_path, self.lsh)
+        loaded = IndexStorage.load_segmented(self.index_path, batch_size=2, merge_factor=2)
+
+        self.assertEqual(loaded.snapshot().segment_ids, self.lsh.snapshot().segment_ids)
+        self.assertEqual(len(loaded.snapshot()), 3)
+        self.assertNotIn("doc0", loaded.snapshot())
+
+    def test_save_writes_only_new_segments_and_drops_merged_ones(self):
+        IndexStorage.save_segmented(self.index_path, self.lsh)
+        segments_path = os.path.join(self.index_path, "segments")
+        self.assertEqual(sorted(os.listdir(segments_path)), ["0", "1"])
+
+        self.lsh.compact()
+        IndexStorage.save_segmented(self.index_path, self.lsh)
+
+        self.assertEqual(os.listdir(segments_path), ["2"])
+        loaded = IndexStorage.load_segmented(self.index_path)
+        self.assertEqual(len(loaded.snapshot()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
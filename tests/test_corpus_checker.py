@@ -0,0 +1,79 @@
+import unittest
+
+from src.corpus_checker import CorpusChecker
+from src.locality_sensitive_hashing import LshGenerator
+from src.min_hash_generator import MinHash
+from src.similarity_evaluator import SimilarPair
+
+
+class TestCorpusChecker(unittest.TestCase):
+
+    def setUp(self):
+        corpus = {
+            "old1": self.create_minhash(["apple", "banana", "orange", "grape"]),
+            "old2": self.create_minhash(["car", "truck", "bus", "train"]),
+        }
+        self.lsh = LshGenerator(num_bands=16, num_rows=8).generate_lsh(corpus)
+        self.checker = CorpusChecker(self.lsh, threshold=0.5)
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update((word,))
+        return mh
+
+    def test_initialization(self):
+        self.assertEqual(self.checker.lsh, self.lsh)
+        self.assertEqual(self.checker.threshold, 0.5)
+
+    def test_check_empty_batch(self):
+        self.assertEqual(self.checker.check({}), [])
+
+    def test_check_finds_corpus_match(self):
+        batch = {"new1": self.create_minhash(["apple", "banana", "orange", "grape"])}
+        result = self.checker.check(batch)
+
+        self.assertEqual(result, [SimilarPair("new1", "old1", 1.0)])
+
+    def test_check_does_not_modify_index(self):
+        batch = {"new1": self.create_minhash(["apple", "banana", "orange", "grape"])}
+        self.checker.check(batch)
+
+        self.assertEqual(set(self.lsh.signatures.keys()), {"old1", "old2"})
+
+    def test_check_no_match(self):
+        batch = {"new1": self.create_minhash(["completely", "different", "words", "here"])}
+        self.assertEqual(self.checker.check(batch), [])
+
+    def test_check_ignores_batch_pairs_by_default(self):
+        batch = {
+            "new1": self.create_minhash(["one", "two", "three", "four"]),
+            "new2": self.create_minhash(["one", "two", "three", "four"]),
+        }
+        self.assertEqual(self.checker.check(batch), [])
+
+    def test_check_within_batch(self):
+        batch = {
+            "new1": self.create_minhash(["one", "two", "three", "four"]),
+            "new2": self.create_minhash(["one", "two", "three", "four"]),
+        }
+        result = self.checker.check(batch, within_batch=True)
+
+        self.assertEqual(result, [SimilarPair("new1", "new2", 1.0)])
+
+    def test_check_results_sorted(self):
+        batch = {
+            "new1": self.create_minhash(["apple", "banana", "orange", "pear"]),
+            "new2": self.create_minhash(["car", "truck", "bus", "train"]),
+        }
+        result = self.checker.check(batch)
+        scores = [pair.similarity_score for pair in result]
+
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for pair in result:
+            self.assertGreaterEqual(pair.similarity_score, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
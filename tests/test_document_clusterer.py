@@ -0,0 +1,59 @@
+import unittest
+
+from src.document_clusterer import DocumentCluster, DocumentClusterer
+from src.similarity_evaluator import SimilarPair
+
+
+class TestDocumentClusterer(unittest.TestCase):
+
+    def setUp(self):
+        self.clusterer = DocumentClusterer()
+
+    def test_no_pairs(self):
+        self.assertEqual(self.clusterer.get_clusters(), [])
+
+    def test_connected_pairs_form_one_cluster(self):
+        self.clusterer.add_pairs([
+            SimilarPair("a", "b", 0.9),
+            SimilarPair("c", "d", 0.8),
+            SimilarPair("b", "c", 0.75),
+            SimilarPair("x", "y", 0.95),
+        ])
+
+        self.assertEqual(self.clusterer.get_clusters(), [
+            DocumentCluster(["a", "b", "c", "d"], 0.9, 0.75),
+            DocumentCluster(["x", "y"], 0.95, 0.95),
+        ])
+
+    def test_pair_within_cluster_updates_similarity_range(self):
+        self.clusterer.add_pairs([
+            SimilarPair("a", "b", 0.8),
+            SimilarPair("b", "c", 0.8),
+            SimilarPair("a", "c", 0.7),
+            SimilarPair("a", "c", 0.99),
+        ])
+
+        self.assertEqual(self.clusterer.get_clusters(), [DocumentCluster(["a", "b", "c"], 0.99, 0.7)])
+
+    def test_clusters_ordered_by_size_then_similarity(self):
+        self.clusterer.add_pairs([
+            SimilarPair("p", "q", 0.7),
+            SimilarPair("m", "n", 0.9),
+            SimilarPair("a", "b", 0.8),
+            SimilarPair("b", "c", 0.8),
+        ])
+
+        self.assertEqual([cluster.members for cluster in self.clusterer.get_clusters()],
+                         [["a", "b", "c"], ["m", "n"], ["p", "q"]])
+
+    def test_find_compresses_paths(self):
+        self.clusterer.add_pairs(SimilarPair(f"doc{i}", f"doc{i + 1}", 0.8) for i in range(100))
+        root = self.clusterer.find("doc0")
+
+        self.assertTrue(all(self.clusterer.find(f"doc{i}") == root for i in range(101)))
+        self.assertTrue(all(parent == root for parent in self.clusterer.parents.values()))
+        self.assertEqual(self.clusterer.sizes, {root: 101})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+
+from src.engine_planner import EnginePlanner
+
+
+class TestEnginePlanner(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signatures = rng.integers(0, 2 ** 63, size=(200, 128), dtype=np.uint64)
+        self.set_sizes = rng.integers(10, 50, size=200)
+        self.ngrams = {
+            f"doc{doc_idx}": [(str(token),) for token in rng.integers(0, 10000, size=size)]
+            for doc_idx, size in enumerate(self.set_sizes)
+        }
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            EnginePlanner().plan(self.signatures, self.set_sizes, engines=["minhash"])
+
+    def test_no_engine_available(self):
+        planner = EnginePlanner(brute_force_max_docs=10)
+        with self.assertRaises(ValueError):
+            planner.plan(self.signatures, self.set_sizes, engines=["brute-force", "ppjoin"])
+
+    def test_estimates_each_available_engine(self):
+        planner = EnginePlanner(threshold=0.7)
+        engine = planner.plan(self.signatures, self.set_sizes, ngrams=self.ngrams)
+
+        self.assertEqual(set(planner.estimates), {"lsh", "brute-force", "ppjoin"})
+        self.assertAlmostEqual(planner.estimates["brute-force"][0], 200 * 199 // 2 * 128 * planner.vector_op_seconds)
+        self.assertEqual(planner.estimates["ppjoin"][1], 1.0)
+        self.assertAlmostEqual(planner.estimates["lsh"][1], planner.lsh_recall())
+        self.assertIn(engine, {"brute-force", "ppjoin"})
+
+    def test_ppjoin_requires_ngrams(self):
+        planner = EnginePlanner()
+        planner.plan(self.signatures, self.set_sizes)
+
+        self.assertNotIn("ppjoin", planner.estimates)
+
+    def test_ppjoin_estimate_grows_with_shared_ngrams(self):
+        shared = {doc: [("common", str(position % 5)) for position in range(len(ngrams))] + ngrams
+                  for doc, ngrams in self.ngrams.items()}
+        planner = EnginePlanner(threshold=0.5)
+        planner.plan(self.signatures, self.set_sizes, ngrams=self.ngrams, engines=["ppjoin"])
+        distinct_cost = planner.estimates["ppjoin"][0]
+        planner.plan(self.signatures, self.set_sizes, ngrams=shared, engines=["ppjoin"])
+
+        self.assertGreater(planner.estimates["ppjoin"][0], distinct_cost)
+
+    def test_brute_force_preferred_over_lsh_within_limit(self):
+        rng = np.random.default_rng(1)
+        signatures = rng.integers(0, 2 ** 63, size=(1000, 128), dtype=np.uint64)
+        planner = EnginePlanner(threshold=0.7)
+
+        self.assertEqual(planner.plan(signatures, np.full(1000, 100), engines=["lsh", "brute-force"]), "brute-force")
+        self.assertIn("lsh", planner.estimates)
+
+    def test_brute_force_limited_by_corpus_size(self):
+        planner = EnginePlanner(brute_force_max_docs=100)
+        engine = planner.plan(self.signatures, self.set_sizes, engines=["lsh", "brute-force"])
+
+        self.assertEqual(engine, "lsh")
+        self.assertNotIn("brute-force", planner.estimates)
+
+    def test_lsh_cheaper_than_brute_force_for_large_corpus(self):
+        rng = np.random.default_rng(1)
+        signatures = rng.integers(0, 2 ** 63, size=(20000, 128), dtype=np.uint64)
+        planner = EnginePlanner(threshold=0.7, brute_force_max_docs=20000)
+        planner.plan(signatures, np.full(20000, 100), engines=["lsh", "brute-force"])
+
+        self.assertLess(planner.estimates["lsh"][0], planner.estimates["brute-force"][0])
+
+    def test_lsh_recall_grows_with_threshold(self):
+        self.assertLess(EnginePlanner(threshold=0.5).lsh_recall(), EnginePlanner(threshold=0.9).lsh_recall())
+        self.assertLessEqual(EnginePlanner(threshold=0.9).lsh_recall(), 1.0)
+
+    def test_log_plan(self):
+        planner = EnginePlanner()
+        planner.plan(self.signatures, self.set_sizes)
+        with self.assertLogs("src.engine_planner", level="INFO") as logs:
+            planner.log_plan()
+
+        self.assertIn("Chose the brute-force engine", logs.output[-1])
+        self.assertIn("preferred over lsh", logs.output[-2])
+        self.assertEqual(len(logs.output), 3 + len(planner.estimates))
+
+
+if __name__ == '__main__':
+    unittest.main()
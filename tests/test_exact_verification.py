@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.exact_verification import ExactJaccardVerifier, ShingleStore
+from src.similarity_evaluator import SimilarPair
+
+
+class TestShingleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.docs = {
+            "doc1": [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e")],
+            "doc2": [("a", "b"), ("b", "c"), ("c", "d"), ("x", "y"), ("a", "b")],
+            "doc3": [("p", "q")],
+            "empty": [],
+        }
+        self.store = ShingleStore.from_ngrams(self.docs, cache_size=2)
+
+    def test_sets_are_sorted_unique_uint64(self):
+        shingle_set = self.store.get("doc2")
+
+        self.assertEqual(shingle_set.dtype, np.uint64)
+        self.assertEqual(len(shingle_set), 4)
+        self.assertTrue(np.all(shingle_set[1:] > shingle_set[:-1]))
+        self.assertEqual(self.store.size("doc1"), 4)
+
+    def test_exact_jaccard_similarity(self):
+        self.assertAlmostEqual(self.store.jaccard_similarity("doc1", "doc2"), 3 / 5)
+        self.assertEqual(self.store.jaccard_similarity("doc1", "doc3"), 0.0)
+        self.assertEqual(self.store.jaccard_similarity("doc1", "empty"), 0.0)
+        self.assertEqual(self.store.jaccard_similarity("doc1", "doc1"), 1.0)
+
+    def test_lru_cache(self):
+        self.store.get("doc1")
+        self.store.get("doc2")
+        self.store.get("doc1")
+        self.store.get("doc3")
+
+        self.assertEqual(list(self.store._cache), ["doc1", "doc3"])
+        self.assertEqual(self.store.cache_hits, 1)
+        self.assertEqual(self.store.cache_misses, 3)
+
+    def test_memory_mapped_store(self):
+        path = tempfile.mkdtemp()
+        try:
+            store = ShingleStore.from_ngrams(self.docs, path=os.path.join(path, "shingles"))
+
+            self.assertIsInstance(store.shingles, np.memmap)
+            self.assertAlmostEqual(store.jaccard_similarity("doc1", "doc2"), 3 / 5)
+        finally:
+            shutil.rmtree(path)
+
+    def test_unknown_document(self):
+        with self.assertRaises(ValueError):
+            self.store.get("missing")
+
+
+class TestExactJaccardVerifier(unittest.TestCase):
+
+    def setUp(self):
+        store = ShingleStore.from_ngrams({
+            "doc1": [("a",), ("b",), ("c",), ("d",)],
+            "doc2": [("a",), ("b",), ("c",), ("e",)],
+            "doc3": [("a",), ("b",), ("c",), ("d",), ("f",)],
+        })
+        self.verifier = ExactJaccardVerifier(store, threshold=0.7, band=0.1)
+
+    def test_candidate_threshold(self):
+        self.assertAlmostEqual(self.verifier.candidate_threshold, 0.6)
+
+    def test_pairs_within_band_get_exact_scores(self):
+        pairs = [SimilarPair("doc1", "doc2", 0.72), SimilarPair("doc1", "doc3", 0.65)]
+
+        result = list(self.verifier.verify(pairs))
+
+        self.assertEqual(result, [SimilarPair("doc1", "doc3", 0.8)])
+        self.assertEqual(self.verifier.num_verified, 2)
+        self.assertEqual(self.verifier.num_rejected, 1)
+
+    def test_pairs_outside_band_are_decided_by_estimate(self):
+        pairs = [SimilarPair("doc1", "doc2", 0.95), SimilarPair("doc1", "doc3", 0.5)]
+
+        result = list(self.verifier.verify(pairs))
+
+        self.assertEqual(result, [SimilarPair("doc1", "doc2", 0.95)])
+        self.assertEqual(self.verifier.num_verified, 0)
+
+    def test_negative_band(self):
+        with self.assertRaises(ValueError):
+            ExactJaccardVerifier(self.verifier.shingle_store, band=-0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from src.external_banding import BAND_RECORD_DTYPE, ExternalBanding, ExternalSorter
+from src.sharded_lsh import ShardedLshGenerator
+
+
+class TestExternalSorter(unittest.TestCase):
+
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.spill_dir)
+
+    def test_sorted_chunks_keep_equal_keys_together(self):
+        rng = np.random.default_rng(5)
+        values = rng.integers(0, 50, size=1000).astype(np.int64)
+        sorter = ExternalSorter(np.int64, self.spill_dir, max_records_in_memory=97, chunk_size=13)
+        for start in range(0, len(values), 40):
+            sorter.add(values[start:start + 40])
+
+        chunks = list(sorter.iter_sorted_chunks())
+
+        self.assertGreater(len(sorter.run_paths), 1)
+        np.testing.assert_array_equal(np.concatenate(chunks), np.sort(values))
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertLess(previous[-1], current[0])
+
+    def test_sorted_chunks_stay_within_memory_limit(self):
+        values = np.random.default_rng(7).permutation(2000).astype(np.int64)
+        sorter = ExternalSorter(np.int64, self.spill_dir, max_records_in_memory=100, chunk_size=1000)
+        sorter.add(values)
+
+        chunks = list(sorter.iter_sorted_chunks())
+
+        self.assertEqual(len(sorter.run_paths), 20)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        np.testing.assert_array_equal(np.concatenate(chunks), np.arange(2000))
+
+    def test_empty_sorter(self):
+        sorter = ExternalSorter(np.int64, self.spill_dir, max_records_in_memory=10, chunk_size=4)
+        self.assertEqual(list(sorter.iter_sorted_chunks()), [])
+
+
+class TestExternalBanding(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.signatures = rng.integers(0, np.iinfo(np.uint64).max, size=(200, 128), dtype=np.uint64)
+        self.signatures[100:150] = self.signatures[:50]
+        self.signatures[150:160, :8] = self.signatures[0, :8]
+
+    def _collect_pairs(self, banding):
+        chunks = list(banding.iter_candidate_pairs())
+        return np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.int64)
+
+    def test_matches_in_memory_banding(self):
+        expected = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1).generate_candidate_pairs(
+            self.signatures
+        )
+        with ExternalBanding(num_bands=16, num_rows=8, max_records_in_memory=500, chunk_size=64) as banding:
+            for start in range(0, len(self.signatures), 30):
+                banding.add_signatures(self.signatures[start:start + 30])
+            pairs = self._collect_pairs(banding)
+
+            self.assertGreater(len(banding.run_paths), 2)
+        np.testing.assert_array_equal(pairs, expected)
+
+    def test_single_call_spills_in_batches(self):
+        expected = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1).generate_candidate_pairs(
+            self.signatures
+        )
+        with ExternalBanding(num_bands=16, num_rows=8, max_records_in_memory=500, chunk_size=64) as banding:
+            banding.add_signatures(self.signatures)
+
+            self.assertGreater(len(banding._band_records.run_paths), 1)
+            self.assertTrue(all(len(np.load(path, mmap_mode="r")) <= 500
+                                for path in banding._band_records.run_paths))
+            pairs = self._collect_pairs(banding)
+        np.testing.assert_array_equal(pairs, expected)
+
+    def test_hot_buckets_match_sharded_banding(self):
+        for policy in ("sample", "skip"):
+            expected = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1, max_bucket_size=5,
+                                           hot_bucket_policy=policy).generate_candidate_pairs(self.signatures)
+            with ExternalBanding(num_bands=16, num_rows=8, max_records_in_memory=500, chunk_size=64,
+                                 max_bucket_size=5, hot_bucket_policy=policy) as banding:
+                banding.add_signatures(self.signatures)
+                pairs = self._collect_pairs(banding)
+            np.testing.assert_array_equal(pairs, expected)
+
+    def test_pair_batches_split_at_bucket_boundaries(self):
+        records = np.empty(12, dtype=BAND_RECORD_DTYPE)
+        records["key"] = [1, 1, 1, 2, 2, 3, 3, 3, 3, 4, 5, 5]
+        records["doc"] = np.arange(12)
+        with ExternalBanding(num_bands=16, num_rows=8, max_records_in_memory=3) as banding:
+            batches = list(banding._pair_batches(records))
+
+        self.assertEqual([batch["key"].tolist() for batch in batches],
+                         [[1, 1, 1], [2, 2], [3, 3, 3, 3], [4, 5, 5]])
+
+    def test_add_signatures_assigns_sequential_ids(self):
+        with ExternalBanding(num_bands=16, num_rows=8) as banding:
+            first = banding.add_signatures(self.signatures[:3])
+            second = banding.add_signatures(self.signatures[3:5])
+
+        np.testing.assert_array_equal(first, [0, 1, 2])
+        np.testing.assert_array_equal(second, [3, 4])
+
+    def test_wrong_num_permutations(self):
+        with ExternalBanding(num_bands=8, num_rows=8) as banding:
+            with self.assertRaises(ValueError):
+                banding.add_signatures(self.signatures)
+
+    def test_no_documents(self):
+        with ExternalBanding(num_bands=16, num_rows=8) as banding:
+            self.assertEqual(len(self._collect_pairs(banding)), 0)
+
+    def test_close_removes_spill_files(self):
+        banding = ExternalBanding(num_bands=16, num_rows=8, max_records_in_memory=100)
+        banding.add_signatures(self.signatures)
+        self._collect_pairs(banding)
+        spill_dir = banding.spill_dir
+        banding.close()
+
+        self.assertFalse(os.path.exists(spill_dir))
+
+    def test_close_keeps_provided_spill_dir(self):
+        spill_dir = tempfile.mkdtemp()
+        try:
+            banding = ExternalBanding(num_bands=16, num_rows=8, spill_dir=spill_dir, max_records_in_memory=100)
+            banding.add_signatures(self.signatures)
+            self._collect_pairs(banding)
+            banding.close()
+
+            self.assertTrue(os.path.isdir(spill_dir))
+            self.assertEqual(os.listdir(spill_dir), [])
+        finally:
+            shutil.rmtree(spill_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -185,5 +185,14 @@ class TestGenerateNgramsForDocs(NgramBaseTestCase):
         self.assertIn(100, result)
 
 
+    def test_generate_ngrams_for_docs_records_set_sizes(self):
+        documents = {
+            'doc1': ['the', 'cat', 'the', 'cat', 'sat'],
+            'doc2': ['a'],
+        }
+        self.bigram_gen.generate_ngrams_for_docs(documents)
+
+        self.assertEqual(self.bigram_gen.set_sizes, {'doc1': 3, 'doc2': 0})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.compact_lsh import CompactLSH
+from src.index_storage import IndexStorage
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+
+class TestIndexStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.test_dir, "index.idx")
+        self.lsh = LSH(num_bands=16, num_rows=8)
+        for doc, words in {"doc1": ["hello", "world"], "doc2": ["foo", "bar"]}.items():
+            mh = MinHash(num_permutations=128)
+            for word in words:
+                mh.update(word)
+            self.lsh.insert(doc, mh)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_save_and_load_roundtrip(self):
+        IndexStorage.save(self.index_path, self.lsh)
+        loaded = IndexStorage.load(self.index_path)
+
+        self.assertEqual(loaded.num_bands, 16)
+        self.assertEqual(loaded.num_rows, 8)
+        self.assertEqual(set(loaded.doc_names), {"doc1", "doc2"})
+        self.assertTrue(np.array_equal(
+            loaded.signatures[loaded.doc_index["doc1"]], self.lsh.signatures["doc1"]
+        ))
+
+    def test_load_memory_maps_arrays(self):
+        IndexStorage.save(self.index_path, self.lsh)
+        loaded = IndexStorage.load(self.index_path)
+
+        self.assertIsInstance(loaded, CompactLSH)
+        self.assertIsInstance(loaded.signatures, np.memmap)
+        self.assertIsInstance(loaded.bucket_docs, np.memmap)
+        self.assertFalse(loaded.signatures.flags.writeable)
+
+    def test_load_without_mmap(self):
+        IndexStorage.save(self.index_path, self.lsh)
+        loaded = IndexStorage.load(self.index_path, mmap=False)
+
+        self.assertNotIsInstance(loaded.signatures, np.memmap)
+
+    def test_save_compact_index_roundtrip(self):
+        compact = CompactLSH.from_lsh(self.lsh)
+        IndexStorage.save(self.index_path, compact)
+        loaded = IndexStorage.load(self.index_path)
+
+        self.assertEqual(list(loaded.doc_names), compact.doc_names)
+        for field in ("bucket_keys", "bucket_bands", "bucket_offsets", "bucket_docs"):
+            self.assertTrue(np.array_equal(getattr(loaded, field), getattr(compact, field)))
+
+    def test_load_decodes_names_lazily(self):
+        IndexStorage.save(self.index_path, CompactLSH.from_lsh(self.lsh))
+        loaded = IndexStorage.load(self.index_path)
+
+        self.assertIsInstance(loaded.doc_names.encoded_names, np.memmap)
+        self.assertIsNone(loaded._doc_index)
+        self.assertEqual(loaded.doc_names[1], CompactLSH.from_lsh(self.lsh).doc_names[1])
+        self.assertEqual(loaded.doc_index[loaded.doc_names[0]], 0)
+
+    def test_empty_index_roundtrip(self):
+        IndexStorage.save(self.index_path, LSH(num_bands=16, num_rows=8))
+        loaded = IndexStorage.load(self.index_path)
+
+        self.assertEqual(list(loaded.doc_names), [])
+        self.assertEqual(loaded.signatures.shape, (0, 128))
+
+    def test_loaded_index_answers_queries(self):
+        IndexStorage.save(self.index_path, self.lsh)
+        loaded = IndexStorage.load(self.index_path)
+
+        query_mh = MinHash(num_permutations=128)
+        query_mh.update("hello")
+        query_mh.update("world")
+        self.assertIn("doc1", loaded.query(query_mh))
+
+    def test_load_rejects_other_objects(self):
+        with open(self.index_path, "wb") as f:
+            f.write(b"not an index")
+
+        with self.assertRaises(ValueError):
+            IndexStorage.load(self.index_path)
+
+    def test_load_rejects_other_versions(self):
+        IndexStorage.save(self.index_path, self.lsh)
+        header_path = os.path.join(self.index_path, "header.json")
+        with open(header_path) as f:
+            header = json.load(f)
+        header["version"] += 1
+        with open(header_path, "w") as f:
+            json.dump(header, f)
+
+        with self.assertRaises(ValueError):
+            IndexStorage.load(self.index_path)
+
+    def test_save_rejects_other_objects(self):
+        with self.assertRaises(ValueError):
+            IndexStorage.save(self.index_path, {"not": "an index"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -161,6 +161,21 @@ class TestLSH(unittest.TestCase):
 
         self.assertIn("doc1", candidates)
 
+    def test_query_many(self):
+        mh1 = self.create_minhash(["machine", "learning", "algorithms"])
+        mh2 = self.create_minhash(["deep", "neural", "networks"])
+        self.lsh.insert("doc1", mh1)
+        self.lsh.insert("doc2", mh2)
+
+        offsets, candidates = self.lsh.query_many(np.stack([mh1.signature, mh2.signature]))
+
+        self.assertEqual(offsets.tolist(), [0, 1, 2])
+        self.assertEqual(candidates, ["doc1", "doc2"])
+
+    def test_query_many_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.lsh.query_many(np.zeros(128, dtype=np.uint64))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
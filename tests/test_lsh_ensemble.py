@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+
+from src.locality_sensitive_hashing import LSH
+from src.lsh_ensemble import LSHEnsemble, LshEnsembleGenerator
+from src.min_hash_generator import MinHash
+
+
+class TestLSHEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.essay = [f"essay{i}" for i in range(300)]
+        self.docs = {
+            "thesis": [f"thesis{i}" for i in range(300)] + self.essay,
+            "unrelated": [f"other{i}" for i in range(500)],
+            "short": [f"short{i}" for i in range(50)],
+            "partial": [f"partial{i}" for i in range(300)] + self.essay[:60],
+        }
+        self.minhashes = {doc: self.create_minhash(words) for doc, words in self.docs.items()}
+        sizes = {doc: len(set(words)) for doc, words in self.docs.items()}
+        self.ensemble = LshEnsembleGenerator(num_partitions=2, num_trees=16, max_depth=8).generate_lsh_ensemble(
+            self.minhashes, sizes
+        )
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def test_partitions_by_size(self):
+        self.assertEqual(len(self.ensemble.partitions), 2)
+        self.assertEqual(self.ensemble.upper_bounds, [360, 600])
+        self.assertEqual(set(self.ensemble.partitions[0].signatures), {"short", "partial"})
+
+    def test_finds_contained_document_missed_by_lsh(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        for doc, minhash in self.minhashes.items():
+            lsh.insert(doc, minhash)
+        query = self.create_minhash(self.essay)
+
+        results = self.ensemble.query_containment(query, len(self.essay), threshold=0.8)
+
+        self.assertNotIn("thesis", lsh.query(query))
+        self.assertEqual(results[0][0], "thesis")
+        self.assertGreater(results[0][1], 0.8)
+        self.assertNotIn("partial", [doc for doc, _ in results])
+
+    def test_find_containing_excludes_self(self):
+        self.ensemble.insert("essay", self.create_minhash(self.essay), len(self.essay))
+
+        results = self.ensemble.find_containing("essay", threshold=0.8)
+
+        self.assertEqual([doc for doc, _ in results], ["thesis"])
+
+    def test_skips_partitions_too_small_to_contain_query(self):
+        query = self.create_minhash(self.docs["thesis"])
+
+        self.assertEqual(self.ensemble.query(query, 600, threshold=0.9), {"thesis"})
+
+    def test_optimal_params_tighten_with_threshold(self):
+        low_trees, low_depth = self.ensemble.optimal_params(0.1)
+        high_trees, high_depth = self.ensemble.optimal_params(0.8)
+
+        self.assertLess(low_depth, high_depth)
+        self.assertLessEqual(high_trees, 16)
+
+    def test_containment_estimate(self):
+        containment = LSHEnsemble.containment(np.array([0.25]), 200, np.array([800]))
+
+        self.assertAlmostEqual(float(containment[0]), 1.0)
+        self.assertAlmostEqual(LSHEnsemble.jaccard_threshold(1.0, 200, 800), 0.25)
+
+    def test_empty_ensemble(self):
+        ensemble = LSHEnsemble()
+
+        self.assertEqual(ensemble.query(self.create_minhash(self.essay), 200, threshold=0.5), set())
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            self.ensemble.insert("empty", self.create_minhash([]), 0)
+        with self.assertRaises(ValueError):
+            self.ensemble.query(self.create_minhash(self.essay), 0, threshold=0.5)
+
+    def test_find_containing_document_not_found(self):
+        with self.assertRaises(ValueError):
+            self.ensemble.find_containing("missing")
+
+    def test_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            self.ensemble.insert("doc", self.create_minhash(["a"], num_perms=64), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
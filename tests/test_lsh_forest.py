@@ -0,0 +1,130 @@
+import unittest
+import numpy as np
+
+from src.lsh_forest import LSHForest, LshForestGenerator
+from src.min_hash_generator import MinHash
+
+
+class TestLSHForest(unittest.TestCase):
+
+    def setUp(self):
+        self.forest = LSHForest(num_trees=16, max_depth=8)
+        self.base_words = [f"word{i}" for i in range(40)]
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def _insert_variants(self):
+        for i in range(8):
+            self.forest.insert(f"doc{i}", self.create_minhash(self.base_words[:40 - 4 * i]))
+        self.forest.insert("other", self.create_minhash(["completely", "different", "text"]))
+        self.forest.index()
+
+    def test_initialization(self):
+        self.assertEqual(self.forest.num_trees, 16)
+        self.assertEqual(self.forest.max_depth, 8)
+        self.assertEqual(self.forest.num_permutations, 128)
+        self.assertEqual(len(self.forest.signatures), 0)
+
+    def test_insert_wrong_num_permutations(self):
+        with self.assertRaises(ValueError) as context:
+            self.forest.insert("doc1", self.create_minhash(["test"], num_perms=64))
+
+        self.assertIn("64", str(context.exception))
+        self.assertIn("128", str(context.exception))
+
+    def test_query_empty_forest(self):
+        self.assertEqual(self.forest.query(self.create_minhash(["test"]), depth=8), set())
+
+    def test_query_identical_document(self):
+        self._insert_variants()
+        self.assertIn("doc0", self.forest.query(self.create_minhash(self.base_words), depth=8))
+
+    def test_shorter_prefix_returns_superset(self):
+        self._insert_variants()
+        query_mh = self.create_minhash(self.base_words)
+
+        deep = self.forest.query(query_mh, depth=8)
+        shallow = self.forest.query(query_mh, depth=2)
+        self.assertTrue(deep.issubset(shallow))
+
+    def test_query_invalid_depth(self):
+        with self.assertRaises(ValueError):
+            self.forest.query(self.create_minhash(["test"]), depth=9)
+
+    def test_query_indexes_pending_documents(self):
+        self.forest.insert("doc1", self.create_minhash(["hello", "world"]))
+        self.assertIn("doc1", self.forest.query(self.create_minhash(["hello", "world"]), depth=8))
+
+    def test_prefix_range(self):
+        sorted_keys = np.array([[1, 1, 1, 2, 3], [1, 2, 2, 1, 1]], dtype=np.uint64)
+
+        self.assertEqual(LSHForest._prefix_range(sorted_keys, np.array([1, 2], dtype=np.uint64)), (1, 3))
+        self.assertEqual(LSHForest._prefix_range(sorted_keys, np.array([1], dtype=np.uint64)), (0, 3))
+        self.assertEqual(LSHForest._prefix_range(sorted_keys, np.array([4], dtype=np.uint64)), (5, 5))
+
+    def test_depth_for_threshold_increases_with_threshold(self):
+        low = self.forest.depth_for_threshold(0.5)
+        high = self.forest.depth_for_threshold(0.85)
+
+        self.assertLess(low, high)
+        self.assertEqual(high, 8)
+
+    def test_query_threshold_at_different_thresholds(self):
+        self._insert_variants()
+        query_mh = self.create_minhash(self.base_words)
+
+        screening = self.forest.query_threshold(query_mh, threshold=0.5)
+        escalation = self.forest.query_threshold(query_mh, threshold=0.85)
+
+        self.assertGreater(len(screening), len(escalation))
+        for _, similarity in escalation:
+            self.assertGreaterEqual(similarity, 0.85)
+        for _, similarity in screening:
+            self.assertGreaterEqual(similarity, 0.5)
+
+    def test_find_similar_excludes_query_document(self):
+        self._insert_variants()
+        results = self.forest.find_similar("doc0", threshold=0.5)
+
+        self.assertNotIn("doc0", [doc_id for doc_id, _ in results])
+        self.assertIn("doc1", [doc_id for doc_id, _ in results])
+
+    def test_find_similar_document_not_found(self):
+        with self.assertRaises(ValueError):
+            self.forest.find_similar("nonexistent_doc")
+
+    def test_query_top_k(self):
+        self._insert_variants()
+        results = self.forest.query_top_k(self.create_minhash(self.base_words), k=3)
+        scores = [similarity for _, similarity in results]
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], ("doc0", 1.0))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_find_top_k_excludes_query_document(self):
+        self._insert_variants()
+        results = self.forest.find_top_k("doc0", k=4)
+
+        self.assertEqual(len(results), 4)
+        self.assertNotIn("doc0", [doc_id for doc_id, _ in results])
+
+    def test_generator_builds_indexed_forest(self):
+        docs = {
+            "doc1": self.create_minhash(["machine", "learning", "algorithms"]),
+            "doc2": self.create_minhash(["deep", "neural", "networks"]),
+        }
+        forest = LshForestGenerator(num_trees=16, max_depth=8).generate_lsh_forest(docs)
+
+        self.assertEqual(len(forest.signatures), 2)
+        self.assertTrue(forest._indexed)
+        self.assertIn("doc1", forest.query(docs["doc1"], depth=8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+
+from src.locality_sensitive_hashing import LSH, LshGenerator
+from src.min_hash_generator import MinHash
+
+
+class TestLSHHotBuckets(unittest.TestCase):
+
+    def setUp(self):
+        self.template = ["assignment", "prompt", "license", "header"]
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def _insert_templates(self, lsh, count=10):
+        for i in range(count):
+            lsh.insert(f"doc{i}", self.create_minhash(self.template))
+
+    def test_initialization_defaults(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        self.assertIsNone(lsh.max_bucket_size)
+        self.assertEqual(lsh.hot_bucket_policy, "sample")
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            LSH(num_bands=16, num_rows=8, hot_bucket_policy="drop")
+
+    def test_no_cap_returns_whole_bucket(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        self._insert_templates(lsh)
+
+        self.assertEqual(len(lsh.query(self.create_minhash(self.template))), 10)
+
+    def test_sample_policy_caps_candidates(self):
+        lsh = LSH(num_bands=1, num_rows=128, max_bucket_size=3)
+        self._insert_templates(lsh)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="WARNING") as logs:
+            candidates = lsh.query(self.create_minhash(self.template))
+
+        self.assertEqual(len(candidates), 3)
+        self.assertIn("more than the cap of 3", logs.output[0])
+
+    def test_sample_is_deterministic(self):
+        lsh = LSH(num_bands=1, num_rows=128, max_bucket_size=3)
+        self._insert_templates(lsh)
+        query_mh = self.create_minhash(self.template)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="WARNING"):
+            first = lsh.query(query_mh)
+        self.assertEqual(lsh.query(query_mh), first)
+
+    def test_skip_policy_ignores_hot_bucket(self):
+        lsh = LSH(num_bands=1, num_rows=128, max_bucket_size=3, hot_bucket_policy="skip")
+        self._insert_templates(lsh)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="WARNING"):
+            self.assertEqual(lsh.query(self.create_minhash(self.template)), set())
+
+    def test_sample_refreshed_after_bucket_changes(self):
+        lsh = LSH(num_bands=1, num_rows=128, max_bucket_size=3)
+        self._insert_templates(lsh, count=4)
+        query_mh = self.create_minhash(self.template)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="WARNING"):
+            lsh.query(query_mh)
+        self.assertEqual(len(lsh.hot_buckets), 1)
+
+        lsh.remove("doc0")
+        self.assertEqual(lsh.hot_buckets, {})
+        self.assertEqual(lsh.query(query_mh), {"doc1", "doc2", "doc3"})
+
+    def test_top_k_respects_cap(self):
+        lsh = LSH(num_bands=1, num_rows=128, max_bucket_size=3)
+        self._insert_templates(lsh)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="WARNING"):
+            results = lsh.query_top_k(self.create_minhash(self.template), k=10)
+        self.assertEqual(len(results), 3)
+
+    def test_occupancy_histograms(self):
+        lsh = LSH(num_bands=16, num_rows=8)
+        self._insert_templates(lsh, count=4)
+        lsh.insert("other", self.create_minhash(["completely", "different", "text"]))
+
+        histograms = lsh.occupancy_histograms()
+        self.assertEqual(len(histograms), 16)
+        for histogram in histograms:
+            self.assertEqual(histogram, {1: 1, 4: 1})
+
+    def test_log_occupancy(self):
+        lsh = LSH(num_bands=2, num_rows=64, max_bucket_size=2)
+        self._insert_templates(lsh, count=4)
+
+        with self.assertLogs("src.locality_sensitive_hashing", level="INFO") as logs:
+            lsh.log_occupancy()
+
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("1 over the cap", logs.output[0])
+
+    def test_generator_passes_cap(self):
+        lsh = LshGenerator(num_bands=16, num_rows=8, max_bucket_size=5, hot_bucket_policy="skip").generate_lsh({})
+
+        self.assertEqual(lsh.max_bucket_size, 5)
+        self.assertEqual(lsh.hot_bucket_policy, "skip")
+
+
+if __name__ == '__main__':
+    unittest.main()
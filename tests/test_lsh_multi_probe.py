@@ -0,0 +1,64 @@
+import unittest
+
+from src.locality_sensitive_hashing import LSH, LshGenerator
+from src.min_hash_generator import MinHash, MinHashGenerator
+
+
+class TestLSHMultiProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.words = [f"word{i}" for i in range(40)]
+        self.query_mh = self.create_minhash(self.words)
+        self.doc_mh = MinHash(num_permutations=8)
+        self.doc_mh.signature = self.query_mh.signature.copy()
+        self.doc_mh.signature[0] = self.query_mh.second_signature[0]
+        self.doc_mh.signature[4] = self.query_mh.second_signature[4]
+
+    @staticmethod
+    def create_minhash(words, num_perms=8):
+        mh = MinHash(num_permutations=num_perms, track_second_minimum=True)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def test_initialization_default_no_probes(self):
+        self.assertEqual(LSH(num_bands=16, num_rows=8).num_probes, 0)
+
+    def test_query_without_probes_misses_perturbed_document(self):
+        lsh = LSH(num_bands=2, num_rows=4)
+        lsh.insert("doc1", self.doc_mh)
+
+        self.assertEqual(lsh.query(self.query_mh), set())
+
+    def test_query_with_probes_finds_perturbed_document(self):
+        lsh = LSH(num_bands=2, num_rows=4, num_probes=4)
+        lsh.insert("doc1", self.doc_mh)
+
+        self.assertEqual(lsh.query(self.query_mh), {"doc1"})
+
+    def test_query_with_probes_requires_second_signature(self):
+        lsh = LSH(num_bands=2, num_rows=4, num_probes=4)
+        lsh.insert("doc1", self.doc_mh)
+        self.query_mh.second_signature = None
+
+        self.assertEqual(lsh.query(self.query_mh), set())
+
+    def test_find_similar_uses_stored_second_signature(self):
+        lsh = LSH(num_bands=2, num_rows=4, num_probes=4)
+        lsh.insert("doc1", self.doc_mh)
+        lsh.insert("query", self.query_mh)
+
+        self.assertEqual(lsh.find_similar("query", threshold=0.5), [("doc1", 0.75)])
+
+    def test_generator_passes_num_probes(self):
+        docs = MinHashGenerator(num_permutations=8, track_second_minimum=True).generate_minhashes({
+            "doc1": [("a", "b"), ("b", "c")],
+        })
+        lsh = LshGenerator(num_bands=2, num_rows=4, num_probes=3).generate_lsh(docs)
+
+        self.assertEqual(lsh.num_probes, 3)
+        self.assertIn("doc1", lsh.second_signatures)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import numpy as np
+
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+
+class TestLSHRemoveUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.lsh = LSH(num_bands=16, num_rows=8)
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def _buckets_containing(self, doc_id):
+        return [
+            bucket_hash
+            for table in self.lsh.tables
+            for bucket_hash, bucket in table.items()
+            if doc_id in bucket
+        ]
+
+    def test_insert_records_bucket_keys(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+
+        self.assertIn("doc1", self.lsh.doc_keys)
+        self.assertEqual(len(self.lsh.doc_keys["doc1"]), 16)
+
+    def test_remove_document(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+        self.lsh.insert("doc2", self.create_minhash(["foo", "bar"]))
+        self.lsh.remove("doc1")
+
+        self.assertNotIn("doc1", self.lsh.signatures)
+        self.assertNotIn("doc1", self.lsh.doc_keys)
+        self.assertEqual(self._buckets_containing("doc1"), [])
+        self.assertIn("doc2", self.lsh.query(self.create_minhash(["foo", "bar"])))
+
+    def test_remove_drops_empty_buckets(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+        self.lsh.remove("doc1")
+
+        for table in self.lsh.tables:
+            self.assertEqual(len(table), 0)
+
+    def test_remove_keeps_shared_buckets(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+        self.lsh.insert("doc2", self.create_minhash(["hello", "world"]))
+        self.lsh.remove("doc1")
+
+        self.assertEqual(self.lsh.query(self.create_minhash(["hello", "world"])), {"doc2"})
+
+    def test_remove_missing_document(self):
+        with self.assertRaises(ValueError) as context:
+            self.lsh.remove("nonexistent_doc")
+
+        self.assertIn("not found in index", str(context.exception))
+
+    def test_update_document(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+        new_mh = self.create_minhash(["completely", "different", "text"])
+        self.lsh.update("doc1", new_mh)
+
+        self.assertTrue(np.array_equal(self.lsh.signatures["doc1"], new_mh.signature))
+        self.assertNotIn("doc1", self.lsh.query(self.create_minhash(["hello", "world"])))
+        self.assertIn("doc1", self.lsh.query(new_mh))
+        self.assertEqual(len(self._buckets_containing("doc1")), 16)
+
+    def test_update_missing_document(self):
+        with self.assertRaises(ValueError):
+            self.lsh.update("doc1", self.create_minhash(["hello"]))
+
+    def test_update_wrong_num_permutations(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello"]))
+
+        with self.assertRaises(ValueError):
+            self.lsh.update("doc1", self.create_minhash(["hello"], num_perms=64))
+
+    def test_reinsert_does_not_leave_stale_buckets(self):
+        self.lsh.insert("doc1", self.create_minhash(["hello", "world"]))
+        self.lsh.insert("doc1", self.create_minhash(["foo", "bar"]))
+
+        self.assertNotIn("doc1", self.lsh.query(self.create_minhash(["hello", "world"])))
+
+    def test_compact_preserves_content(self):
+        for i in range(10):
+            self.lsh.insert(f"doc{i}", self.create_minhash([f"word{i}", "shared"]))
+        for i in range(5):
+            self.lsh.remove(f"doc{i}")
+        self.lsh.compact()
+
+        self.assertEqual(set(self.lsh.signatures.keys()), {f"doc{i}" for i in range(5, 10)})
+        self.assertIn("doc7", self.lsh.query(self.create_minhash(["word7", "shared"])))
+
+    def test_periodic_compaction(self):
+        lsh = LSH(num_bands=16, num_rows=8, compaction_interval=2)
+        for i in range(3):
+            lsh.insert(f"doc{i}", self.create_minhash([f"word{i}"]))
+
+        lsh.remove("doc0")
+        self.assertEqual(lsh._removals_since_compaction, 1)
+        lsh.remove("doc1")
+        self.assertEqual(lsh._removals_since_compaction, 0)
+        self.assertEqual(set(lsh.signatures.keys()), {"doc2"})
+
+
+if __name__ == '__main__':
+    unittest.main()
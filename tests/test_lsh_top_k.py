@@ -0,0 +1,99 @@
+import unittest
+
+from src.locality_sensitive_hashing import LSH
+from src.min_hash_generator import MinHash
+
+
+class TestLSHTopK(unittest.TestCase):
+
+    def setUp(self):
+        self.lsh = LSH(num_bands=16, num_rows=8)
+        self.base_words = [f"word{i}" for i in range(40)]
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42, track_second_minimum=False):
+        mh = MinHash(num_permutations=num_perms, seed=seed, track_second_minimum=track_second_minimum)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def _insert_variants(self):
+        for i in range(6):
+            self.lsh.insert(f"doc{i}", self.create_minhash(self.base_words[:40 - 3 * i]))
+
+    def test_query_top_k_returns_k_results(self):
+        self._insert_variants()
+        results = self.lsh.query_top_k(self.create_minhash(self.base_words), k=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], ("doc0", 1.0))
+
+    def test_query_top_k_sorted_by_similarity(self):
+        self._insert_variants()
+        results = self.lsh.query_top_k(self.create_minhash(self.base_words), k=5)
+        scores = [similarity for _, similarity in results]
+
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_query_top_k_matches_find_similar(self):
+        self._insert_variants()
+        self.lsh.insert("query", self.create_minhash(self.base_words))
+        expected = self.lsh.find_similar("query", threshold=0.0)[:4]
+
+        results = self.lsh.find_top_k("query", k=4)
+        self.assertEqual([s for _, s in results], [s for _, s in expected])
+
+    def test_find_top_k_excludes_query_document(self):
+        self._insert_variants()
+        results = self.lsh.find_top_k("doc0", k=10)
+
+        self.assertNotIn("doc0", [doc_id for doc_id, _ in results])
+
+    def test_find_top_k_document_not_found(self):
+        with self.assertRaises(ValueError) as context:
+            self.lsh.find_top_k("nonexistent_doc", k=3)
+
+        self.assertIn("not found in index", str(context.exception))
+
+    def test_query_top_k_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            self.lsh.query_top_k(self.create_minhash(["test"], num_perms=64), k=3)
+
+    def test_query_top_k_non_positive_k(self):
+        self._insert_variants()
+        self.assertEqual(self.lsh.query_top_k(self.create_minhash(self.base_words), k=0), [])
+
+    def test_query_top_k_fewer_candidates_than_k(self):
+        self.lsh.insert("doc1", self.create_minhash(self.base_words))
+        results = self.lsh.query_top_k(self.create_minhash(self.base_words), k=10)
+
+        self.assertEqual(results, [("doc1", 1.0)])
+
+    def test_similarity_upper_bound(self):
+        self.assertEqual(self.lsh._similarity_upper_bound(16), 1.0)
+        self.assertEqual(self.lsh._similarity_upper_bound(0), 1 - 16 / 128)
+
+    def test_query_top_k_widens_with_probes(self):
+        lsh = LSH(num_bands=2, num_rows=4)
+        query_mh = self.create_minhash(self.base_words, num_perms=8, track_second_minimum=True)
+
+        doc_mh = MinHash(num_permutations=8)
+        doc_mh.signature = query_mh.signature.copy()
+        doc_mh.signature[0] = query_mh.second_signature[0]
+        doc_mh.signature[4] = query_mh.second_signature[4]
+        lsh.insert("doc1", doc_mh)
+
+        self.assertEqual(lsh.query(query_mh), set())
+        self.assertEqual(lsh.query_top_k(query_mh, k=1, max_probes=0), [])
+        self.assertEqual(lsh.query_top_k(query_mh, k=1), [("doc1", 0.75)])
+
+    def test_find_top_k_uses_stored_second_signatures(self):
+        self.lsh.insert("doc1", self.create_minhash(self.base_words, track_second_minimum=True))
+
+        self.assertIn("doc1", self.lsh.second_signatures)
+        self.lsh.remove("doc1")
+        self.assertNotIn("doc1", self.lsh.second_signatures)
+
+
+if __name__ == '__main__':
+    unittest.main()
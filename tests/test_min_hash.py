@@ -154,6 +154,30 @@ class TestMinHash(unittest.TestCase):
 
         self.assertTrue(np.any(mh.signature != np.iinfo(np.uint64).max))
 
+    def test_second_signature_not_tracked_by_default(self):
+        mh = MinHash(num_permutations=16)
+        mh.update("element1")
+        self.assertIsNone(mh.second_signature)
+
+    def test_second_signature_tracks_second_minimum(self):
+        elements = [f"element{i}" for i in range(20)]
+        mh = MinHash(num_permutations=16, track_second_minimum=True)
+        for element in elements + elements[:5]:
+            mh.update(element)
+
+        h_vals = np.stack([mh._a * MinHash.get_hash(element) + mh._b for element in elements])
+        h_vals.sort(axis=0)
+        np.testing.assert_array_equal(mh.signature, h_vals[0])
+        np.testing.assert_array_equal(mh.second_signature, h_vals[1])
+
+    def test_second_signature_does_not_change_signature(self):
+        mh1 = MinHash(num_permutations=16)
+        mh2 = MinHash(num_permutations=16, track_second_minimum=True)
+        for element in ["a", "b", "c"]:
+            mh1.update(element)
+            mh2.update(element)
+        np.testing.assert_array_equal(mh1.signature, mh2.signature)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
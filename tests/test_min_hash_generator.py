@@ -71,7 +71,7 @@ class TestMinHashGenerator(unittest.TestCase):
         result = generator.generate_minhashes(docs)
 
         self.assertEqual(MockMinHash.call_count, 2)
-        MockMinHash.assert_any_call(64, seed=100)
+        MockMinHash.assert_any_call(64, seed=100, track_second_minimum=False)
 
     @patch('src.min_hash_generator.MinHash')
     def test_generate_minhashes_calls_update_correctly(self, MockMinHash):
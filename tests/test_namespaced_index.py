@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.index_storage import IndexStorage
+from src.min_hash_generator import MinHash
+from src.namespaced_index import NamespacedIndexStore
+
+
+class TestNamespacedIndexStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = NamespacedIndexStore(num_bands=16, num_rows=8)
+        self.store.add_namespace("shared", {
+            "wiki": self.create_minhash(["machine", "learning", "algorithms", "models"]),
+            "book": self.create_minhash(["deep", "neural", "networks", "layers"]),
+        })
+        self.store.add_namespace("course-a", {
+            "essay1": self.create_minhash(["machine", "learning", "algorithms", "data"]),
+        })
+        self.store.add_namespace("course-b", {
+            "essay1": self.create_minhash(["machine", "learning", "algorithms", "models"]),
+        })
+
+    @staticmethod
+    def create_minhash(words, num_perms=128, seed=42):
+        mh = MinHash(num_permutations=num_perms, seed=seed)
+        for word in words:
+            mh.update(word)
+        return mh
+
+    def test_namespaces_share_signatures(self):
+        self.assertEqual(self.store.signatures.shape, (4, 128))
+        for view in self.store.namespaces.values():
+            self.assertIs(view.signatures, self.store.signatures)
+            self.assertIs(view.doc_names, self.store.doc_names)
+
+    def test_signature_blocks_index_across_namespaces(self):
+        signatures = np.stack([self.store.signatures.blocks[0][0], self.store.signatures.blocks[2][0]])
+
+        np.testing.assert_array_equal(self.store.signatures[np.array([0, 3])], signatures)
+        np.testing.assert_array_equal(self.store.signatures[3], signatures[1])
+        np.testing.assert_array_equal(self.store.signatures[np.array([0, 3]), :8], signatures[:, :8])
+        np.testing.assert_array_equal(np.asarray(self.store.signatures)[1:3], self.store.signatures[1:3])
+
+    def test_each_namespace_indexes_only_its_documents(self):
+        self.assertEqual(len(self.store.namespaces["shared"].bucket_docs), 2 * 16)
+        self.assertEqual(set(self.store.namespaces["course-a"].bucket_docs.tolist()), {2})
+
+    def test_query_single_scope(self):
+        query = self.create_minhash(["machine", "learning", "algorithms", "models"])
+
+        self.assertEqual(self.store.scope("course-a").query(query), {"course-a/essay1"})
+
+    def test_query_combined_scope(self):
+        query = self.create_minhash(["machine", "learning", "algorithms", "models"])
+
+        results = self.store.scope("course-a", "shared").query_similar(query, threshold=0.3)
+
+        self.assertEqual(results[0], ("shared/wiki", 1.0))
+        self.assertEqual([doc for doc, _ in results], ["shared/wiki", "course-a/essay1"])
+
+    def test_find_similar_excludes_self_and_other_tenants(self):
+        results = self.store.scope("course-b", "shared").find_similar("course-b/essay1", threshold=0.9)
+
+        self.assertEqual(results, [("shared/wiki", 1.0)])
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            self.store.scope("course-c")
+
+    def test_duplicate_namespace(self):
+        with self.assertRaises(ValueError):
+            self.store.add_namespace("shared", {})
+
+    def test_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            self.store.add_namespace("course-c", {"doc": self.create_minhash(["a"], num_perms=64)})
+
+
+class TestNamespacedIndexStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.test_dir, "store")
+        self.store = NamespacedIndexStore(num_bands=16, num_rows=8)
+        for namespace, words in {"shared": ["hello", "world"], "course": ["foo", "bar"]}.items():
+            mh = MinHash(num_permutations=128)
+            for word in words:
+                mh.update(word)
+            self.store.add_namespace(namespace, {"doc": mh})
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_roundtrip_memory_maps_shared_signatures(self):
+        IndexStorage.save_store(self.store_path, self.store)
+        loaded = IndexStorage.load_store(self.store_path)
+
+        self.assertEqual(list(loaded.namespaces), ["shared", "course"])
+        self.assertEqual(loaded.doc_names, ["shared/doc", "course/doc"])
+        self.assertTrue(all(isinstance(block, np.memmap) for block in loaded.signatures.blocks))
+        self.assertIs(loaded.namespaces["course"].signatures, loaded.signatures)
+
+        query = MinHash(num_permutations=128)
+        query.update("hello")
+        query.update("world")
+        self.assertEqual(loaded.scope("course", "shared").query(query), {"shared/doc"})
+
+    def test_add_namespace_after_load_keeps_blocks_mapped(self):
+        IndexStorage.save_store(self.store_path, self.store)
+        loaded = IndexStorage.load_store(self.store_path)
+        mapped_blocks = list(loaded.signatures.blocks)
+
+        query = MinHash(num_permutations=128)
+        query.update("hello")
+        query.update("world")
+        loaded.add_namespace("late", {"doc": query})
+
+        self.assertTrue(all(block is mapped for block, mapped in zip(loaded.signatures.blocks, mapped_blocks)))
+        self.assertIsInstance(loaded.signatures.blocks[0], np.memmap)
+        self.assertEqual(loaded.signatures.shape, (3, 128))
+        self.assertEqual(loaded.scope("late", "shared").find_similar("late/doc", threshold=0.9),
+                         [("shared/doc", 1.0)])
+
+    def test_load_rejects_single_index(self):
+        IndexStorage.save(self.store_path, self.store.namespaces["shared"])
+
+        with self.assertRaises(ValueError):
+            IndexStorage.load_store(self.store_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import csv
 import unittest
 from unittest.mock import mock_open, patch
 
+from src.document_clusterer import DocumentCluster
 from src.output_writer import OutputWriter
 from src.similarity_evaluator import SimilarPair
 
@@ -137,5 +138,46 @@ class TestOutputWriter(unittest.TestCase):
         self.assertIn("0.0", written_content)
 
 
+    def test_write_results_from_generator(self):
+        pairs = (SimilarPair(f"doc{i}.txt", f"doc{i + 1}.txt", 0.5) for i in range(3))
+
+        m = mock_open()
+        with patch("builtins.open", m):
+            self.writer.write_results(self.output_file, pairs)
+
+        written_content = "".join(call.args[0] for call in m().write.call_args_list)
+        self.assertIn("doc0.txt,doc1.txt,0.5", written_content)
+        self.assertIn("doc2.txt,doc3.txt,0.5", written_content)
+
+    def test_confidence_interval_columns(self):
+        writer = OutputWriter(confidence_intervals=True)
+        pairs = [SimilarPair("doc1.txt", "doc2.txt", 0.75, confidence_interval=(0.7, 0.8))]
+
+        m = mock_open()
+        with patch("builtins.open", m):
+            writer.write_results(self.output_file, pairs)
+
+        written_content = "".join(call.args[0] for call in m().write.call_args_list)
+        self.assertIn("similarity_score,ci_low,ci_high", written_content)
+        self.assertIn("doc1.txt,doc2.txt,0.75,0.7,0.8", written_content)
+
+    def test_confidence_interval_columns_disabled_by_default(self):
+        self.assertNotIn("ci_low", self.writer.header)
+
+    def test_write_clusters(self):
+        clusters = [
+            DocumentCluster(["a.txt", "b.txt", "c.txt"], 0.9, 0.75),
+            DocumentCluster(["x.txt", "y.txt"], 0.8, 0.8),
+        ]
+
+        m = mock_open()
+        with patch("builtins.open", m):
+            self.writer.write_clusters(self.output_file, clusters)
+
+        written_content = "".join(call.args[0] for call in m().write.call_args_list)
+        self.assertIn("cluster_id,size,members,max_similarity,min_similarity", written_content)
+        self.assertIn("0,3,a.txt;b.txt;c.txt,0.9,0.75", written_content)
+        self.assertIn("1,2,x.txt;y.txt,0.8,0.8", written_content)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
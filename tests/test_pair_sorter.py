@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.pair_sorter import SimilarPairSorter
+from src.similarity_evaluator import SimilarPair
+
+
+class TestSimilarPairSorter(unittest.TestCase):
+
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+        self.pairs = [SimilarPair(f"doc{i}", f"doc{i + 1}", (i * 7 % 10) / 10) for i in range(25)]
+
+    def tearDown(self):
+        shutil.rmtree(self.spill_dir)
+
+    def expected(self):
+        return sorted(self.pairs, key=lambda x: x.similarity_score, reverse=True)
+
+    def test_in_memory_sort(self):
+        result = list(SimilarPairSorter().sort(iter(self.pairs)))
+
+        self.assertEqual(result, self.expected())
+
+    def test_external_sort_matches_stable_in_memory_sort(self):
+        sorter = SimilarPairSorter(max_pairs_in_memory=4, spill_dir=self.spill_dir)
+
+        result = list(sorter.sort(iter(self.pairs)))
+
+        self.assertEqual(result, self.expected())
+
+    def test_external_sort_removes_runs(self):
+        sorter = SimilarPairSorter(max_pairs_in_memory=4, spill_dir=self.spill_dir)
+        pairs = sorter.sort(iter(self.pairs))
+
+        next(pairs)
+        self.assertEqual(len(os.listdir(self.spill_dir)), 1)
+        list(pairs)
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_external_sort_preserves_scores_exactly(self):
+        pairs = [SimilarPair("a", "b", 1 / 3), SimilarPair("c", "d", 2 / 3)]
+        sorter = SimilarPairSorter(max_pairs_in_memory=1, spill_dir=self.spill_dir)
+
+        result = list(sorter.sort(pairs))
+
+        self.assertEqual(result, [SimilarPair("c", "d", 2 / 3), SimilarPair("a", "b", 1 / 3)])
+
+    def test_external_sort_preserves_confidence_intervals(self):
+        pairs = [SimilarPair("a", "b", 0.5, confidence_interval=(0.4, 0.6)), SimilarPair("c", "d", 0.9)]
+        sorter = SimilarPairSorter(max_pairs_in_memory=1, spill_dir=self.spill_dir)
+
+        result = list(sorter.sort(pairs))
+
+        self.assertIsNone(result[0].confidence_interval)
+        self.assertEqual(result[1].confidence_interval, (0.4, 0.6))
+
+    def test_small_input_stays_in_memory(self):
+        sorter = SimilarPairSorter(max_pairs_in_memory=100, spill_dir=os.path.join(self.spill_dir, "missing"))
+
+        result = list(sorter.sort(iter(self.pairs)))
+
+        self.assertEqual(result, self.expected())
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_empty_input(self):
+        sorter = SimilarPairSorter(max_pairs_in_memory=4, spill_dir=self.spill_dir)
+
+        self.assertEqual(list(sorter.sort([])), [])
+
+    def test_invalid_max_pairs_in_memory(self):
+        with self.assertRaises(ValueError):
+            SimilarPairSorter(max_pairs_in_memory=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
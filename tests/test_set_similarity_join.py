@@ -0,0 +1,75 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from src.exact_verification import ShingleStore
+from src.set_similarity_join import SetSimilarityJoin
+from src.similarity_evaluator import SimilarPair
+
+
+class TestSetSimilarityJoin(unittest.TestCase):
+
+    def setUp(self):
+        self.docs = {
+            "doc1": [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e")],
+            "doc2": [("a", "b"), ("b", "c"), ("c", "d"), ("x", "y")],
+            "doc3": [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e"), ("e", "f")],
+            "doc4": [("p", "q")],
+            "empty": [],
+        }
+        self.store = ShingleStore.from_ngrams(self.docs)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            SetSimilarityJoin([], [], threshold=0)
+
+    def test_tokens_are_ordered_by_global_frequency(self):
+        join = SetSimilarityJoin.from_shingle_store(self.store)
+        doc_tokens = dict(zip(join.doc_names, join.token_sets))
+
+        self.assertLess(doc_tokens["doc4"][0], 3)
+        self.assertTrue(np.all(doc_tokens["doc3"][-3:] == doc_tokens["doc2"][-3:]))
+        self.assertEqual(len(doc_tokens["empty"]), 0)
+
+    def test_get_similar_pairs_reports_exact_jaccard(self):
+        join = SetSimilarityJoin.from_shingle_store(self.store, threshold=0.5)
+
+        self.assertEqual(join.get_similar_pairs(), [
+            SimilarPair("doc1", "doc3", 4 / 5),
+            SimilarPair("doc1", "doc2", 3 / 5),
+            SimilarPair("doc2", "doc3", 3 / 6),
+        ])
+        self.assertEqual(join.num_similar, 3)
+        self.assertGreaterEqual(join.num_candidates, 3)
+
+    def test_identical_documents_at_threshold_one(self):
+        join = SetSimilarityJoin(["x", "y", "z"], [np.array([1, 2]), np.array([1, 2]), np.array([1, 3])],
+                                 threshold=1.0)
+
+        self.assertEqual(join.get_similar_pairs(), [SimilarPair("x", "y", 1.0)])
+
+    def test_matches_all_pairs_comparison(self):
+        rng = np.random.default_rng(7)
+        base = rng.integers(0, 40, size=30)
+        token_sets = [
+            np.unique(np.concatenate([base[:rng.integers(5, 30)], rng.integers(0, 200, size=rng.integers(0, 15))]))
+            for _ in range(60)
+        ]
+        doc_names = [f"doc{doc_idx}" for doc_idx in range(len(token_sets))]
+
+        for threshold in [0.3, 0.5, 0.8]:
+            join = SetSimilarityJoin(doc_names, token_sets, threshold=threshold)
+            result = {(pair.doc1_name, pair.doc2_name): pair.similarity_score for pair in join.iter_similar_pairs()}
+
+            expected = {}
+            for first, second in itertools.combinations(range(len(token_sets)), 2):
+                first_set, second_set = set(token_sets[first].tolist()), set(token_sets[second].tolist())
+                similarity = len(first_set & second_set) / len(first_set | second_set)
+                if similarity >= threshold:
+                    expected[tuple(sorted([doc_names[first], doc_names[second]]))] = similarity
+            self.assertEqual(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+
+from src.compact_lsh import CompactLSH
+from src.sharded_lsh import ShardedLshGenerator
+
+
+class TestShardedLshGenerator(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.signatures = rng.integers(0, np.iinfo(np.uint64).max, size=(60, 128), dtype=np.uint64)
+        self.signatures[10] = self.signatures[0]
+        self.signatures[20, :64] = self.signatures[0, :64]
+        self.signatures[30, 8:16] = self.signatures[5, 8:16]
+
+    def _expected_pairs(self, **kwargs):
+        doc_names = [str(i) for i in range(len(self.signatures))]
+        lsh = CompactLSH.from_signatures(doc_names, self.signatures, num_bands=16, num_rows=8, **kwargs)
+        expected = set()
+        for doc_idx, signature in enumerate(self.signatures):
+            for candidate_idx in lsh.query_ids(signature).tolist():
+                if doc_idx != candidate_idx:
+                    expected.add((min(doc_idx, candidate_idx), max(doc_idx, candidate_idx)))
+        return expected
+
+    def test_initialization_caps_workers_at_bands(self):
+        generator = ShardedLshGenerator(num_bands=4, num_rows=32, num_workers=8)
+        self.assertEqual(generator.num_workers, 4)
+
+    def test_wrong_num_permutations(self):
+        with self.assertRaises(ValueError):
+            ShardedLshGenerator(num_bands=8, num_rows=8, num_workers=1).generate_candidate_pairs(self.signatures)
+
+    def test_single_worker_matches_compact_lsh(self):
+        pairs = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1).generate_candidate_pairs(self.signatures)
+
+        self.assertEqual(set(map(tuple, pairs.tolist())), self._expected_pairs())
+        self.assertIn((0, 10), set(map(tuple, pairs.tolist())))
+        self.assertIn((5, 30), set(map(tuple, pairs.tolist())))
+
+    def test_multiple_workers_match_single_worker(self):
+        single = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1).generate_candidate_pairs(self.signatures)
+        sharded = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=3).generate_candidate_pairs(self.signatures)
+
+        np.testing.assert_array_equal(single, sharded)
+
+    def test_pairs_are_unique_and_ordered(self):
+        pairs = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=2).generate_candidate_pairs(self.signatures)
+
+        self.assertTrue(np.all(pairs[:, 0] < pairs[:, 1]))
+        self.assertEqual(len(pairs), len(set(map(tuple, pairs.tolist()))))
+
+    def test_empty_signatures(self):
+        pairs = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1).generate_candidate_pairs(
+            np.empty((0, 128), dtype=np.uint64)
+        )
+        self.assertEqual(pairs.shape, (0, 2))
+
+    def test_hot_buckets_match_compact_lsh(self):
+        self.signatures[40:50, :8] = self.signatures[1, :8]
+        for policy in ("sample", "skip"):
+            generator = ShardedLshGenerator(num_bands=16, num_rows=8, num_workers=1, max_bucket_size=4,
+                                            hot_bucket_policy=policy)
+            with self.assertLogs("src.sharded_lsh", level="WARNING"):
+                pairs = generator.generate_candidate_pairs(self.signatures)
+
+            self.assertEqual(set(map(tuple, pairs.tolist())),
+                             self._expected_pairs(max_bucket_size=4, hot_bucket_policy=policy))
+            self.assertIn((0, 10), set(map(tuple, pairs.tolist())))
+
+    def test_unknown_hot_bucket_policy(self):
+        with self.assertRaises(ValueError):
+            ShardedLshGenerator(num_bands=16, num_rows=8, max_bucket_size=4, hot_bucket_policy="drop")
+
+    def test_capped_pairs_within_runs(self):
+        sorted_keys = np.array([1, 1, 1, 1, 2, 3, 3], dtype=np.uint64)
+
+        first, second, num_hot = ShardedLshGenerator.capped_pairs_within_runs(sorted_keys, 2, "skip")
+        self.assertEqual((list(zip(first.tolist(), second.tolist())), num_hot), ([(5, 6)], 1))
+
+        first, second, num_hot = ShardedLshGenerator.capped_pairs_within_runs(sorted_keys, 2, "sample")
+        pairs = {tuple(sorted(pair)) for pair in zip(first.tolist(), second.tolist())}
+        self.assertEqual(num_hot, 1)
+        self.assertIn((5, 6), pairs)
+        self.assertEqual(len(pairs), 6)
+
+    def test_pairs_within_runs(self):
+        first, second = ShardedLshGenerator.pairs_within_runs(np.array([1, 1, 1, 2, 3, 3], dtype=np.uint64))
+
+        self.assertEqual(list(zip(first.tolist(), second.tolist())), [(0, 1), (0, 2), (1, 2), (4, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+from src.similarity_evaluator import SignaturePairEvaluator, SimilarPair
+
+
+class TestSignaturePairEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.signatures = np.array([
+            [1, 2, 3, 4],
+            [1, 2, 3, 5],
+            [9, 9, 9, 9],
+            [1, 2, 8, 8],
+        ], dtype=np.uint64)
+        self.doc_names = ["doc_b", "doc_a", "doc_c", "doc_d"]
+        self.evaluator = SignaturePairEvaluator(self.doc_names, self.signatures, threshold=0.5, chunk_size=2)
+
+    def test_initialization(self):
+        self.assertEqual(self.evaluator.threshold, 0.5)
+        self.assertEqual(self.evaluator.chunk_size, 2)
+
+    def test_get_similar_pairs_empty(self):
+        self.assertEqual(self.evaluator.get_similar_pairs(np.empty((0, 2), dtype=np.int64)), [])
+
+    def test_get_similar_pairs_filters_and_sorts(self):
+        pairs = np.array([[0, 1], [0, 2], [0, 3], [1, 3]], dtype=np.int64)
+        result = self.evaluator.get_similar_pairs(pairs)
+
+        self.assertEqual(result, [
+            SimilarPair("doc_a", "doc_b", 0.75),
+            SimilarPair("doc_b", "doc_d", 0.5),
+            SimilarPair("doc_a", "doc_d", 0.5),
+        ])
+
+    def test_get_similar_pairs_from_chunks(self):
+        chunks = iter([np.array([[0, 1]], dtype=np.int64), np.array([[0, 3], [0, 2]], dtype=np.int64)])
+        result = self.evaluator.get_similar_pairs(chunks)
+
+        self.assertEqual(result, [SimilarPair("doc_a", "doc_b", 0.75), SimilarPair("doc_b", "doc_d", 0.5)])
+
+
+    def test_get_similar_pairs_with_verifier(self):
+        verifier = CandidateVerifier(threshold=0.5, num_permutations=4, prefix_length=2)
+        evaluator = SignaturePairEvaluator(self.doc_names, self.signatures, threshold=0.5, verifier=verifier)
+        pairs = np.array([[0, 1], [0, 2], [0, 3], [1, 3]], dtype=np.int64)
+
+        result = evaluator.get_similar_pairs(pairs)
+
+        self.assertEqual(result, self.evaluator.get_similar_pairs(pairs))
+        self.assertEqual(verifier.stage_counts["candidates"], 4)
+        self.assertEqual(verifier.stage_counts["prefix"] + verifier.stage_counts["full"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
 import unittest
 from unittest.mock import Mock
 
+import numpy as np
+
+from src.candidate_verifier import CandidateVerifier
+from src.compact_lsh import CompactLSH
+from src.locality_sensitive_hashing import LshGenerator
+from src.min_hash_generator import MinHash
 from src.similarity_evaluator import SimilarPair, SimilarityEvaluator
 
 
@@ -89,6 +95,48 @@ class TestSimilarityEvaluator(unittest.TestCase):
         evaluator.get_similar_pairs(docs)
         self.mock_lsh.find_similar.assert_called_with("doc1", threshold=0.7)
 
+    def _real_minhashes(self):
+        shared = [(f"shared{i}",) for i in range(40)]
+        docs = {
+            "doc1": shared + [("left",)],
+            "doc2": shared + [("right",)],
+            "doc3": [(f"other{i}",) for i in range(40)],
+        }
+        minhashes = {}
+        for doc, ngrams in docs.items():
+            minhashes[doc] = MinHash(num_permutations=128)
+            for ngram in ngrams:
+                minhashes[doc].update(ngram)
+        return minhashes
+
+    def test_real_lsh_without_verifier(self):
+        lsh = LshGenerator(num_bands=16, num_rows=8).generate_lsh(self._real_minhashes())
+        result = SimilarityEvaluator(lsh, threshold=0.5).get_similar_pairs(["doc1", "doc2", "doc3"])
+
+        self.assertEqual([(pair.doc1_name, pair.doc2_name) for pair in result], [("doc1", "doc2")])
+
+    def test_real_lsh_rejects_verifier(self):
+        lsh = LshGenerator(num_bands=16, num_rows=8).generate_lsh(self._real_minhashes())
+        with self.assertRaises(ValueError):
+            SimilarityEvaluator(lsh, threshold=0.5, verifier=CandidateVerifier(0.5))
+
+    def test_compact_lsh_with_verifier(self):
+        minhashes = self._real_minhashes()
+        lsh = CompactLSH.from_signatures(list(minhashes), np.stack([mh.signature for mh in minhashes.values()]),
+                                         16, 8)
+        evaluator = SimilarityEvaluator(lsh, threshold=0.5, verifier=CandidateVerifier(0.5))
+        result = evaluator.get_similar_pairs(["doc1", "doc2", "doc3"])
+
+        self.assertEqual([(pair.doc1_name, pair.doc2_name) for pair in result], [("doc1", "doc2")])
+        self.assertEqual(evaluator.verifier.stage_counts["candidates"], 2)
+
+    def test_get_similar_pairs_verifier_propagation(self):
+        self.mock_lsh.find_similar.return_value = []
+        verifier = Mock()
+        evaluator = SimilarityEvaluator(self.mock_lsh, threshold=0.7, verifier=verifier)
+        evaluator.get_similar_pairs(["doc1"])
+        self.mock_lsh.find_similar.assert_called_with("doc1", threshold=0.7, verifier=verifier)
+
     def test_get_similar_pairs_multiple_similarities(self):
         self.mock_lsh.find_similar.side_effect = [
             [("doc2", 0.85), ("doc3", 0.65)],
@@ -103,30 +151,26 @@ class TestSimilarityEvaluator(unittest.TestCase):
         self.assertEqual(len(result), 4)
         self.assertEqual(scores, sorted(scores, reverse=True))
 
-    def test_clean_result_empty_list(self):
-        result = SimilarityEvaluator._clean_result([])
-        self.assertEqual(result, [])
-
-    def test_clean_result_deduplication(self):
-        pairs = [
-            SimilarPair("doc1", "doc2", 0.8),
-            SimilarPair("doc1", "doc2", 0.8),
-            SimilarPair("doc3", "doc4", 0.9),
+    def test_iter_similar_pairs_is_lazy(self):
+        self.mock_lsh.find_similar.side_effect = [
+            [("doc2", 0.8)],
+            [("doc1", 0.8), ("doc3", 0.9)],
+            [("doc2", 0.9)],
         ]
-        result = SimilarityEvaluator._clean_result(pairs)
-        self.assertEqual(len(result), 2)
-
-    def test_clean_result_sorting(self):
-        pairs = [
-            SimilarPair("doc1", "doc2", 0.6),
-            SimilarPair("doc3", "doc4", 0.9),
-            SimilarPair("doc5", "doc6", 0.75),
+        pairs = self.evaluator.iter_similar_pairs(["doc1", "doc2", "doc3"])
+
+        self.assertEqual(next(pairs), SimilarPair("doc1", "doc2", 0.8))
+        self.assertEqual(self.mock_lsh.find_similar.call_count, 1)
+        self.assertEqual(list(pairs), [SimilarPair("doc2", "doc3", 0.9)])
+
+    def test_iter_similar_pairs_keeps_one_sided_matches(self):
+        self.mock_lsh.find_similar.side_effect = [
+            [],
+            [("doc1", 0.8)],
         ]
-        result = SimilarityEvaluator._clean_result(pairs)
+        result = list(self.evaluator.iter_similar_pairs(["doc1", "doc2"]))
 
-        self.assertEqual(result[0].similarity_score, 0.9)
-        self.assertEqual(result[1].similarity_score, 0.75)
-        self.assertEqual(result[2].similarity_score, 0.6)
+        self.assertEqual(result, [SimilarPair("doc1", "doc2", 0.8)])
 
 
 if __name__ == '__main__':